@@ -0,0 +1,324 @@
+"""
+Align the bits of several performances of the same set and report how each bit changes
+Usage: python comedy_alignment.py night1_analyzed.json night2_analyzed.json ... [--reference night1_analyzed.json]
+       python comedy_alignment.py tour_batch.jsonl -o alignment.json
+
+Every performance is aligned to a reference performance (the first one by default). Bits are compared
+by SimHash fingerprint: near-identical bits that are each other's only close match become anchors, and
+a dynamic program over the pairs within a band around the diagonal aligns the bits between consecutive
+anchors. No step compares every pair of bits: apart from unrelated bits that happen to share a
+fingerprint band (about one pair in 1,400 with the defaults), the cost grows with the number of bits
+times the band rather than with the number of bits squared.
+"""
+
+import argparse
+import json
+import sys
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import comedy_style_analyzer as analyzer
+from comedy_near_duplicates import hamming_distance, simhash
+
+DETECTOR_FLAGS = [flag for _, flag in analyzer.DETECTION_COUNTS]
+
+
+def _popcount(values):
+    import numpy as np
+    if hasattr(np, 'bitwise_count'):  # NumPy 2.0+
+        return np.bitwise_count(values)
+    return np.unpackbits(values.view(np.uint8).reshape(values.shape + (8,)), axis=-1).sum(axis=-1)
+
+
+def _segment_dict(seg) -> Dict:
+    if isinstance(seg, analyzer.BitSegment):
+        return {name: getattr(seg, name) for name in analyzer._BIT_SEGMENT_FIELDS}
+    return seg
+
+
+def fingerprints(segments: Sequence) -> Any:
+    """SimHash of every segment's text (analyzed segment dictionaries or BitSegments), as a uint64 NumPy array"""
+    import numpy as np
+    return np.array([simhash(_segment_dict(seg)['text']) for seg in segments], dtype=np.uint64)
+
+
+def _close_pairs(reference: List[int], other: List[int], within: int) -> Dict[Tuple[int, int], int]:
+    """
+    Every (reference index, other index) pair whose fingerprints are at most `within` bits apart, with
+    that distance. Fingerprints are split into within + 1 bands, and two fingerprints that close must
+    agree exactly on one of them, so only bits sharing a band are compared rather than every pair
+    (unrelated fingerprints share one of the five bands used for the default anchor distance about
+    once in 1,400 pairs).
+    """
+    if within >= 64:
+        return {(i, j): hamming_distance(a, b)
+                for i, a in enumerate(reference) for j, b in enumerate(other)}
+    bands = within + 1
+    pairs = {}
+    for k in range(bands):
+        shift = 64 * k // bands
+        mask = (1 << (64 * (k + 1) // bands - shift)) - 1
+        buckets = {}
+        for i, fingerprint in enumerate(reference):
+            buckets.setdefault((fingerprint >> shift) & mask, []).append(i)
+        for j, fingerprint in enumerate(other):
+            for i in buckets.get((fingerprint >> shift) & mask, ()):
+                if (i, j) not in pairs:
+                    distance = hamming_distance(reference[i], fingerprint)
+                    if distance <= within:
+                        pairs[(i, j)] = distance
+    return pairs
+
+
+def _anchors(reference: List[int], other: List[int], anchor_distance: int) -> List[Tuple[int, int]]:
+    """
+    Pairs that are each other's closest bit, within anchor_distance, and unambiguous (no other bit in
+    either performance is as close), kept in an order-preserving chain (longest increasing subsequence)
+    """
+    # Any rival of a pair within anchor_distance is itself within anchor_distance, so the close pairs
+    # are all that's needed to check closest-and-unambiguous
+    close = _close_pairs(reference, other, anchor_distance)
+    row_best, column_best = {}, {}
+    for (i, j), distance in close.items():
+        for best, key in ((row_best, i), (column_best, j)):
+            if key not in best or distance < best[key][0]:
+                best[key] = [distance, 1]
+            elif distance == best[key][0]:
+                best[key][1] += 1
+    candidates = sorted((i, j) for (i, j), distance in close.items()
+                        if row_best[i] == [distance, 1] and column_best[j] == [distance, 1])
+    # Longest chain with increasing j (candidates are ordered by i, each i at most once)
+    tails, tail_index, parents = [], [], [None] * len(candidates)
+    for k, (_, j) in enumerate(candidates):
+        position = bisect_left(tails, j)
+        if position:
+            parents[k] = tail_index[position - 1]
+        if position == len(tails):
+            tails.append(j)
+            tail_index.append(k)
+        else:
+            tails[position] = j
+            tail_index[position] = k
+    chain = []
+    k = tail_index[-1] if tail_index else None
+    while k is not None:
+        chain.append(candidates[k])
+        k = parents[k]
+    return chain[::-1]
+
+
+def _align_gap(reference, other, i0: int, i1: int, j0: int, j1: int, max_distance: int,
+               band: int) -> List[Tuple[int, int]]:
+    """
+    Best order-preserving matching of reference bits [i0, i1) to bits [j0, j1): maximizes the summed
+    closeness (max_distance + 1 - distance) of matched pairs, considering only pairs within `band` bits
+    of the gap's diagonal. Only those pairs are ever compared: each one extends the best chain of
+    pairs above and to the left of it, found with a prefix-maximum (Fenwick) tree over the columns.
+    """
+    import numpy as np
+    rows, cols = i1 - i0, j1 - j0
+    if not rows or not cols:
+        return []
+    # Cells within the band, row by row (one column of slack either side, then the exact test)
+    row_numbers = np.arange(rows)
+    diagonals = row_numbers * cols / rows
+    first = np.clip(np.floor(diagonals - band).astype(np.int64) - 1, 0, cols)
+    last = np.clip(np.ceil(diagonals + band).astype(np.int64) + 2, 0, cols)
+    counts = last - first
+    cell_rows = np.repeat(row_numbers, counts)
+    cell_cols = np.repeat(first - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+    in_band = np.abs(cell_cols - diagonals[cell_rows]) <= band
+    cell_rows, cell_cols = cell_rows[in_band], cell_cols[in_band]
+    distances = _popcount(reference[i0 + cell_rows] ^ other[j0 + cell_cols]).astype(np.int64)
+    close = distances <= max_distance
+    cells = list(zip(cell_rows[close].tolist(), cell_cols[close].tolist(),
+                     (max_distance + 1 - distances[close]).tolist()))
+
+    tree = [(0, -1)] * (cols + 1)  # Prefix maxima of (chain score, last cell) by column, 1-based
+    parents = [-1] * len(cells)
+    start = 0
+    while start < len(cells):
+        end = start
+        while end < len(cells) and cells[end][0] == cells[start][0]:
+            end += 1
+        # Query the whole row before inserting any of it: a chain takes at most one cell per row
+        chains = []
+        for k in range(start, end):
+            best, position = (0, -1), cells[k][1]
+            while position:
+                best = max(best, tree[position])
+                position -= position & -position
+            parents[k] = best[1]
+            chains.append((best[0] + cells[k][2], k))
+        for chain in chains:
+            position = cells[chain[1]][1] + 1
+            while position <= cols:
+                if chain > tree[position]:
+                    tree[position] = chain
+                position += position & -position
+        start = end
+
+    best, position = (0, -1), cols
+    while position:
+        best = max(best, tree[position])
+        position -= position & -position
+    pairs = []
+    k = best[1]
+    while k >= 0:
+        pairs.append((i0 + cells[k][0], j0 + cells[k][1]))
+        k = parents[k]
+    return pairs[::-1]
+
+
+def align_pair(reference, other, max_distance: int = 16, anchor_distance: int = 4,
+               band: int = 16) -> List[Tuple[int, int, int]]:
+    """
+    Match the bits of two performances in running order
+    Args:
+        reference, other: Segment fingerprints (see fingerprints())
+        max_distance: Largest SimHash distance (of 64 bits) at which two bits can still be the same bit
+        anchor_distance: Largest distance for an anchor (a near-certain match the alignment must keep)
+        band: How far (in bits) off the diagonal between two anchors a match may lie
+    Returns:
+        (reference index, other index, distance) for every matched bit, in order
+    """
+    reference_ints, other_ints = reference.tolist(), other.tolist()
+    anchors = _anchors(reference_ints, other_ints, anchor_distance)
+    pairs = []
+    previous = (-1, -1)
+    for i, j in anchors + [(len(reference), len(other))]:
+        pairs += _align_gap(reference, other, previous[0] + 1, i, previous[1] + 1, j, max_distance, band)
+        if i < len(reference):
+            pairs.append((i, j))
+        previous = (i, j)
+    return [(i, j, hamming_distance(reference_ints[i], other_ints[j])) for i, j in pairs]
+
+
+def bit_delta(reference: Dict, other: Dict) -> Dict:
+    """How a bit changed from one performance to another"""
+    def duration(seg: Dict) -> float:
+        return seg['end_time'] - seg['start_time']
+
+    reference_scores, other_scores = reference.get('style_scores', {}), other.get('style_scores', {})
+    score_deltas = {style: round(other_scores.get(style, 0.0) - reference_scores.get(style, 0.0), 3)
+                    for style in analyzer.COMEDY_STYLES
+                    if style in reference_scores or style in other_scores}
+    return {
+        "duration_delta": round(duration(other) - duration(reference), 3),
+        "syllable_delta": other['syllable_count'] - reference['syllable_count'],
+        "styles_added": [style for style in other['styles'] if style not in reference['styles']],
+        "styles_removed": [style for style in reference['styles'] if style not in other['styles']],
+        "style_score_deltas": {style: delta for style, delta in score_deltas.items() if delta},
+        "flags_changed": {flag: other[flag] for flag in DETECTOR_FLAGS if other[flag] != reference[flag]},
+    }
+
+
+def align_performances(performances: List[Tuple[str, List]], reference: Optional[str] = None,
+                       max_distance: int = 16, anchor_distance: int = 4, band: int = 16) -> Dict:
+    """
+    Align several performances of a set bit by bit
+    Args:
+        performances: (name, segments) per performance; segments are analyzed segment dictionaries
+            (a result's "segments") or BitSegments
+        reference: Name of the performance the others are aligned to (default: the first)
+        max_distance, anchor_distance, band: See align_pair()
+    Returns:
+        {"reference", "performances", "bits": one entry per reference bit with its text, how many
+        performances include it, duration statistics and per-performance deltas, "unmatched": bits
+        of other performances with no counterpart in the reference}
+    """
+    names = [name for name, _ in performances]
+    if reference is None:
+        reference = names[0]
+    if len(set(names)) < len(names):
+        raise ValueError("Performance names must be unique")
+    if reference not in names:
+        raise ValueError(f"Unknown reference performance: {reference}")
+    segments = {name: [_segment_dict(seg) for seg in segs] for name, segs in performances}
+    prints = {name: fingerprints(segs) for name, segs in segments.items()}
+    reference_segments = segments[reference]
+
+    bits = [{"reference_segment": i, "text": seg['text'], "performances": {}}
+            for i, seg in enumerate(reference_segments)]
+    unmatched = {}
+    for name in names:
+        if name == reference:
+            continue
+        pairs = align_pair(prints[reference], prints[name], max_distance, anchor_distance, band)
+        for i, j, distance in pairs:
+            seg = segments[name][j]
+            bits[i]["performances"][name] = dict(segment=j, distance=distance, start_time=seg['start_time'],
+                                                 **bit_delta(reference_segments[i], seg))
+        matched = {j for _, j, _ in pairs}
+        unmatched[name] = [{"segment": j, "text": seg['text']}
+                           for j, seg in enumerate(segments[name]) if j not in matched]
+
+    for bit, seg in zip(bits, reference_segments):
+        durations = [seg['end_time'] - seg['start_time']]
+        durations += [durations[0] + match['duration_delta'] for match in bit["performances"].values()]
+        style_counts = {}
+        for match in bit["performances"].values():
+            for style in match['styles_added']:
+                style_counts[style] = style_counts.get(style, 0) + 1
+            for style in match['styles_removed']:
+                style_counts[style] = style_counts.get(style, 0) - 1
+        bit["performed"] = 1 + len(bit["performances"])
+        bit["duration"] = {"min": round(min(durations), 3), "max": round(max(durations), 3),
+                           "mean": round(sum(durations) / len(durations), 3)}
+        bit["style_changes"] = {style: count for style, count in style_counts.items() if count}
+
+    return {
+        "reference": reference,
+        "performances": names,
+        "bits": bits,
+        "unmatched": unmatched,
+    }
+
+
+def _print_report(alignment: Dict) -> None:
+    total = len(alignment["performances"])
+    print(f"Aligned {total} performances to {alignment['reference']} ({len(alignment['bits'])} bits)")
+    for bit in alignment["bits"]:
+        text = bit['text'] if len(bit['text']) <= 60 else bit['text'][:57] + '...'
+        duration = bit['duration']
+        changes = ', '.join(f"{style} {count:+d}" for style, count in bit['style_changes'].items())
+        print(f"  #{bit['reference_segment']:<4} {bit['performed']:>3}/{total}  "
+              f"{duration['mean']:6.1f}s ({duration['min']:.1f}-{duration['max']:.1f})  {text}"
+              + (f"  [{changes}]" if changes else ""))
+    for name, bits in alignment["unmatched"].items():
+        if bits:
+            print(f"  {name}: {len(bits)} bits not in the reference")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Align bits across performances of the same set")
+    parser.add_argument("inputs", nargs="+", help="Analyzed performances (any --format) or batch JSONL output")
+    parser.add_argument("--reference", default=None, help="Performance to align the others to (default: the first)")
+    parser.add_argument("--max-distance", type=int, default=16,
+                        help="Largest SimHash distance (of 64 bits) for two bits to count as the same bit")
+    parser.add_argument("--band", type=int, default=16, help="How far bits may move between anchors")
+    parser.add_argument("-o", "--output", default=None, help="Write the alignment as JSON here")
+    args = parser.parse_args(argv)
+
+    performances = [(name, result['segments']) for path in args.inputs
+                    for name, result in analyzer.iter_results(path)]
+    if len(performances) < 2:
+        parser.error("need at least two performances")
+    started = time.perf_counter()
+    try:
+        alignment = align_performances(performances, args.reference, args.max_distance, band=args.band)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(alignment, f, indent=2)
+    _print_report(alignment)
+    print(f"Alignment took {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""
+Batch corpus mode: analyze many transcript files in a process pool, appending one JSON record per file
+Usage: python comedy_style_analyzer.py transcripts/ --batch -o batch_analyzed.jsonl [-j 8] [--unordered]
+
+Each worker process loads the Spacy model once, before its first file. Records are written as JSONL
+({"file", "status", "elapsed_seconds", "result" or "error"}), so a failed file - or a crashed worker -
+never stops the batch and a rerun skips the files that already have a successful record.
+"""
+
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import nullcontext
+from typing import Dict, List, Optional
+
+import comedy_style_analyzer as analyzer
+
+
+def collect_transcript_files(inputs: List[str]) -> List[str]:
+    """
+    Expand directories and glob patterns into a sorted, de-duplicated list of transcript files
+    Files ending in _analyzed.json are skipped so a batch can run over its own output directory
+    """
+    files = []
+    seen = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = sorted(glob.glob(os.path.join(item, '**', '*.json'), recursive=True))
+        elif glob.has_magic(item):
+            matches = sorted(glob.glob(item, recursive=True))
+        else:
+            matches = [item]
+        for path in matches:
+            key = os.path.abspath(path)
+            if key in seen or path.endswith('_analyzed.json') or os.path.isdir(path):
+                continue
+            seen.add(key)
+            files.append(path)
+    return files
+
+
+def _load_completed_files(output_path: str) -> set:
+    """Read an existing batch JSONL output and return the files that were analyzed successfully"""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from an interrupted run
+            if record.get('status') == 'ok' and record.get('file'):
+                done.add(os.path.abspath(record['file']))
+    return done
+
+
+def _init_batch_worker() -> None:
+    """Process pool initializer: load the Spacy model once per worker, before the first file arrives"""
+    analyzer.get_nlp()
+
+
+def _analyze_file(path: str, pause_threshold: float, timings: bool = False) -> Dict:
+    """Analyze one transcript file inside a worker, turning any failure into an error record"""
+    started = time.perf_counter()
+    try:
+        with open(path, 'r') as f:
+            transcript_data = json.load(f)
+        result = analyzer.analyze_comedy_transcript(transcript_data, pause_threshold, timings=timings)
+        return {
+            "file": path,
+            "status": "ok",
+            "elapsed_seconds": round(time.perf_counter() - started, 4),
+            "result": result,
+        }
+    except Exception as e:
+        return {
+            "file": path,
+            "status": "error",
+            "elapsed_seconds": round(time.perf_counter() - started, 4),
+            "error": f"{type(e).__name__}: {e}",
+        }
+
+
+def analyze_batch(files: List[str], output_path: str, workers: Optional[int] = None,
+                  ordered: bool = True, resume: bool = True,
+                  pause_threshold: float = 1.5, timings: bool = False,
+                  metrics_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Analyze many transcript files in a process pool and append one JSON record per file to output_path
+    Args:
+        files: Transcript file paths (see collect_transcript_files)
+        output_path: JSONL file to append results to
+        workers: Number of worker processes (defaults to the CPU count)
+        ordered: Write records in input order (files retried after a worker crash come last); otherwise
+            write them as soon as they finish
+        resume: Skip files that already have a successful record in output_path
+        pause_threshold: Pause duration in seconds to segment bits
+        timings: Keep each result's "timings" block
+        metrics_path: Write Prometheus-format stage timings and counters for the whole batch here
+    Returns:
+        Counts of analyzed, failed and skipped files
+    """
+    workers = workers or os.cpu_count() or 1
+    done = _load_completed_files(output_path) if resume else set()
+    pending = [path for path in files if os.path.abspath(path) not in done]
+    stats = {"analyzed": 0, "failed": 0, "skipped": len(files) - len(pending)}
+    metrics = analyzer.Instrumentation() if metrics_path else None
+    if not pending:
+        if metrics is not None:
+            _write_metrics(metrics, stats, metrics_path)
+        return stats
+
+    # Keep a bounded number of files in flight so ordered mode never buffers the whole corpus
+    max_in_flight = workers * 4
+    todo = iter(pending)
+    executor = None
+    crashed = []  # Files in flight when a worker died, retried one at a time at the end
+
+    with open(output_path, 'ab') as out:
+
+        def restart_pool() -> None:
+            nonlocal executor
+            if executor is not None:
+                executor.shutdown(wait=False)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker)
+
+        def submit(in_flight, path: str) -> None:
+            args = (_analyze_file, path, pause_threshold, timings or metrics is not None)
+            try:
+                future = executor.submit(*args)
+            except BrokenProcessPool:
+                restart_pool()
+                future = executor.submit(*args)
+            in_flight.append((path, time.perf_counter(), executor, future))
+
+        def submit_next(in_flight) -> bool:
+            path = next(todo, None)
+            if path is None:
+                return False
+            submit(in_flight, path)
+            return True
+
+        def finish(path: str, submitted: float, pool: ProcessPoolExecutor, future, retry: bool = True) -> None:
+            # A worker that dies (e.g. killed for running out of memory) breaks the pool and fails every
+            # file in it, so those files are retried alone later; the rest carry on in a new pool
+            try:
+                record = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    if pool is executor:
+                        restart_pool()
+                    if retry:
+                        crashed.append(path)
+                        return
+                record = {
+                    "file": path,
+                    "status": "error",
+                    "elapsed_seconds": round(time.perf_counter() - submitted, 4),
+                    "error": f"{type(e).__name__}: {e}",
+                }
+            write_record(record)
+
+        def write_record(record: Dict) -> None:
+            if metrics is not None and record['status'] == 'ok':
+                result_timings = record['result']['timings'] if timings else record['result'].pop('timings')
+                metrics.merge(result_timings)
+            with metrics.stage("serialization") if metrics is not None else nullcontext():
+                out.write(analyzer.dumps_compact(record) + b'\n')
+            out.flush()
+            if record['status'] == 'ok':
+                stats['analyzed'] += 1
+            else:
+                stats['failed'] += 1
+                print(f"❌ {record['file']}: {record['error']}", file=sys.stderr)
+
+        restart_pool()
+        try:
+            in_flight = deque()
+            while len(in_flight) < max_in_flight and submit_next(in_flight):
+                pass
+
+            while in_flight:
+                if ordered:
+                    finish(*in_flight.popleft())
+                else:
+                    finished, _ = wait([entry[3] for entry in in_flight], return_when=FIRST_COMPLETED)
+                    for entry in [entry for entry in in_flight if entry[3] in finished]:
+                        in_flight.remove(entry)
+                        finish(*entry)
+                while len(in_flight) < max_in_flight and submit_next(in_flight):
+                    pass
+
+            # Alone in the pool, a file that crashes its worker only fails itself
+            for path in crashed:
+                submit(in_flight, path)
+                finish(*in_flight.popleft(), retry=False)
+        finally:
+            executor.shutdown()
+
+    if metrics is not None:
+        _write_metrics(metrics, stats, metrics_path)
+    return stats
+
+
+def _write_metrics(metrics: analyzer.Instrumentation, stats: Dict[str, int], metrics_path: str) -> None:
+    for name, value in stats.items():
+        metrics.counters[f"files_{name}"] = value
+    with open(metrics_path, 'w') as f:
+        f.write(metrics.prometheus())
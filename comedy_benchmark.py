@@ -0,0 +1,612 @@
+"""
+Benchmarks for the comedy style analyzer
+Usage: python comedy_benchmark.py suite [--minutes 5 30 120] [-o baseline.json] [--compare baseline.json]
+       python comedy_benchmark.py compare baseline.json current.json [--threshold 0.15]
+       python comedy_benchmark.py syllables [--words 20000] [--repeat 5]
+       python comedy_benchmark.py segmentation [--words 50000] [--repeat 3]
+       python comedy_benchmark.py laughs [--minutes 90]
+       python comedy_benchmark.py sweep [--minutes 30] [--latency 0.3]
+       python comedy_benchmark.py resilience [--transcripts 12] [--outage 0.25] [--budget 2]
+       python comedy_benchmark.py nlp [--minutes 30] [--profiles accurate fast none]
+
+The suite times every analysis stage on seeded synthetic sets (a 5-minute spot up to a 2-hour special)
+with a stubbed OpenAI client, and writes machine-readable results. Save one run as the baseline and
+judge changes to comedy_style_analyzer.py with --compare: any stage slower than the threshold fails.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import wave
+from typing import Callable, Dict, List, Optional, Tuple
+
+import comedy_style_analyzer as analyzer
+
+# Stand-up-ish vocabulary; Zipf-weighted sampling gives the heavy repetition of real sets
+VOCABULARY = (
+    "I you the a and to was my so like just it that me he she we they what is in of but "
+    "then said know really people mother father wife husband kids dog cat phone airport "
+    "grocery store toilet paper doctor dentist gym wedding funeral birthday party restaurant "
+    "waiter menu coffee beer wine vacation hotel uber driver neighbor boss coworker meeting "
+    "email password internet instagram dating app relationship marriage divorce therapy "
+    "anxiety actually literally basically obviously totally honestly probably maybe never "
+    "nothing nobody everybody everything something somebody anyway whatever apparently "
+    "ridiculous unbelievable incredible disgusting beautiful terrible horrible wonderful "
+    "embarrassing uncomfortable inappropriate complicated expensive dangerous delicious "
+    "walked looked noticed realized decided pretended remembered happened started stopped "
+    "yelling screaming crying laughing running sleeping eating drinking driving flying"
+).split()
+
+
+def generate_words(count: int, seed: int = 0) -> List[str]:
+    """Seeded list of transcript words with a Zipf-like frequency distribution"""
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+    return rng.choices(VOCABULARY, weights=weights, k=count)
+
+
+def generate_transcript(word_count: int, seed: int = 0, pause_every: int = 40) -> Dict:
+    """Seeded transcript with millisecond word timestamps and a beat roughly every `pause_every` words"""
+    rng = random.Random(seed)
+    words = generate_words(word_count, seed)
+    timed = []
+    clock = 0
+    for word in words:
+        duration = rng.randint(120, 450)
+        timed.append({"text": word, "start": clock, "end": clock + duration})
+        clock += duration + (rng.randint(1600, 4000) if rng.random() < 1.0 / pause_every else rng.randint(0, 120))
+    return {"text": ' '.join(words), "words": timed}
+
+
+# Stock phrases mixed into generated bits so the detectors and keyword classifier have work to do
+PHRASES = [
+    "turns out", "you know what", "I'm not saying", "I think", "I guess", "you know", "kind of",
+    "sort of", "really very", "one time", "did you ever notice", "what is it with", "I'm so",
+    "yeah right", "what the hell", "it was amazing", "nobody", "never", "but then", "and then suddenly",
+    "my family", "the government", "the meaning of life", "imagine", "was waiting", "is killing",
+]
+SPEAKING_RATE = 160  # Words per minute, typical for stand-up
+
+
+def generate_set(minutes: float, seed: int = 0) -> Dict:
+    """
+    Seeded stand-up set of roughly `minutes` length, with AssemblyAI-style millisecond word timestamps
+    Bits are a few punctuated sentences; words within a sentence are close together, sentences have
+    short breaths, and bits end in a laugh break long enough to split on at the default threshold.
+    """
+    rng = random.Random(seed)
+    weights = [1.0 / (rank + 1) for rank in range(len(VOCABULARY))]
+    target_words = int(minutes * SPEAKING_RATE)
+    words, timed = [], []
+    clock = 0
+
+    def say(word: str, gap: int) -> None:
+        nonlocal clock
+        clock += gap
+        duration = 60 * max(2, len(word)) + rng.randint(0, 80)
+        words.append(word)
+        timed.append({"text": word, "start": clock, "end": clock + duration, "confidence": round(rng.uniform(0.8, 1.0), 3)})
+        clock += duration
+
+    while len(words) < target_words:
+        for sentence in range(rng.randint(1, 6)):
+            tokens = rng.choices(VOCABULARY, weights=weights, k=rng.randint(4, 18))
+            for _ in range(rng.randint(0, 2)):
+                tokens[rng.randrange(len(tokens))] = rng.choice(PHRASES)
+            tokens = ' '.join(tokens).split()
+            tokens[0] = tokens[0].capitalize()
+            tokens[-1] += rng.choice('..?!')
+            for i, token in enumerate(tokens):
+                say(token, rng.randint(300, 900) if i == 0 and sentence else rng.randint(0, 150))
+        clock += rng.randint(1600, 6000)  # Laugh break
+    return {"text": ' '.join(words), "words": timed}
+
+
+def generate_audio(path: str, transcript: Dict, sample_rate: int = 16000, laugh_rate: float = 0.6,
+                   seed: int = 0) -> List[Tuple[float, float]]:
+    """
+    Write a synthetic mono 16-bit WAV for a generated set: a harmonic "voice" while words are spoken,
+    broadband crowd noise in some of the laugh breaks, and a quiet room tone everywhere else
+    Returns:
+        The (start, end) seconds of every laugh written
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    word_starts = np.array([word['start'] for word in transcript['words']], dtype=np.float64) / 1000
+    word_ends = np.array([word['end'] for word in transcript['words']], dtype=np.float64) / 1000
+    laughs = []
+    for end, next_start in zip(word_ends[:-1], word_starts[1:]):
+        if next_start - end > 1.5 and rng.random() < laugh_rate:
+            laughs.append((end + 0.1, end + 0.1 + min(next_start - end - 0.3, rng.uniform(0.8, 3.0))))
+    laugh_starts = np.array([start for start, _ in laughs])
+    laugh_ends = np.array([end for _, end in laughs])
+
+    def inside(t, starts, ends):
+        index = np.searchsorted(starts, t, side='right') - 1
+        return (index >= 0) & (t < ends[np.maximum(index, 0)]) if len(starts) else np.zeros(len(t), dtype=bool)
+
+    total = int((word_ends[-1] + 1.0) * sample_rate)
+    step = sample_rate * 10
+    with wave.open(path, 'wb') as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(sample_rate)
+        for first in range(0, total, step):
+            t = np.arange(first, min(total, first + step)) / sample_rate
+            voice = sum(np.sin(2 * np.pi * harmonic * 140 * t) / harmonic for harmonic in range(1, 9))
+            voice *= 0.2 * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)) * inside(t, word_starts, word_ends)
+            crowd = 0.25 * rng.standard_normal(len(t)) * inside(t, laugh_starts, laugh_ends)
+            signal = voice + crowd + 0.003 * rng.standard_normal(len(t))
+            out.writeframes((np.clip(signal, -1, 1) * 32767).astype('<i2').tobytes())
+    return laughs
+
+
+class StubChatClient:
+    """
+    Stand-in for OpenAIChatClient: answers classification prompts with seeded scores after `latency` seconds
+    error_rate and hang_rate make that share of calls fail immediately or never answer (an outage).
+    """
+
+    def __init__(self, latency: float = 0.0, seed: int = 0, error_rate: float = 0.0, hang_rate: float = 0.0):
+        self.model = "benchmark-stub"
+        self.latency = latency
+        self.seed = seed
+        self.error_rate = error_rate
+        self.hang_rate = hang_rate
+        self.calls = 0
+        self._faults = random.Random(seed)
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        self.calls += 1
+        fault = self._faults.random()
+        if fault < self.error_rate:
+            raise ConnectionError("stub outage")
+        if fault < self.error_rate + self.hang_rate:
+            await asyncio.sleep(3600)
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        prompt = messages[-1]['content']
+        rng = random.Random(f"{self.seed}:{prompt}")
+        bit_count = sum(1 for line in prompt.splitlines() if line.startswith('Bit '))
+
+        def scores() -> Dict[str, float]:
+            return {style: round(rng.random(), 2) for style in rng.sample(analyzer.COMEDY_STYLES, 4)}
+        if bit_count == 0:
+            return json.dumps(scores())
+        return json.dumps({str(i): scores() for i in range(1, bit_count + 1)})
+
+
+def best_time(fn: Callable[[], object], repeat: int) -> float:
+    """Fastest of `repeat` runs, in seconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_syllables(word_count: int, repeat: int) -> None:
+    words = generate_words(word_count)
+    uncached = analyzer._count_syllables_cached.__wrapped__
+    analyzer._get_syllable_table()  # Load the pronunciation table outside the timings
+
+    def per_word() -> int:
+        return sum(uncached(word) for word in words)
+
+    def batch_cold() -> int:
+        analyzer._count_syllables_cached.cache_clear()
+        return sum(analyzer.count_syllables_batch(words))
+
+    def batch_warm() -> int:
+        return sum(analyzer.count_syllables_batch(words))
+
+    baseline = best_time(per_word, repeat)
+    cold = best_time(batch_cold, repeat)
+    batch_warm()
+    warm = best_time(batch_warm, repeat)
+    print(f"Syllable counting, {word_count:,} words ({len(set(words))} distinct)")
+    print(f"  per-word heuristic:   {baseline * 1000:8.2f} ms")
+    print(f"  batch, cold cache:    {cold * 1000:8.2f} ms  ({baseline / cold:5.1f}x)")
+    print(f"  batch, warm cache:    {warm * 1000:8.2f} ms  ({baseline / warm:5.1f}x)")
+
+
+def peak_memory(fn: Callable[[], object]) -> int:
+    """Peak traced allocation in bytes while fn runs"""
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_segmentation(word_count: int, repeat: int) -> None:
+    transcript = generate_transcript(word_count)
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        json.dump(transcript, f)
+        path = f.name
+    try:
+        words = transcript['words']
+        analyzer.count_syllables_batch(VOCABULARY)  # Warm the syllable memo for both sides
+
+        def dict_segments() -> int:
+            return len(list(analyzer.iter_segments(words)))
+
+        def columnar_segments() -> int:
+            return len(analyzer.TranscriptColumns.from_words(words).spans())
+
+        def dict_from_file() -> int:
+            with open(path) as f:
+                loaded = json.load(f)
+            return len(list(analyzer.iter_segments(loaded['words'])))
+
+        def columnar_from_file() -> int:
+            return len(analyzer.TranscriptColumns.from_file(path).spans())
+
+        print(f"Pause segmentation, {word_count:,} words ({dict_segments()} bits)")
+        dict_time, columnar_time = best_time(dict_segments, repeat), best_time(columnar_segments, repeat)
+        print(f"  word dicts -> segments:          {dict_time * 1000:8.1f} ms")
+        print(f"  columnar ingest + np.diff spans: {columnar_time * 1000:8.1f} ms  ({dict_time / columnar_time:4.1f}x)")
+        columns = analyzer.TranscriptColumns.from_words(words)
+        spans_time = best_time(lambda: columns.spans(), repeat)
+        print(f"  re-segment existing columns:     {spans_time * 1000:8.2f} ms  ({dict_time / spans_time:4.0f}x)")
+        dict_peak, columnar_peak = peak_memory(dict_from_file), peak_memory(columnar_from_file)
+        print(f"  peak memory, json.load + dicts:  {dict_peak / 1e6:8.1f} MB")
+        print(f"  peak memory, streamed columns:   {columnar_peak / 1e6:8.1f} MB  ({dict_peak / columnar_peak:4.1f}x less)")
+    finally:
+        os.unlink(path)
+
+
+def bench_laughs(minutes: float, sample_rate: int) -> None:
+    import resource
+    transcript = generate_set(minutes)
+    with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
+        path = f.name
+    try:
+        truth = generate_audio(path, transcript, sample_rate)
+        size = os.path.getsize(path)
+        rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        started = time.perf_counter()
+        laughs = analyzer.detect_laughs(path)
+        elapsed = time.perf_counter() - started
+        rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_before
+        traced = peak_memory(lambda: analyzer.detect_laughs(path))
+
+        found = sum(any(laugh.start < end and laugh.end > start for laugh in laughs) for start, end in truth)
+        real = sum(any(laugh.start < end and laugh.end > start for start, end in truth) for laugh in laughs)
+        print(f"Laugh detection, {minutes:g} minutes at {sample_rate} Hz ({size / 1e6:.0f} MB WAV)")
+        print(f"  detect_laughs:        {elapsed:8.2f} s  ({minutes * 60 / elapsed:5.0f}x real time)")
+        print(f"  peak traced memory:   {traced / 1e6:8.1f} MB  (max RSS grew {rss_growth / 1024:.1f} MB)")
+        print(f"  laughs found:         {found}/{len(truth)} ({len(laughs) - real} false alarms)")
+    finally:
+        os.unlink(path)
+
+
+def bench_sweep(minutes: float, latency: float, steps: List[float]) -> None:
+    """Slider moves: full re-analysis at each threshold vs. PauseSweep lookups over cached bits"""
+    import statistics
+    analyzer.disable_default_style_cache()
+    transcript = generate_set(minutes)
+    classifier = analyzer.AsyncStyleClassifier(StubChatClient(latency), use_cache=False)
+
+    def latencies(analyze: Callable[[float], object]) -> List[float]:
+        times = []
+        for threshold in steps:
+            started = time.perf_counter()
+            analyze(threshold)
+            times.append(time.perf_counter() - started)
+        return times
+
+    analyzer.analyze_comedy_transcript(transcript, steps[0], classifier)  # Warm up Spacy
+    full = latencies(lambda threshold: analyzer.analyze_comedy_transcript(transcript, threshold, classifier))
+    sweep = analyzer.PauseSweep(transcript, classifier)
+    first = latencies(sweep.analyze)
+    again = latencies(sweep.analyze)
+    prefetched = analyzer.PauseSweep(transcript, classifier)
+    started = time.perf_counter()
+    prefetched.prefetch(steps)
+    prefetch_seconds = time.perf_counter() - started
+    warm = latencies(prefetched.analyze)
+
+    print(f"Pause threshold sweep, {minutes:g}-minute set, {len(steps)} slider stops "
+          f"({steps[0]:g}-{steps[-1]:g}s), {latency:g}s per stubbed OpenAI request")
+    for name, times in (("full re-analysis", full), ("sweep, first pass", first),
+                        ("sweep, revisited", again), ("sweep, prefetched", warm)):
+        print(f"  {name:<20} median {statistics.median(times) * 1000:9.1f} ms   max {max(times) * 1000:9.1f} ms")
+    print(f"  prefetch all stops   {prefetch_seconds * 1000:9.1f} ms ({len(prefetched._analyzed)} distinct bits)")
+
+
+def bench_resilience(transcripts: int, minutes: float, latency: float, hang_rate: float, outage: float,
+                     request_timeout: float, budget: float, reset_seconds: float, interval: float) -> None:
+    """
+    Per-transcript latency while OpenAI misbehaves: a share of calls hang throughout, and every call
+    hangs for the middle `outage` share of the transcripts. Transcripts arrive every `interval` seconds
+    (or as soon as the previous one is done). Compares request timeouts alone, plus a time budget, plus
+    a circuit breaker.
+    """
+    analyzer.disable_default_style_cache()
+    sets = [generate_set(minutes, seed) for seed in range(transcripts)]
+    outage_start = int(transcripts * (1 - outage) / 2)
+    down = set(range(outage_start, outage_start + int(transcripts * outage)))
+    configs = [
+        ("request timeouts", None, analyzer.CircuitBreaker(10 ** 9)),
+        ("+ time budget", budget, analyzer.CircuitBreaker(10 ** 9)),
+        ("+ circuit breaker", budget, analyzer.CircuitBreaker(5, reset_seconds, slow_call_seconds=budget * 0.75)),
+    ]
+    print(f"Resilience, {transcripts} x {minutes:g}-minute sets, {latency:g}s per stubbed OpenAI request, "
+          f"{hang_rate:.0%} of calls hang, full outage for {len(down)} sets; request timeout {request_timeout:g}s, "
+          f"budget {budget:g}s")
+    analyzer.analyze_comedy_transcript(sets[0])  # Warm up Spacy (no classifier given: keywords)
+    for name, time_budget, breaker in configs:
+        times, fallbacks, bits, calls = [], 0, 0, 0
+        for i, transcript in enumerate(sets):
+            client = StubChatClient(latency, seed=i, hang_rate=1.0 if i in down else hang_rate)
+            classifier = analyzer.AsyncStyleClassifier(client, use_cache=False, request_timeout=request_timeout,
+                                                       circuit_breaker=breaker)
+            started = time.perf_counter()
+            result = analyzer.analyze_comedy_transcript(transcript, classifier=classifier, timings=True,
+                                                        time_budget=time_budget)
+            times.append(time.perf_counter() - started)
+            time.sleep(max(0.0, interval - times[-1]))
+            fallbacks += result['timings']['counters'].get('classification_fallbacks', 0)
+            bits += len(result['segments'])
+            calls += client.calls
+        times.sort()
+        p50, p99 = times[len(times) // 2], times[min(len(times) - 1, int(len(times) * 0.99))]
+        print(f"  {name:<18} p50 {p50:6.2f}s   p99 {p99:6.2f}s   mean {sum(times) / len(times):5.2f}s   "
+              f"{calls:5d} OpenAI calls   "
+              f"{fallbacks / bits:6.1%} bits classified offline   breaker opened {breaker.stats['opened']}x")
+
+
+def _startup_seconds(profile: str) -> float:
+    """Importing the analyzer and loading one NLP profile in a fresh interpreter"""
+    code = ("import time; started = time.perf_counter(); import comedy_style_analyzer as analyzer; "
+            f"analyzer.load_nlp({profile!r}); print(time.perf_counter() - started)")
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)) or None).stdout
+    return float(output.split()[-1])
+
+
+def bench_nlp(minutes: float, profiles: List[str], repeat: int) -> None:
+    """Startup time, tokens per second and agreement with the most accurate available profile, per NLP profile"""
+    transcript = generate_set(minutes)
+    segments, _ = analyzer._segment_transcript(transcript, 1.5)
+    texts = [segment.text for segment in segments]
+    tokens = sum(len(text.split()) for text in texts)
+    untimed = {"text": transcript['text']}
+
+    runs = {}
+    for profile in profiles:
+        pipeline = analyzer.use_nlp_profile(profile)
+        if pipeline is None:
+            runs[profile] = None
+            continue
+        seconds = best_time(lambda: analyzer.build_segment_contexts(texts), repeat)
+        contexts = analyzer.build_segment_contexts(texts)
+        runs[profile] = {
+            "startup": min(_startup_seconds(profile) for _ in range(repeat)),
+            "tokens_per_second": tokens / seconds,
+            "sentences": [context.sentences for context in contexts],
+            "seesaw": [analyzer.detect_seesaw_theory(text, context) for text, context in zip(texts, contexts)],
+            "word_smuggling": [analyzer.detect_word_smuggling(text, context) for text, context in zip(texts, contexts)],
+            "untimed_bits": len(analyzer._segment_transcript(untimed, 1.5)[0]),
+        }
+    analyzer.use_nlp_profile(analyzer.get_nlp_profile())
+
+    available = [profile for profile in analyzer.NLP_PROFILES if runs.get(profile)]
+    if not available:
+        print("No NLP profile could be loaded")
+        return
+    reference = runs[available[0]]
+
+    def agreement(name: str, run: Dict) -> float:
+        return sum(a == b for a, b in zip(run[name], reference[name])) / max(1, len(texts))
+
+    print(f"NLP profiles, {minutes:g}-minute set ({len(texts)} bits, {tokens:,} tokens); "
+          f"agreement is with the {available[0]} profile, best of {repeat}")
+    print(f"  {'profile':<9} {'startup':>8} {'tokens/s':>10} {'sentences':>10} {'seesaw':>7} "
+          f"{'smuggling':>10} {'untimed bits':>13}")
+    for profile in profiles:
+        run = runs[profile]
+        if run is None:
+            print(f"  {profile:<9} unavailable (Spacy or {analyzer.SPACY_MODEL} not installed)")
+            continue
+        print(f"  {profile:<9} {run['startup']:7.2f}s {run['tokens_per_second']:10,.0f} "
+              f"{agreement('sentences', run):10.1%} {agreement('seesaw', run):7.1%} "
+              f"{agreement('word_smuggling', run):10.1%} {run['untimed_bits']:13d}")
+
+
+SUITE_VERSION = 1
+
+
+def time_stages(transcript: Dict, repeat: int, latency: float, pause_threshold: float = 1.5) -> Dict:
+    """Best-of-`repeat` seconds for each analysis stage on one transcript"""
+    stages = {}
+
+    def stage(name: str, fn: Callable[[], object]) -> None:
+        stages[name] = round(best_time(fn, repeat), 6)
+
+    stage("segmentation", lambda: analyzer._segment_transcript(transcript, pause_threshold))
+    segments, _ = analyzer._segment_transcript(transcript, pause_threshold)
+    texts = [segment.text for segment in segments]
+    stage("parsing", lambda: analyzer.build_segment_contexts(texts))
+    contexts = analyzer.build_segment_contexts(texts)
+
+    def classify_stub() -> object:
+        classifier = analyzer.AsyncStyleClassifier(StubChatClient(latency), use_cache=False)
+        return analyzer._run_coroutine(classifier.classify_many(texts))
+    stage("classify_openai_stub", classify_stub)
+    stage("classify_keyword", lambda: [analyzer.classify_styles_keyword(text) for text in texts])
+
+    previous = [None] + texts[:-1]
+    stage("detect_seesaw", lambda: [analyzer.detect_seesaw_theory(text, context) for text, context in zip(texts, contexts)])
+    stage("detect_balloon_pop", lambda: [analyzer.find_balloon_pop(text) for text in texts])
+    stage("detect_word_smuggling", lambda: [analyzer.detect_word_smuggling(text, context) for text, context in zip(texts, contexts)])
+    stage("detect_toppers", lambda: [analyzer.detect_toppers(text, prev) for text, prev in zip(texts, previous)])
+    stage("detect_trimming", lambda: [analyzer.detect_trimming_opportunities(text) for text in texts])
+
+    classifier = analyzer.AsyncStyleClassifier(StubChatClient(latency), use_cache=False)
+    stage("end_to_end", lambda: analyzer.analyze_comedy_transcript(transcript, pause_threshold, classifier))
+    result = analyzer.analyze_comedy_transcript(transcript, pause_threshold, classifier)
+    stage("serialization", lambda: json.dumps(result, indent=2))
+    return {"words": len(transcript['words']), "segments": len(segments), "stages": stages}
+
+
+def run_suite(minutes: List[float], repeat: int = 3, latency: float = 0.0, seed: int = 0) -> Dict:
+    nlp = analyzer.get_nlp()
+    analyzer.disable_default_style_cache()
+    report = {
+        "version": SUITE_VERSION,
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "spacy_model": nlp.meta.get('name') if nlp is not None else None,
+            "nlp_profile": analyzer.get_nlp_profile(),
+            "repeat": repeat,
+            "stub_latency": latency,
+            "seed": seed,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": {},
+    }
+    for length in minutes:
+        transcript = generate_set(length, seed)
+        name = f"{length:g}min"
+        report["results"][name] = time_stages(transcript, repeat, latency)
+        result = report["results"][name]
+        print(f"{name}: {result['words']:,} words, {result['segments']} bits", file=sys.stderr)
+        for stage, seconds in result["stages"].items():
+            print(f"  {stage:<22} {seconds * 1000:10.2f} ms", file=sys.stderr)
+    return report
+
+
+def compare_reports(baseline: Dict, current: Dict, threshold: float = 0.15, min_delta: float = 0.002) -> List[str]:
+    """
+    Stages that got slower than baseline by more than `threshold` (fraction) and `min_delta` seconds
+    The absolute floor keeps sub-millisecond stages from failing on timer noise. Set lengths and
+    stages in the baseline that the current report lacks count as failures too, so a stage that
+    stops being measured can't pass the gate.
+    Returns one message per regression or missing entry (empty if none)
+    """
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        now = current.get("results", {}).get(name)
+        if now is None:
+            print(f"{name:>8} {'(all stages)':<22} MISSING", file=sys.stderr)
+            regressions.append(f"{name}: missing from the current report")
+            continue
+        for stage, base_seconds in base["stages"].items():
+            seconds = now["stages"].get(stage)
+            if seconds is None:
+                print(f"{name:>8} {stage:<22} {base_seconds * 1000:10.2f} -> {'-':>10}     MISSING", file=sys.stderr)
+                regressions.append(f"{name} {stage}: missing from the current report")
+                continue
+            ratio = seconds / base_seconds if base_seconds else float('inf')
+            regressed = ratio > 1 + threshold and seconds - base_seconds > min_delta
+            marker = "REGRESSION" if regressed else ""
+            print(f"{name:>8} {stage:<22} {base_seconds * 1000:10.2f} -> {seconds * 1000:10.2f} ms  "
+                  f"{ratio:6.2f}x {marker}", file=sys.stderr)
+            if regressed:
+                regressions.append(f"{name} {stage}: {base_seconds * 1000:.2f} ms -> {seconds * 1000:.2f} ms ({ratio:.2f}x)")
+    return regressions
+
+
+def _check(baseline_path: str, current: Dict, threshold: float, min_delta_ms: float) -> int:
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    regressions = compare_reports(baseline, current, threshold, min_delta_ms / 1000)
+    if regressions:
+        print(f"{len(regressions)} stage(s) regressed beyond {threshold:.0%} or missing:", file=sys.stderr)
+        for message in regressions:
+            print(f"  {message}", file=sys.stderr)
+        return 1
+    print("No regressions", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the comedy style analyzer")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    suite = subparsers.add_parser("suite", help="Per-stage timings on synthetic sets")
+    suite.add_argument("--minutes", type=float, nargs="+", default=[5, 30, 120], help="Set lengths to generate")
+    suite.add_argument("--repeat", type=int, default=3)
+    suite.add_argument("--seed", type=int, default=0)
+    suite.add_argument("--latency", type=float, default=0.0, help="Simulated seconds per stubbed OpenAI request")
+    suite.add_argument("-o", "--output", default=None, help="Write results JSON here (default: stdout)")
+    suite.add_argument("--compare", default=None, metavar="BASELINE", help="Fail if any stage regressed vs. this run")
+    compare = subparsers.add_parser("compare", help="Compare two suite results; exits 1 on regression")
+    compare.add_argument("baseline")
+    compare.add_argument("current")
+    for command in (suite, compare):
+        command.add_argument("--threshold", type=float, default=0.15, help="Allowed slowdown per stage (0.15 = 15%%)")
+        command.add_argument("--min-delta-ms", type=float, default=2.0, help="Ignore slowdowns smaller than this")
+    syllables = subparsers.add_parser("syllables", help="Memoized batch syllable counting vs. per-word heuristic")
+    syllables.add_argument("--words", type=int, default=20000)
+    syllables.add_argument("--repeat", type=int, default=5)
+    segmentation = subparsers.add_parser("segmentation", help="Columnar vs. per-word-dict pause segmentation")
+    segmentation.add_argument("--words", type=int, default=50000)
+    segmentation.add_argument("--repeat", type=int, default=3)
+    laughs = subparsers.add_parser("laughs", help="Memory-mapped laugh detection on synthetic audio")
+    laughs.add_argument("--minutes", type=float, default=90)
+    laughs.add_argument("--sample-rate", type=int, default=16000)
+    sweep = subparsers.add_parser("sweep", help="Pause threshold slider: full re-analysis vs. PauseSweep")
+    sweep.add_argument("--minutes", type=float, default=30)
+    sweep.add_argument("--latency", type=float, default=0.3, help="Simulated seconds per stubbed OpenAI request")
+    sweep.add_argument("--steps", type=float, nargs="+", default=[round(0.5 + 0.1 * i, 1) for i in range(26)],
+                       help="Slider stops in the order they are visited (default: 0.5 to 3.0 by 0.1)")
+    resilience = subparsers.add_parser("resilience", help="Latency under OpenAI hangs and outages")
+    resilience.add_argument("--transcripts", type=int, default=12)
+    resilience.add_argument("--minutes", type=float, default=5)
+    resilience.add_argument("--latency", type=float, default=0.3, help="Simulated seconds per stubbed OpenAI request")
+    resilience.add_argument("--hang-rate", type=float, default=0.02, help="Share of calls that never answer")
+    resilience.add_argument("--outage", type=float, default=0.25, help="Share of the transcripts OpenAI is down for")
+    resilience.add_argument("--request-timeout", type=float, default=5.0)
+    resilience.add_argument("--budget", type=float, default=2.0, help="Time budget per transcript, in seconds")
+    resilience.add_argument("--reset-seconds", type=float, default=2.0, help="How long the breaker stays open")
+    resilience.add_argument("--interval", type=float, default=1.0, help="Seconds between transcript arrivals")
+    nlp = subparsers.add_parser("nlp", help="Startup, throughput and detector agreement per NLP profile")
+    nlp.add_argument("--minutes", type=float, default=30)
+    nlp.add_argument("--profiles", nargs="+", choices=analyzer.NLP_PROFILES, default=list(analyzer.NLP_PROFILES))
+    nlp.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    if args.command == "suite":
+        report = run_suite(args.minutes, args.repeat, args.latency, args.seed)
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+        if args.compare:
+            return _check(args.compare, report, args.threshold, args.min_delta_ms)
+    elif args.command == "compare":
+        with open(args.current, 'r') as f:
+            current = json.load(f)
+        return _check(args.baseline, current, args.threshold, args.min_delta_ms)
+    elif args.command == "syllables":
+        bench_syllables(args.words, args.repeat)
+    elif args.command == "segmentation":
+        bench_segmentation(args.words, args.repeat)
+    elif args.command == "laughs":
+        bench_laughs(args.minutes, args.sample_rate)
+    elif args.command == "sweep":
+        bench_sweep(args.minutes, args.latency, args.steps)
+    elif args.command == "nlp":
+        bench_nlp(args.minutes, args.profiles, args.repeat)
+    elif args.command == "resilience":
+        bench_resilience(args.transcripts, args.minutes, args.latency, args.hang_rate, args.outage,
+                         args.request_timeout, args.budget, args.reset_seconds, args.interval)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""
+Find toppers and callbacks across a library of analyzed sets
+Usage: python comedy_callbacks.py set1_analyzed.json set2_analyzed.json ... [--index premises.json] [-o links.jsonl]
+       python comedy_callbacks.py batch_results.jsonl --index premises.json
+
+Each set is linked against every set indexed before it (and against its own earlier bits), then added
+to the index, so re-running with the same --index later picks up callbacks to the whole library.
+PremiseIndex and find_callbacks() can also be used directly from Python.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import comedy_style_analyzer as analyzer
+
+_MINHASH_PRIME = (1 << 31) - 1
+
+
+@lru_cache(maxsize=65536)
+def _term_hash(term: str) -> int:
+    # Stable across processes (unlike hash()), so saved signatures stay valid
+    return int.from_bytes(hashlib.blake2b(term.encode('utf-8'), digest_size=8).digest(), 'little') % _MINHASH_PRIME
+
+
+class PremiseIndex:
+    """
+    Index of analyzed bits for finding earlier bits on the same premise (toppers and callbacks)
+    Candidates come from MinHash/LSH buckets over each bit's premise terms plus an inverted index of
+    rare terms (a bit must share min_shared of them), so a query touches a few postings instead of every
+    bit in the library. Candidates are then confirmed with the same key-word overlap rule detect_toppers()
+    uses; lower min_overlap to catch callbacks that only reuse a few words of a longer bit.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 32, max_postings: int = 200,
+                 min_overlap: float = 0.3, min_shared: int = 2, seed: int = 1):
+        """
+        Args:
+            num_perm: MinHash signature length
+            bands: LSH bands (num_perm must divide evenly); more bands catch weaker overlaps
+            max_postings: Terms in more bits than this are too common to propose candidates
+            min_overlap: Shared key words over the smaller bit's key words needed to link two bits
+            min_shared: Shared key words needed to link two bits
+            seed: Seed for the MinHash permutations (saved indexes must be queried with the same one)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        import numpy as np
+        self.num_perm, self.bands, self.max_postings, self.seed = num_perm, bands, max_postings, seed
+        self.min_overlap, self.min_shared = min_overlap, min_shared
+        self.rows = num_perm // bands
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, _MINHASH_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self.bits: List[Tuple[str, int]] = []  # (set id, segment index) per bit id
+        self.terms: List[frozenset] = []
+        self.signatures: List[Optional[Any]] = []  # MinHash signature (uint64 NumPy array) per bit
+        self._postings: Dict[str, List[int]] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.bits)
+
+    def signature(self, terms: Iterable[str]) -> Optional[Any]:
+        """MinHash signature (uint64 NumPy array) of a term set, or None if it is empty"""
+        import numpy as np
+        hashes = np.fromiter((_term_hash(term) for term in terms), dtype=np.uint64)
+        if not len(hashes):
+            return None
+        return ((self._a * hashes + self._b) % _MINHASH_PRIME).min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, signature) -> Iterator[Tuple[int, bytes]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, set_id: str, segment_index: int, text: str) -> int:
+        """Index one bit; returns its bit id"""
+        terms = analyzer.premise_terms(text)
+        return self._add(set_id, segment_index, terms, self.signature(terms))
+
+    def _add(self, set_id: str, segment_index: int, terms: frozenset, signature: Optional[Any]) -> int:
+        bit_id = len(self.bits)
+        self.bits.append((set_id, segment_index))
+        self.terms.append(terms)
+        self.signatures.append(signature)
+        for term in terms:
+            self._postings.setdefault(term, []).append(bit_id)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                self._buckets.setdefault(key, []).append(bit_id)
+        return bit_id
+
+    def candidates(self, terms: frozenset, signature: Optional[Any] = None) -> set:
+        """Bit ids that might share a premise with the given terms"""
+        shared = Counter()
+        for term in terms:
+            postings = self._postings.get(term, ())
+            if len(postings) <= self.max_postings:
+                shared.update(postings)
+        found = {bit_id for bit_id, count in shared.items() if count >= self.min_shared}
+        if signature is None:
+            signature = self.signature(terms)
+        if signature is not None:
+            for key in self._band_keys(signature):
+                found.update(self._buckets.get(key, ()))
+        return found
+
+    def query(self, text: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Find indexed bits that share a premise with text
+        Args:
+            text: Bit text
+            limit: Keep only the most similar matches
+        Returns:
+            Matches as {"set", "segment", "similarity", "shared_terms"}, most similar first
+        """
+        terms = analyzer.premise_terms(text)
+        return self._query(terms, self.signature(terms), len(self.bits), limit)
+
+    def _query(self, terms: frozenset, signature: Optional[Any], before: int,
+               limit: Optional[int] = None) -> List[Dict]:
+        matches = []
+        for bit_id in self.candidates(terms, signature):
+            if bit_id >= before or not analyzer._shares_premise(terms, self.terms[bit_id],
+                                                                self.min_overlap, self.min_shared):
+                continue
+            shared = terms & self.terms[bit_id]
+            set_id, segment_index = self.bits[bit_id]
+            matches.append({
+                "set": set_id,
+                "segment": segment_index,
+                "similarity": round(len(shared) / len(terms | self.terms[bit_id]), 3),
+                "shared_terms": sorted(shared),
+            })
+        matches.sort(key=lambda match: (-match['similarity'], match['set'], match['segment']))
+        return matches[:limit] if limit else matches
+
+    def link(self, segments: List[Dict], set_id: str, limit: Optional[int] = None) -> List[Dict]:
+        """
+        Index a set's analyzed segments in order, linking each one to earlier bits on the same premise
+        A link to the bit immediately before in the same set is a topper; anything earlier is a callback.
+        Returns:
+            Links as {"segment", "kind", "target": {"set", "segment"}, "similarity", "shared_terms"}
+        """
+        links = []
+        for index, seg in enumerate(segments):
+            terms = analyzer.premise_terms(seg['text'])
+            signature = self.signature(terms)
+            for match in self._query(terms, signature, len(self.bits), limit):
+                topper = match['set'] == set_id and match['segment'] == index - 1
+                links.append({
+                    "segment": index,
+                    "kind": "topper" if topper else "callback",
+                    "target": {"set": match['set'], "segment": match['segment']},
+                    "similarity": match['similarity'],
+                    "shared_terms": match['shared_terms'],
+                })
+            self._add(set_id, index, terms, signature)
+        return links
+
+    def save(self, path: str) -> None:
+        """Write the index as JSON (terms and signatures; postings and buckets are rebuilt on load)"""
+        data = {
+            "num_perm": self.num_perm, "bands": self.bands, "max_postings": self.max_postings,
+            "min_overlap": self.min_overlap, "min_shared": self.min_shared, "seed": self.seed,
+            "bits": [[set_id, segment_index, sorted(terms), None if signature is None else signature.tolist()]
+                     for (set_id, segment_index), terms, signature in zip(self.bits, self.terms, self.signatures)],
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'PremiseIndex':
+        with open(path, 'r') as f:
+            data = json.load(f)
+        import numpy as np
+        index = cls(data['num_perm'], data['bands'], data['max_postings'],
+                    data['min_overlap'], data['min_shared'], data['seed'])
+        for set_id, segment_index, terms, signature in data['bits']:
+            index._add(set_id, segment_index, frozenset(terms),
+                       None if signature is None else np.array(signature, dtype=np.uint32))
+        return index
+
+
+def find_callbacks(result: Dict, index: Optional[PremiseIndex] = None, set_id: str = "current",
+                   limit: Optional[int] = None) -> List[Dict]:
+    """
+    Topper/callback links for an analyzed transcript
+    Args:
+        result: Output of analyze_comedy_transcript()
+        index: Library of earlier sets to search too; the set is added to it. A fresh index finds
+            links within the set only
+        set_id: Name recorded for this set in the index (e.g. its file path)
+        limit: Keep only the most similar earlier bits per segment
+    Returns:
+        List of links (see PremiseIndex.link)
+    """
+    if index is None:
+        index = PremiseIndex()
+    return index.link(result['segments'], set_id, limit)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Link bits to earlier bits on the same premise")
+    parser.add_argument("inputs", nargs="+", help="Analyzed transcript files (any --format) or batch JSONL output")
+    parser.add_argument("--index", default=None,
+                        help="Premise index to search and extend (created if missing; in-memory if omitted)")
+    parser.add_argument("-o", "--output", default=None, help="Write links as JSONL here (default: stdout)")
+    parser.add_argument("--limit", type=int, default=None, help="Most similar earlier bits to keep per segment")
+    parser.add_argument("--callbacks-only", action="store_true", help="Skip links to the immediately preceding bit")
+    args = parser.parse_args(argv)
+
+    if args.index and os.path.exists(args.index):
+        index = PremiseIndex.load(args.index)
+    else:
+        index = PremiseIndex()
+    print(f"Premise index holds {len(index)} bits", file=sys.stderr)
+
+    indexed = {set_id for set_id, _ in index.bits}
+    out = open(args.output, 'w') if args.output else sys.stdout
+    total = 0
+    try:
+        for path in args.inputs:
+            for set_id, result in analyzer.iter_results(path):
+                if set_id in indexed:
+                    print(f"Skipping {set_id}: already indexed", file=sys.stderr)
+                    continue
+                indexed.add(set_id)
+                for link in find_callbacks(result, index, set_id, args.limit):
+                    if args.callbacks_only and link['kind'] == 'topper':
+                        continue
+                    out.write(json.dumps(dict(link, set=set_id)) + '\n')
+                    total += 1
+    finally:
+        if args.output:
+            out.close()
+
+    if args.index:
+        index.save(args.index)
+    print(f"Found {total} links; index now holds {len(index)} bits", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
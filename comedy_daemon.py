@@ -0,0 +1,186 @@
+"""
+Analyzer daemon: keep the Spacy model warm and answer newline-delimited JSON requests
+Usage: python comedy_style_analyzer.py --daemon [--socket /tmp/comedy-analyzer.sock]
+
+Requests are read from stdin (responses go to stdout) or from clients of a Unix socket; see
+handle_daemon_request() for the protocol. Analyses run one at a time, and totals across every request
+are kept for the "metrics" op.
+"""
+
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterator, Optional
+
+import comedy_style_analyzer as analyzer
+
+_analysis_lock = threading.Lock()
+_daemon_metrics = analyzer.Instrumentation()  # Totals across every request, served by the "metrics" op
+_daemon_sweeps = OrderedDict()  # "sweep" key -> PauseSweep, least recently used first
+DAEMON_MAX_SWEEPS = 8
+
+
+def handle_daemon_request(request: Dict) -> Dict:
+    """
+    Answer one daemon request
+    Requests:  {"id": 1, "transcript": {"text": ..., "words": [...]}, "pause_threshold": 1.5}
+               (add "previous_result": {...} to re-analyze only the bits that changed,
+               "timings": true for a timings block in the result)
+               {"id": 2, "sweep": "set-42", "transcript": {...}, "pause_threshold": 1.5}
+               {"id": 3, "sweep": "set-42", "pause_threshold": 2.0}
+               (threshold tuning: the daemon keeps a PauseSweep per key, so later requests can omit
+               the transcript and only bits new to that threshold are analyzed)
+               {"id": 4, "op": "ping"}
+               {"id": 5, "op": "metrics"}  (Prometheus text for all requests so far)
+               Transcript requests may add "time_budget": seconds (see analyze_comedy_transcript()) and
+               "progressive": true (see iter_daemon_responses()). Sweep requests reject "time_budget":
+               a PauseSweep keeps every bit's scores, so fallbacks would be served for the whole session.
+    Responses: {"id": 1, "ok": true, "elapsed_ms": 12.3, "result": {...}}
+               {"id": 1, "ok": false, "error": "..."}
+    """
+    request_id = request.get('id')
+    op = request.get('op', 'analyze')
+    if op == 'ping':
+        return {"id": request_id, "ok": True, "pong": True}
+    if op == 'metrics':
+        return {"id": request_id, "ok": True, "metrics": _daemon_metrics.prometheus()}
+    if op != 'analyze':
+        return {"id": request_id, "ok": False, "error": f"Unknown op: {op}"}
+
+    transcript = request.get('transcript')
+    sweep_key = request.get('sweep')
+    if not isinstance(transcript, dict) and not (sweep_key is not None and sweep_key in _daemon_sweeps):
+        return {"id": request_id, "ok": False, "error": "Request needs a 'transcript' object"}
+    if sweep_key is not None and request.get('time_budget') is not None:
+        return {"id": request_id, "ok": False, "error": "'time_budget' is not supported for sweep requests"}
+
+    started = time.perf_counter()
+    try:
+        pause_threshold = float(request.get('pause_threshold', 1.5))
+        timings = bool(request.get('timings'))
+        time_budget = request.get('time_budget')
+        time_budget = None if time_budget is None else float(time_budget)
+        # Spacy pipelines aren't guaranteed thread-safe, so socket clients take turns
+        with _analysis_lock, analyzer.instrument(_daemon_metrics):
+            analyzer._count('daemon_requests')
+            if sweep_key is not None:
+                if isinstance(transcript, dict):
+                    _daemon_sweeps[sweep_key] = analyzer.PauseSweep(transcript)
+                _daemon_sweeps.move_to_end(sweep_key)
+                while len(_daemon_sweeps) > DAEMON_MAX_SWEEPS:
+                    _daemon_sweeps.popitem(last=False)
+                result = _daemon_sweeps[sweep_key].analyze(pause_threshold, timings=timings)
+            elif request.get('previous_result'):
+                result = analyzer.analyze_comedy_transcript_incremental(request['previous_result'], transcript,
+                                                                        pause_threshold, timings=timings,
+                                                                        time_budget=time_budget)
+            else:
+                result = analyzer.analyze_comedy_transcript(transcript, pause_threshold, timings=timings,
+                                                            time_budget=time_budget)
+    except Exception as e:
+        _daemon_metrics.count('daemon_errors')
+        return {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {
+        "id": request_id,
+        "ok": True,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 2),
+        "result": result,
+    }
+
+
+def iter_daemon_responses(request: Dict) -> Iterator[Dict]:
+    """
+    handle_daemon_request(), except that a transcript request with "progressive": true is answered
+    with analyze_comedy_transcript_progressive(): a response per improvement, each marked "partial": true
+    except the last (the complete result, whose "progress" block has "done": true)
+    """
+    transcript = request.get('transcript')
+    if not (request.get('progressive') and request.get('op', 'analyze') == 'analyze' and isinstance(transcript, dict)
+            and request.get('sweep') is None and not request.get('previous_result')):
+        yield handle_daemon_request(request)
+        return
+    request_id = request.get('id')
+    started = time.perf_counter()
+    try:
+        pause_threshold = float(request.get('pause_threshold', 1.5))
+        time_budget = request.get('time_budget')
+        time_budget = None if time_budget is None else float(time_budget)
+        timings = bool(request.get('timings'))
+        with _analysis_lock, analyzer.instrument(_daemon_metrics):
+            analyzer._count('daemon_requests')
+            for result in analyzer.analyze_comedy_transcript_progressive(transcript, pause_threshold,
+                                                                         time_budget=time_budget, timings=timings):
+                response = {"id": request_id, "ok": True,
+                            "elapsed_ms": round((time.perf_counter() - started) * 1000, 2), "result": result}
+                if not result['progress']['done']:
+                    response['partial'] = True
+                yield response
+    except Exception as e:
+        _daemon_metrics.count('daemon_errors')
+        yield {"id": request_id, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+
+def serve_daemon_stream(lines, write) -> None:
+    """Read one JSON request per line and write one JSON response line for each (several for progressive requests)"""
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            responses = [{"id": None, "ok": False, "error": f"Invalid request: {e}"}]
+        else:
+            responses = iter_daemon_responses(request)
+        for response in responses:
+            with _daemon_metrics.stage("serialization"):
+                data = analyzer.dumps_compact(response).decode('utf-8') + '\n'
+            write(data)
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        def write(data: str) -> None:
+            self.wfile.write(data.encode('utf-8'))
+            self.wfile.flush()
+        serve_daemon_stream(self.rfile, write)
+
+
+class _ThreadingUnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def run_daemon(socket_path: Optional[str] = None) -> None:
+    """
+    Run the analyzer as a long-lived process with the model loaded up front
+    Args:
+        socket_path: Listen on this Unix socket; when None, serve requests from stdin to stdout
+    """
+    analyzer.get_nlp()
+    analyzer.get_openai_api_key()
+
+    if socket_path is None:
+        analyzer._status("🎤 Analyzer daemon ready on stdin (one JSON request per line)")
+
+        def write(data: str) -> None:
+            sys.stdout.write(data)
+            sys.stdout.flush()
+        serve_daemon_stream(sys.stdin, write)
+        return
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)  # Stale socket from a previous run
+    with _ThreadingUnixServer(socket_path, _DaemonRequestHandler) as server:
+        analyzer._status(f"🎤 Analyzer daemon listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
@@ -0,0 +1,548 @@
+"""
+Searchable library of analyzed sets, stored in SQLite
+Usage: python comedy_library.py ingest set1_analyzed.json batch_results.jsonl ... [--db comedy_library.sqlite3]
+       python comedy_library.py bits --style Sarcasm=0.7 --detected seesaw --since 30d
+       python comedy_library.py bits --text "airport OR uber" --count
+       python comedy_library.py styles --since 2026-01-01
+       python comedy_library.py sets
+       python comedy_library.py stats set1_analyzed.json
+
+Segments go into normalized tables (one row per bit, one per non-zero style score) with a full-text
+index over bit text, and each set's overall_statistics are stored as rollups at ingest time, so
+filters and library-wide totals never re-read the result files.
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import comedy_style_analyzer as analyzer
+
+DEFAULT_LIBRARY_PATH = os.getenv("COMEDY_LIBRARY", "comedy_library.sqlite3")
+
+# Detector flags, as stored on segments; the short names are what queries and the CLI accept
+DETECTIONS = {
+    "seesaw": "seesaw_detected",
+    "balloon_pop": "balloon_pop_detected",
+    "word_smuggling": "word_smuggling_detected",
+    "topper": "topper_detected",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sets (
+    id INTEGER PRIMARY KEY,
+    source TEXT NOT NULL UNIQUE,
+    set_date REAL NOT NULL,
+    ingested_at REAL NOT NULL,
+    total_segments INTEGER NOT NULL,
+    total_syllables INTEGER NOT NULL,
+    seesaw_detections INTEGER NOT NULL,
+    balloon_pop_detections INTEGER NOT NULL,
+    word_smuggling_detections INTEGER NOT NULL,
+    topper_detections INTEGER NOT NULL,
+    total_laughs INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sets_date ON sets(set_date);
+
+CREATE TABLE IF NOT EXISTS styles (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+-- Rollup: how many of a set's bits each style applies to (ranked as in most_common_styles) and its score total
+CREATE TABLE IF NOT EXISTS set_styles (
+    set_id INTEGER NOT NULL REFERENCES sets(id) ON DELETE CASCADE,
+    style_id INTEGER NOT NULL REFERENCES styles(id),
+    bits INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (set_id, style_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    set_id INTEGER NOT NULL REFERENCES sets(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    start_time REAL NOT NULL,
+    end_time REAL NOT NULL,
+    syllable_count INTEGER NOT NULL,
+    seesaw_detected INTEGER NOT NULL,
+    balloon_pop_detected INTEGER NOT NULL,
+    word_smuggling_detected INTEGER NOT NULL,
+    topper_detected INTEGER NOT NULL,
+    laugh_count INTEGER,
+    bloom_efficiency_score REAL,
+    trimming_opportunities TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_segments_set ON segments(set_id, position);
+CREATE INDEX IF NOT EXISTS idx_segments_seesaw ON segments(set_id) WHERE seesaw_detected;
+CREATE INDEX IF NOT EXISTS idx_segments_balloon_pop ON segments(set_id) WHERE balloon_pop_detected;
+CREATE INDEX IF NOT EXISTS idx_segments_word_smuggling ON segments(set_id) WHERE word_smuggling_detected;
+CREATE INDEX IF NOT EXISTS idx_segments_topper ON segments(set_id) WHERE topper_detected;
+
+-- Only non-zero scores are stored; a missing row means 0
+CREATE TABLE IF NOT EXISTS segment_styles (
+    segment_id INTEGER NOT NULL REFERENCES segments(id) ON DELETE CASCADE,
+    style_id INTEGER NOT NULL REFERENCES styles(id),
+    score REAL NOT NULL,
+    PRIMARY KEY (segment_id, style_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_segment_styles_score ON segment_styles(style_id, score);
+"""
+
+# Full-text index over bit text, backed by the segments table (SQLite builds without FTS5 fall back to LIKE)
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS segment_text USING fts5(
+    text, content='segments', content_rowid='id', tokenize='porter unicode61'
+)
+"""
+
+STYLE_THRESHOLD = 0.3  # A style applies to a bit above this score, as in each segment's "styles"
+
+
+def parse_date(value: Union[str, float, datetime, None]) -> Optional[float]:
+    """
+    Timestamp for a date filter: a datetime, epoch seconds, an ISO date ("2026-09-01"),
+    or an age like "30d", "12h" or "2w" counted back from now
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    if isinstance(value, datetime):
+        return value.timestamp()
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)([hdw])', value.strip())
+    if match:
+        amount, unit = float(match.group(1)), match.group(2)
+        hours = {"h": 1, "d": 24, "w": 24 * 7}[unit] * amount
+        return (datetime.now() - timedelta(hours=hours)).timestamp()
+    return datetime.fromisoformat(value.strip()).timestamp()
+
+
+def _style_name(name: str) -> str:
+    for style in analyzer.COMEDY_STYLES:
+        if style.lower() == name.lower():
+            return style
+    raise ValueError(f"Unknown style: {name} (expected one of {', '.join(analyzer.COMEDY_STYLES)})")
+
+
+class ComedyLibrary:
+    """
+    SQLite index of analyzed sets
+    Filters shared by bits(), count_bits() and style_counts():
+        text: Full-text query over bit text (FTS5 syntax: words, "phrases", OR, NOT, prefix*)
+        styles: Style name -> score a bit must be above (e.g. {"Sarcasm": 0.7})
+        detected: Detector names that must have fired (keys of DETECTIONS)
+        since, until: Set date bounds (see parse_date)
+        sources: Only bits from these sets
+    """
+
+    def __init__(self, path: str = DEFAULT_LIBRARY_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        try:
+            self._conn.execute(FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            self.full_text = False
+        self._conn.executemany("INSERT OR IGNORE INTO styles (name) VALUES (?)",
+                               [(style,) for style in analyzer.COMEDY_STYLES])
+        self._conn.commit()
+        self._style_ids = dict(self._conn.execute("SELECT name, id FROM styles"))
+
+    def close(self) -> None:
+        self._conn.execute("PRAGMA optimize")
+        self._conn.close()
+
+    def __enter__(self) -> 'ComedyLibrary':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+
+    # Ingestion
+
+    def _style_id(self, name: str) -> int:
+        if name not in self._style_ids:
+            self._style_ids[name] = self._conn.execute("INSERT INTO styles (name) VALUES (?)", (name,)).lastrowid
+        return self._style_ids[name]
+
+    def _delete_set(self, set_id: int) -> None:
+        if self.full_text:
+            self._conn.execute("INSERT INTO segment_text (segment_text, rowid, text) "
+                               "SELECT 'delete', id, text FROM segments WHERE set_id = ?", (set_id,))
+        self._conn.execute("DELETE FROM sets WHERE id = ?", (set_id,))
+
+    def add(self, source: str, result: Dict, set_date: Optional[float] = None, commit: bool = True) -> int:
+        """
+        Store one analysis result under source (replacing whatever was stored under it before)
+        Args:
+            source: Name of the set, usually the result or transcript path
+            result: Analysis result dictionary
+            set_date: When the set happened (epoch seconds); defaults to now
+            commit: Commit right away (ingest() commits once for a whole batch)
+        Returns:
+            Number of segments stored
+        """
+        segments = result.get('segments', [])
+        statistics = analyzer.OverallStatistics()
+        for seg in segments:
+            statistics.add(seg)
+        score_sums = Counter()
+        for seg in segments:
+            score_sums.update(seg.get('style_scores', {}))
+        laughs = [seg.get('laugh_count') for seg in segments]
+        total_laughs = sum(laughs) if laughs and None not in laughs else None
+
+        conn = self._conn
+        existing = conn.execute("SELECT id FROM sets WHERE source = ?", (source,)).fetchone()
+        if existing:
+            self._delete_set(existing[0])
+        set_id = conn.execute(
+            "INSERT INTO sets (source, set_date, ingested_at, total_segments, total_syllables, seesaw_detections, "
+            "balloon_pop_detections, word_smuggling_detections, topper_detections, total_laughs) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (source, set_date if set_date is not None else time.time(), time.time(),
+             statistics.total_segments, statistics.total_syllables,
+             *(statistics.detections[field] for field, _ in analyzer.DETECTION_COUNTS), total_laughs)).lastrowid
+        ranked = [style for style, _ in statistics.styles.most_common()]
+        ranked += [style for style in score_sums if style not in statistics.styles and score_sums[style] > 0]
+        conn.executemany("INSERT INTO set_styles (set_id, style_id, bits, score_sum, rank) VALUES (?, ?, ?, ?, ?)",
+                         [(set_id, self._style_id(style), statistics.styles[style], score_sums[style], rank)
+                          for rank, style in enumerate(ranked)])
+
+        (first_id,) = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM segments").fetchone()
+        rows, scores = [], []
+        for position, seg in enumerate(segments):
+            segment_id = first_id + position
+            rows.append((segment_id, set_id, position, seg['text'], seg['start_time'], seg['end_time'],
+                         seg['syllable_count'], *(bool(seg[flag]) for flag in DETECTIONS.values()),
+                         seg.get('laugh_count'), seg.get('bloom_efficiency_score'),
+                         json.dumps(seg.get('trimming_opportunities', []))))
+            scores.extend((segment_id, self._style_id(style), score)
+                          for style, score in seg.get('style_scores', {}).items() if score > 0)
+        conn.executemany(f"INSERT INTO segments VALUES ({', '.join('?' * 14)})", rows)
+        conn.executemany("INSERT INTO segment_styles (segment_id, style_id, score) VALUES (?, ?, ?)", scores)
+        if self.full_text:
+            conn.execute("INSERT INTO segment_text (rowid, text) SELECT id, text FROM segments WHERE set_id = ?",
+                         (set_id,))
+        if commit:
+            conn.commit()
+        return len(rows)
+
+    def ingest(self, paths: Iterable[str], set_date: Optional[float] = None) -> Dict[str, int]:
+        """
+        Add every result in the given files (any --format, or --batch JSONL output) in one transaction
+        Each set is dated set_date if given, else by the modification time of its transcript
+        (when the file still exists) or of the file it was read from.
+        Returns:
+            Counts of sets and segments stored
+        """
+        stats = Counter()
+        for path in paths:
+            for source, result in analyzer.iter_results(path):
+                date = set_date
+                if date is None:
+                    date = os.path.getmtime(source if source != path and os.path.exists(source) else path)
+                stats['segments'] += self.add(source, result, date, commit=False)
+                stats['sets'] += 1
+        self._conn.execute("ANALYZE")
+        self._conn.commit()
+        return dict(stats)
+
+    def remove(self, source: str) -> bool:
+        existing = self._conn.execute("SELECT id FROM sets WHERE source = ?", (source,)).fetchone()
+        if existing:
+            self._delete_set(existing[0])
+            self._conn.commit()
+        return existing is not None
+
+    # Queries
+
+    def _set_where(self, since=None, until=None, sources: Optional[Iterable[str]] = None) -> Tuple[List[str], list]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("set_date >= ?")
+            params.append(parse_date(since))
+        if until is not None:
+            clauses.append("set_date < ?")
+            params.append(parse_date(until))
+        if sources is not None:
+            sources = list(sources)
+            clauses.append(f"source IN ({', '.join('?' * len(sources))})")
+            params += sources
+        return clauses, params
+
+    def _where(self, text: Optional[str] = None, styles: Optional[Dict[str, float]] = None,
+               detected: Optional[Iterable[str]] = None, since=None, until=None,
+               sources: Optional[Iterable[str]] = None) -> Tuple[str, list]:
+        """WHERE clause (over segments aliased "s") and parameters for the shared filters"""
+        clauses, params = [], []
+        if text:
+            if self.full_text:
+                clauses.append("s.id IN (SELECT rowid FROM segment_text WHERE segment_text MATCH ?)")
+                params.append(text)
+            else:
+                clauses.append("s.text LIKE ?")
+                params.append(f"%{text}%")
+        for style, minimum in (styles or {}).items():
+            clauses.append("s.id IN (SELECT segment_id FROM segment_styles WHERE style_id = ? AND score > ?)")
+            params += [self._style_ids.get(_style_name(style), -1), minimum]
+        for name in detected or ():
+            if name not in DETECTIONS:
+                raise ValueError(f"Unknown detection: {name} (expected one of {', '.join(DETECTIONS)})")
+            clauses.append(f"s.{DETECTIONS[name]}")
+        set_clauses, set_params = self._set_where(since, until, sources)
+        if set_clauses:
+            clauses.append(f"s.set_id IN (SELECT id FROM sets WHERE {' AND '.join(set_clauses)})")
+            params += set_params
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def bits(self, limit: Optional[int] = 100, **filters) -> List[Dict]:
+        """Matching bits, newest set first and in running order within a set, with their non-zero style scores"""
+        where, params = self._where(**filters)
+        rows = self._conn.execute(
+            "SELECT s.id, sets.source, sets.set_date, s.position, s.text, s.start_time, s.end_time, "
+            f"s.syllable_count, {', '.join('s.' + flag for flag in DETECTIONS.values())}, s.laugh_count, "
+            "s.bloom_efficiency_score, s.trimming_opportunities "
+            f"FROM segments s JOIN sets ON sets.id = s.set_id{where} "
+            "ORDER BY sets.set_date DESC, s.set_id, s.position" + (" LIMIT ?" if limit is not None else ""),
+            params + ([limit] if limit is not None else [])).fetchall()
+        style_names = {style_id: name for name, style_id in self._style_ids.items()}
+        scores = {}
+        ids = [row[0] for row in rows]
+        for i in range(0, len(ids), 500):  # Stay under SQLite's bound-parameter limit
+            chunk = ids[i:i + 500]
+            for segment_id, style_id, score in self._conn.execute(
+                    "SELECT segment_id, style_id, score FROM segment_styles "
+                    f"WHERE segment_id IN ({', '.join('?' * len(chunk))})", chunk):
+                scores.setdefault(segment_id, {})[style_names[style_id]] = score
+
+        bits = []
+        for segment_id, source, set_date, position, text, start, end, syllables, *rest in rows:
+            flags, (laughs, bloom, trimming) = rest[:len(DETECTIONS)], rest[len(DETECTIONS):]
+            style_scores = scores.get(segment_id, {})
+            bit = {
+                "set": source,
+                "set_date": datetime.fromtimestamp(set_date).isoformat(timespec='seconds'),
+                "position": position,
+                "text": text,
+                "start_time": start,
+                "end_time": end,
+                "syllable_count": syllables,
+                "styles": [style for style, score in sorted(style_scores.items(), key=lambda x: x[1], reverse=True)
+                           if score > STYLE_THRESHOLD],
+                "style_scores": style_scores,
+            }
+            bit.update((flag, bool(value)) for flag, value in zip(DETECTIONS.values(), flags))
+            bit.update(laugh_count=laughs, bloom_efficiency_score=bloom, trimming_opportunities=json.loads(trimming))
+            bits.append(bit)
+        return bits
+
+    def count_bits(self, **filters) -> int:
+        where, params = self._where(**filters)
+        return self._conn.execute(f"SELECT COUNT(*) FROM segments s{where}", params).fetchone()[0]
+
+    def style_counts(self, threshold: float = STYLE_THRESHOLD, **filters) -> List[Dict]:
+        """
+        Per style, over the matching bits: how many it applies to (score above threshold) and its mean score
+        Sorted by bit count, most common first. Filtering only by set (dates, sources) at the default
+        threshold reads the per-set rollups instead of the bits.
+        """
+        set_filters = {key: filters.pop(key) for key in ('since', 'until', 'sources') if key in filters}
+        if threshold == STYLE_THRESHOLD and not any(filters.values()):
+            set_clauses, params = self._set_where(**set_filters)
+            where = f" WHERE {' AND '.join(set_clauses)}" if set_clauses else ""
+            (total,) = self._conn.execute(f"SELECT COALESCE(SUM(total_segments), 0) FROM sets{where}",
+                                          params).fetchone()
+            rows = self._conn.execute(
+                "SELECT st.name, SUM(ss.bits), SUM(ss.score_sum) FROM set_styles ss "
+                f"JOIN styles st ON st.id = ss.style_id WHERE ss.set_id IN (SELECT id FROM sets{where}) "
+                "GROUP BY ss.style_id", params).fetchall()
+        else:
+            filters.update(set_filters)
+            where, params = self._where(**filters)
+            total = self.count_bits(**filters)
+            rows = self._conn.execute(
+                "SELECT st.name, SUM(ss.score > ?), SUM(ss.score) FROM segments s "
+                "JOIN segment_styles ss ON ss.segment_id = s.id JOIN styles st ON st.id = ss.style_id"
+                f"{where} GROUP BY ss.style_id", [threshold] + params).fetchall()
+        counts = [{"style": name, "bits": bits, "mean_score": round(score_sum / total, 4) if total else 0.0}
+                  for name, bits, score_sum in rows if bits or score_sum]
+        return sorted(counts, key=lambda x: (-x['bits'], x['style']))
+
+    def sets(self, since=None, until=None) -> List[Dict]:
+        """Every set in the date range (newest first) with its rollup totals"""
+        clauses, params = self._set_where(since, until)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        cursor = self._conn.execute(
+            "SELECT source, set_date, total_segments, total_syllables, "
+            f"{', '.join(field for field, _ in analyzer.DETECTION_COUNTS)}, total_laughs "
+            f"FROM sets{where} ORDER BY set_date DESC, source", params)
+        names = [column[0] for column in cursor.description]
+        sets = []
+        for row in cursor:
+            record = dict(zip(names, row))
+            record['set_date'] = datetime.fromtimestamp(record['set_date']).isoformat(timespec='seconds')
+            sets.append(record)
+        return sets
+
+    def statistics(self, source: Optional[str] = None, since=None, until=None, top: int = 5) -> Dict:
+        """
+        overall_statistics for one set (identical to the block in its result), or summed over every set
+        in the date range, read from the ingest-time rollups
+        """
+        clauses, params = self._set_where(since, until, [source] if source is not None else None)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        detection_fields = [field for field, _ in analyzer.DETECTION_COUNTS]
+        row = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(total_segments), 0), COALESCE(SUM(total_syllables), 0), "
+            f"{', '.join(f'COALESCE(SUM({field}), 0)' for field in detection_fields)} FROM sets{where}",
+            params).fetchone()
+        if source is not None and row[0] == 0:
+            raise KeyError(f"No set named {source} in {self.path}")
+        # Ties keep each set's own ranking, so a single set reproduces most_common_styles exactly
+        styles = self._conn.execute(
+            "SELECT st.name, SUM(ss.bits) FROM set_styles ss JOIN styles st ON st.id = ss.style_id "
+            f"WHERE ss.set_id IN (SELECT id FROM sets{where}) GROUP BY ss.style_id HAVING SUM(ss.bits) > 0 "
+            "ORDER BY SUM(ss.bits) DESC, MIN(ss.rank), st.name LIMIT ?", params + [top]).fetchall()
+        stats = {
+            "total_segments": row[1],
+            "total_syllables": row[2],
+            "most_common_styles": [(name, bits) for name, bits in styles],
+        }
+        stats.update(zip(detection_fields, row[3:]))
+        if source is None:
+            stats = dict(sets=row[0], **stats)
+        return stats
+
+
+def _parse_styles(values: List[str]) -> Dict[str, float]:
+    styles = {}
+    for value in values:
+        name, _, minimum = value.rpartition('=')
+        if not name:
+            name, minimum = value, STYLE_THRESHOLD
+        styles[_style_name(name)] = float(minimum)
+    return styles
+
+
+def _print_bits(bits: List[Dict]) -> None:
+    for bit in bits:
+        tools = [name for name, flag in DETECTIONS.items() if bit[flag]]
+        scores = ', '.join(f"{style} {bit['style_scores'][style]:.2f}" for style in bit['styles'])
+        print(f"{bit['set']} #{bit['position']} ({bit['set_date'][:10]}, {bit['start_time']:.0f}s) "
+              f"[{scores}]{' ' + ', '.join(tools) if tools else ''}")
+        text = bit['text'] if len(bit['text']) <= 160 else bit['text'][:157] + '...'
+        print(f"  {text}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Index analyzed sets in SQLite and query them")
+    parser.add_argument("--db", default=DEFAULT_LIBRARY_PATH,
+                        help="Library database (default: COMEDY_LIBRARY or comedy_library.sqlite3)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest = subparsers.add_parser("ingest", help="Add analysis results (re-adding a set replaces it)")
+    ingest.add_argument("inputs", nargs="+", help="Analyzed transcript files (any --format) or batch JSONL output")
+    ingest.add_argument("--date", default=None,
+                        help="Date of the sets (default: transcript or result file modification time)")
+
+    bits = subparsers.add_parser("bits", help="Find bits")
+    bits.add_argument("--text", default=None, help='Full-text query, e.g. airport, "toilet paper", dat*')
+    bits.add_argument("--style", action="append", default=[], metavar="STYLE[=SCORE]",
+                      help=f"Style score must be above SCORE (default {STYLE_THRESHOLD}); repeatable")
+    bits.add_argument("--detected", action="append", default=[], choices=list(DETECTIONS),
+                      help="Detector that must have fired; repeatable")
+    bits.add_argument("--set", action="append", default=None, dest="sources", help="Only this set; repeatable")
+    bits.add_argument("--limit", type=int, default=20)
+    bits.add_argument("--count", action="store_true", help="Only print how many bits match")
+    bits.add_argument("--by-style", action="store_true", help="Print per-style counts over the matching bits")
+
+    styles = subparsers.add_parser("styles", help="Style counts and totals across sets")
+    sets = subparsers.add_parser("sets", help="List sets with their totals")
+    stats = subparsers.add_parser("stats", help="overall_statistics of one set")
+    stats.add_argument("source")
+    for command in (bits, styles, sets):
+        command.add_argument("--since", default=None, help='Set date lower bound: "30d", "2w", "2026-09-01"')
+        command.add_argument("--until", default=None, help="Set date upper bound (exclusive)")
+    for command in (ingest, bits, styles, sets):
+        command.add_argument("--json", action="store_true", help="Print JSON")
+    args = parser.parse_args(argv)
+
+    with ComedyLibrary(args.db) as library:
+        if args.command == "ingest":
+            started = time.perf_counter()
+            counts = library.ingest(args.inputs, parse_date(args.date))
+            if args.json:
+                print(json.dumps(counts))
+            else:
+                print(f"Stored {counts.get('sets', 0)} sets ({counts.get('segments', 0)} bits) in "
+                      f"{time.perf_counter() - started:.1f}s; {args.db} now holds {len(library)} bits")
+            return 0
+
+        if args.command == "bits":
+            try:
+                filters = dict(text=args.text, styles=_parse_styles(args.style), detected=args.detected,
+                               since=args.since, until=args.until, sources=args.sources)
+                if args.count:
+                    output = {"bits": library.count_bits(**filters)}
+                elif args.by_style:
+                    output = library.style_counts(**filters)
+                else:
+                    output = library.bits(limit=args.limit, **filters)
+            except (ValueError, sqlite3.OperationalError) as e:  # Unknown style, bad date or full-text syntax
+                parser.error(str(e))
+            if args.json:
+                print(json.dumps(output, indent=2))
+            elif args.count:
+                print(output['bits'])
+            elif args.by_style:
+                for row in output:
+                    print(f"  {row['style']}: {row['bits']} bits (mean score {row['mean_score']:.2f})")
+            else:
+                _print_bits(output)
+        elif args.command == "styles":
+            output = library.statistics(since=args.since, until=args.until, top=len(analyzer.COMEDY_STYLES))
+            if args.json:
+                print(json.dumps(output, indent=2))
+            else:
+                print(f"{output['sets']} sets, {output['total_segments']} bits, {output['total_syllables']} syllables")
+                for field, _ in analyzer.DETECTION_COUNTS:
+                    print(f"  {field.replace('_', ' ').capitalize()}: {output[field]}")
+                for style, count in output['most_common_styles']:
+                    print(f"  {style}: {count} bits")
+        elif args.command == "sets":
+            output = library.sets(args.since, args.until)
+            if args.json:
+                print(json.dumps(output, indent=2))
+            else:
+                for record in output:
+                    print(f"{record['set_date'][:10]}  {record['source']}: {record['total_segments']} bits, "
+                          f"{record['total_syllables']} syllables")
+        elif args.command == "stats":
+            try:
+                print(json.dumps(library.statistics(args.source), indent=2))
+            except KeyError as e:
+                print(f"❌ {e.args[0]}", file=sys.stderr)
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
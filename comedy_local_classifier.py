@@ -0,0 +1,196 @@
+"""
+Local style classifier: TF-IDF features and a linear multi-label model trained on OpenAI labels,
+so bits can be scored offline (train one with comedy_style_model.py). Feature matrices are kept
+sparse (CSR arrays) and products with the weight matrix are gathers plus np.add.reduceat, which
+scores a whole transcript in one pass. NumPy is imported on first use.
+"""
+
+import hashlib
+import json
+import re
+import time
+from collections import Counter
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from comedy_styles import COMEDY_STYLES
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+class SparseRows(NamedTuple):
+    """Row-compressed sparse matrix (NumPy arrays): row i's nonzeros are indices/values[indptr[i]:indptr[i + 1]]"""
+    indices: Any
+    values: Any
+    indptr: Any
+
+    def dot(self, weights):
+        """(rows x features) @ (features x k)"""
+        import numpy as np
+        out = np.zeros((len(self.indptr) - 1, weights.shape[1]), dtype=weights.dtype)
+        starts = self.indptr[:-1]
+        nonempty = starts < self.indptr[1:]
+        if nonempty.any():
+            out[nonempty] = np.add.reduceat(weights[self.indices] * self.values[:, None], starts[nonempty], axis=0)
+        return out
+
+
+class TfidfFeaturizer:
+    """Word unigram + bigram TF-IDF (sublinear tf, smoothed idf, L2-normalized rows)"""
+
+    def __init__(self, vocabulary: Dict[str, int], idf, ngram_max: int = 2):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.ngram_max = ngram_max
+
+    @staticmethod
+    def terms(text: str, ngram_max: int = 2) -> List[str]:
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        terms = list(tokens)
+        for n in range(2, ngram_max + 1):
+            terms.extend(' '.join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return terms
+
+    @classmethod
+    def fit(cls, texts: List[str], min_df: int = 2, max_features: int = 50000, ngram_max: int = 2) -> 'TfidfFeaturizer':
+        import numpy as np
+        document_frequency = Counter()
+        for text in texts:
+            document_frequency.update(set(cls.terms(text, ngram_max)))
+        kept = [(term, df) for term, df in document_frequency.items() if df >= min_df]
+        kept.sort(key=lambda item: (-item[1], item[0]))
+        kept = kept[:max_features]
+        vocabulary = {term: i for i, (term, _) in enumerate(kept)}
+        df = np.array([df for _, df in kept], dtype=np.float32)
+        idf = np.log((1 + len(texts)) / (1 + df)) + 1
+        return cls(vocabulary, idf.astype(np.float32), ngram_max)
+
+    def transform(self, texts: List[str]) -> SparseRows:
+        import numpy as np
+        vocabulary = self.vocabulary
+        indices, counts, indptr = [], [], [0]
+        for text in texts:
+            row = Counter(vocabulary[term] for term in self.terms(text, self.ngram_max) if term in vocabulary)
+            indices.extend(row.keys())
+            counts.extend(row.values())
+            indptr.append(len(indices))
+        indices = np.array(indices, dtype=np.int32)
+        indptr = np.array(indptr, dtype=np.int64)
+        values = (1 + np.log(np.array(counts, dtype=np.float32))) * self.idf[indices]
+        # L2-normalize each row
+        row_of = np.repeat(np.arange(len(texts)), np.diff(indptr))
+        norms = np.sqrt(np.bincount(row_of, weights=values * values, minlength=len(texts)))
+        values = (values / norms[row_of]).astype(np.float32)
+        return SparseRows(indices, values, indptr)
+
+
+class LocalStyleClassifier:
+    """
+    Offline multi-label style classifier: one logistic output per COMEDY_STYLES entry over TF-IDF features
+    Trained on soft OpenAI labels (scores 0-1), so its outputs are on the same scale and the usual
+    0.3 cut-off for a segment's styles applies. Pass it as `classifier` to analyze_comedy_transcript()
+    or set COMEDY_STYLE_MODEL to a saved model to use it by default.
+    """
+
+    def __init__(self, featurizer: TfidfFeaturizer, weights, bias, meta: Optional[Dict] = None):
+        self.featurizer = featurizer
+        self.weights = weights  # (features x styles)
+        self.bias = bias
+        self.meta = meta or {}
+        self._digest = None
+
+    @property
+    def digest(self) -> str:
+        """Short hash of the weights, identifying this model in saved results (see comedy_style_analyzer.classifier_scope)"""
+        if self._digest is None:
+            hasher = hashlib.sha256(self.weights.tobytes())
+            hasher.update(self.bias.tobytes())
+            self._digest = hasher.hexdigest()[:16]
+        return self._digest
+
+    @classmethod
+    def train(cls, texts: List[str], labels: List[Dict[str, float]], epochs: int = 100,
+              learning_rate: float = 0.2, l2: float = 1e-4, min_df: int = 2,
+              max_features: int = 50000) -> 'LocalStyleClassifier':
+        """
+        Fit on (bit text, style scores) pairs with full-batch Adam on the cross-entropy against the soft labels
+        Args:
+            texts: Bit texts
+            labels: Style -> score dictionaries (OpenAI scores; missing styles count as 0)
+            epochs: Gradient steps
+            learning_rate: Adam step size
+            l2: Weight decay
+            min_df: Drop terms seen in fewer bits than this
+            max_features: Keep at most this many of the most frequent terms
+        """
+        import numpy as np
+        featurizer = TfidfFeaturizer.fit(texts, min_df, max_features)
+        features = featurizer.transform(texts)
+        targets = np.array([[float(label.get(style, 0.0)) for style in COMEDY_STYLES] for label in labels],
+                           dtype=np.float32)
+        rows, styles = targets.shape
+        weights = np.zeros((len(featurizer.vocabulary), styles), dtype=np.float32)
+        bias = np.log(np.clip(targets.mean(axis=0), 1e-3, 1 - 1e-3) / np.clip(1 - targets.mean(axis=0), 1e-3, 1))
+        bias = bias.astype(np.float32)
+
+        # Transposed product X.T @ G: group the nonzeros by feature once
+        row_of = np.repeat(np.arange(rows), np.diff(features.indptr))
+        order = np.argsort(features.indices, kind='stable')
+        sorted_features = features.indices[order]
+        group_starts = np.flatnonzero(np.concatenate(([True], sorted_features[1:] != sorted_features[:-1]))) \
+            if len(order) else np.zeros(0, dtype=np.int64)
+        group_features = sorted_features[group_starts]
+        sorted_rows, sorted_values = row_of[order], features.values[order]
+
+        moments = [np.zeros_like(weights), np.zeros_like(weights), np.zeros_like(bias), np.zeros_like(bias)]
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        for step in range(1, epochs + 1):
+            logits = features.dot(weights) + bias
+            error = (1 / (1 + np.exp(-logits)) - targets) / rows
+            grad_weights = l2 * weights
+            if len(order):
+                grad_weights[group_features] += np.add.reduceat(error[sorted_rows] * sorted_values[:, None],
+                                                                group_starts, axis=0)
+            grad_bias = error.sum(axis=0)
+            for param, grad, m, v in ((weights, grad_weights, moments[0], moments[1]),
+                                      (bias, grad_bias, moments[2], moments[3])):
+                m *= beta1
+                m += (1 - beta1) * grad
+                v *= beta2
+                v += (1 - beta2) * grad * grad
+                param -= learning_rate * (m / (1 - beta1 ** step)) / (np.sqrt(v / (1 - beta2 ** step)) + eps)
+        meta = {"examples": rows, "features": len(featurizer.vocabulary), "epochs": epochs,
+                "trained": time.strftime("%Y-%m-%dT%H:%M:%S")}
+        return cls(featurizer, weights, bias, meta)
+
+    def predict_matrix(self, texts: List[str]):
+        """(bits x styles) score matrix in COMEDY_STYLES order"""
+        import numpy as np
+        logits = self.featurizer.transform(texts).dot(self.weights) + self.bias
+        return 1 / (1 + np.exp(-logits))
+
+    def classify_many(self, texts: List[str]) -> List[Dict[str, float]]:
+        """Style scores for every bit, in input order"""
+        if not texts:
+            return []
+        return [dict(zip(COMEDY_STYLES, (round(float(score), 4) for score in row)))
+                for row in self.predict_matrix(texts)]
+
+    def save(self, path: str) -> None:
+        """Write the model as a NumPy .npz archive"""
+        import numpy as np
+        terms = sorted(self.featurizer.vocabulary, key=self.featurizer.vocabulary.get)
+        with open(path, 'wb') as f:
+            np.savez_compressed(f, terms=np.array(terms, dtype=str), idf=self.featurizer.idf,
+                                weights=self.weights, bias=self.bias, styles=np.array(COMEDY_STYLES, dtype=str),
+                                meta=np.array(json.dumps(dict(self.meta, ngram_max=self.featurizer.ngram_max))))
+
+    @classmethod
+    def load(cls, path: str) -> 'LocalStyleClassifier':
+        import numpy as np
+        with np.load(path, allow_pickle=False) as data:
+            if list(data['styles']) != COMEDY_STYLES:
+                raise ValueError(f"{path} was trained for a different COMEDY_STYLES list")
+            meta = json.loads(str(data['meta']))
+            vocabulary = {str(term): i for i, term in enumerate(data['terms'])}
+            featurizer = TfidfFeaturizer(vocabulary, data['idf'], meta.get('ngram_max', 2))
+            return cls(featurizer, data['weights'], data['bias'], meta)
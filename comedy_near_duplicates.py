@@ -0,0 +1,127 @@
+"""
+Near-duplicate bits: the same material performed again, differing by ASR noise and small ad-libs
+Bits are fingerprinted with a 64-bit SimHash, so texts that differ by a few words get fingerprints
+that differ in a few bits, and NearDuplicateIndex finds an earlier bit within a Hamming distance
+without comparing against every indexed bit. NumPy is imported on first use.
+"""
+
+import hashlib
+import json
+import re
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from comedy_style_cache import normalize_bit_text
+
+SIMHASH_BITS = 64
+_TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def simhash(text: str) -> int:
+    """
+    64-bit SimHash of a bit over its words and word pairs (after normalize_bit_text)
+    Texts that differ by a few words get fingerprints that differ in a few bits.
+    """
+    import numpy as np
+    tokens = _TOKEN_PATTERN.findall(normalize_bit_text(text))
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    if not features:
+        return 0
+    hashes = np.fromiter((_feature_hash(feature) for feature in features), dtype=np.uint64, count=len(features))
+    bits = (hashes[:, None] >> np.arange(SIMHASH_BITS, dtype=np.uint64)) & np.uint64(1)
+    votes = 2 * bits.sum(axis=0, dtype=np.int64) - len(features)
+    return int(np.packbits(votes > 0, bitorder='little').view('<u8')[0])
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """
+    SimHash fingerprints of analyzed bits, so a bit performed again can reuse its earlier analysis
+    Fingerprints are split into `bands` equal bands and bucketed by each band's value: two fingerprints
+    within max_distance bits (max_distance < bands) must agree on at least one band, so a lookup only
+    compares against its buckets. Only the costly results are stored - style scores (OpenAI / model)
+    and the parse-based seesaw and word smuggling detections; the cheap text detectors are rerun on
+    the new text. Scores are only reused under the classifier that produced them (see
+    comedy_style_analyzer.classifier_scope).
+    """
+
+    REUSED_FIELDS = ('style_scores', 'seesaw_detected', 'word_smuggling_detected')
+
+    def __init__(self, max_distance: int = 6, bands: int = 8):
+        """
+        Args:
+            max_distance: Largest Hamming distance between fingerprints that counts as the same bit
+            bands: Fingerprint bands (must divide 64 and exceed max_distance, so no match is missed)
+        """
+        if SIMHASH_BITS % bands:
+            raise ValueError(f"bands must divide {SIMHASH_BITS}")
+        if not 0 <= max_distance < bands:
+            raise ValueError(f"max_distance must be at least 0 and below bands ({bands})")
+        self.max_distance = max_distance
+        self.bands = bands
+        self.band_bits = SIMHASH_BITS // bands
+        self.entries: List[Tuple[int, str, Dict]] = []  # (fingerprint, scope, reused fields)
+        self._buckets: Dict[Tuple[int, int], List[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _band_keys(self, fingerprint: int) -> Iterator[Tuple[int, int]]:
+        mask = (1 << self.band_bits) - 1
+        for band in range(self.bands):
+            yield band, (fingerprint >> (band * self.band_bits)) & mask
+
+    def add(self, text: str, analysis: Dict, scope: str, fingerprint: Optional[int] = None) -> int:
+        """Index an analyzed segment (a result dictionary, or anything with REUSED_FIELDS); returns its id"""
+        if fingerprint is None:
+            fingerprint = simhash(text)
+        entry_id = len(self.entries)
+        self.entries.append((fingerprint, scope, {name: analysis[name] for name in self.REUSED_FIELDS}))
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append(entry_id)
+        return entry_id
+
+    def lookup(self, text: str, scope: str, fingerprint: Optional[int] = None) -> Optional[Tuple[int, Dict]]:
+        """
+        The closest indexed bit within max_distance that was analyzed under scope
+        Returns:
+            (distance, reused fields), or None if there is no near duplicate
+        """
+        if fingerprint is None:
+            fingerprint = simhash(text)
+        best = None
+        for entry_id in {entry_id for key in self._band_keys(fingerprint) for entry_id in self._buckets.get(key, ())}:
+            other, entry_scope, reused_fields = self.entries[entry_id]
+            if entry_scope != scope:
+                continue
+            distance = hamming_distance(fingerprint, other)
+            if distance <= self.max_distance and (best is None or (distance, entry_id) < best[:2]):
+                best = (distance, entry_id, reused_fields)
+        return None if best is None else (best[0], best[2])
+
+    def save(self, path: str) -> None:
+        """Write the index as JSON (buckets are rebuilt on load)"""
+        data = {
+            "max_distance": self.max_distance, "bands": self.bands,
+            "entries": [[f"{fingerprint:016x}", scope, reused_fields] for fingerprint, scope, reused_fields in self.entries],
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f)
+
+    @classmethod
+    def load(cls, path: str, max_distance: Optional[int] = None) -> 'NearDuplicateIndex':
+        """Load a saved index; max_distance overrides the saved one"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        index = cls(data['max_distance'] if max_distance is None else max_distance, data['bands'])
+        for fingerprint, scope, reused_fields in data['entries']:
+            index.add("", reused_fields, scope, int(fingerprint, 16))
+        return index
@@ -3,78 +3,378 @@ Stand-Up Comedy Style Analyzer
 Expert NLP-based analyzer for comedy transcripts using Spacy and OpenAI
 """
 
+import argparse
+import asyncio
+import contextvars
+import hashlib
 import json
 import re
 import math
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass, asdict
+import mmap
+import queue
+import random
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from dataclasses import dataclass, fields
+from difflib import SequenceMatcher
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 import os
-from dotenv import load_dotenv
-
-# Try importing Spacy (may fail on Python 3.14+)
-try:
-    import spacy
-    SPACY_AVAILABLE = True
-except (ImportError, Exception) as e:
-    SPACY_AVAILABLE = False
-    spacy = None
-    print("⚠️  Spacy could not be imported (this is OK - script will use basic text processing).")
-    print(f"   Note: {str(e)[:100]}...")
-    print("   💡 For full NLP features, use Python 3.11 or 3.12. See FIX_PYTHON_VERSION.md")
-
-# Try importing OpenAI
-try:
-    import openai
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-    openai = None
-    print("⚠️  OpenAI library not available. Install with: pip install openai")
-
-# Load environment variables from .env file (if exists)
-load_dotenv()
-
-# Load spacy model (run: python -m spacy download en_core_web_sm)
-# Note: Spacy may not be compatible with Python 3.14+. Use Python 3.8-3.13 for best results.
+import struct
+import threading
+import zlib
+
+from comedy_local_classifier import LocalStyleClassifier
+from comedy_near_duplicates import NearDuplicateIndex, simhash
+from comedy_style_cache import DEFAULT_STYLE_CACHE_PATH, PROMPT_VERSION, StyleCache
+from comedy_styles import COMEDY_STYLES
+
+# Heavy dependencies (Spacy model, OpenAI library, .env file) are loaded lazily on first use,
+# so importing this module for count_syllables() & co. is cheap and prints nothing.
+# Status messages go to stderr to keep stdout clean for the daemon protocol (comedy_daemon.py).
+SPACY_MODEL = "en_core_web_sm"
+
 nlp = None
-if SPACY_AVAILABLE:
+_nlp_loaded = False
+
+openai = None
+OPENAI_API_KEY = None
+_openai_loaded = False
+
+_load_lock = threading.Lock()
+
+
+def _status(message: str) -> None:
+    print(message, file=sys.stderr)
+
+
+# Spacy pipeline profiles (COMEDY_NLP_PROFILE or --nlp-profile). The detectors only need sentence
+# boundaries and token.is_alpha, so the tagger, parser, lemmatizer and NER mostly run for nothing.
+#   accurate: the full en_core_web_sm pipeline (sentences from the dependency parser)
+#   fast:     only the statistical sentence recognizer (senter), or Spacy's punctuation-based
+#             sentencizer if the model isn't installed
+#   none:     RuleSentenceSplitter, no Spacy at all
+NLP_PROFILES = ("accurate", "fast", "none")
+_FAST_EXCLUDED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer", "ner"]
+
+
+def get_nlp_profile() -> str:
+    """The configured profile (read on each call so --nlp-profile can set it before the first load)"""
+    profile = os.getenv("COMEDY_NLP_PROFILE", "accurate")
+    if profile not in NLP_PROFILES:
+        raise ValueError(f"Unknown COMEDY_NLP_PROFILE {profile!r} (choose from {', '.join(NLP_PROFILES)})")
+    return profile
+
+
+def get_nlp():
+    """
+    Return the Spacy pipeline for the configured profile, loading it on first call
+    (run: python -m spacy download en_core_web_sm)
+    Returns None if Spacy or the model is unavailable; callers fall back to basic text processing.
+    Note: Spacy may not be compatible with Python 3.14+. Use Python 3.8-3.13 for best results.
+    """
+    global nlp, _nlp_loaded
+    if nlp is not None or _nlp_loaded:
+        return nlp
+    with _load_lock, _stage("spacy_load"):
+        if _nlp_loaded:
+            return nlp
+        nlp = load_nlp(get_nlp_profile())
+        _nlp_loaded = True
+    return nlp
+
+
+def load_nlp(profile: str = "accurate"):
+    """
+    Build a pipeline for one profile (see NLP_PROFILES) without touching the shared one
+    Returns None if the profile needs Spacy or its model and they are unavailable.
+    """
+    if profile not in NLP_PROFILES:
+        raise ValueError(f"Unknown NLP profile {profile!r} (choose from {', '.join(NLP_PROFILES)})")
+    if profile == "none":
+        return RuleSentenceSplitter()
     try:
-        nlp = spacy.load("en_core_web_sm")
-        print("✅ Spacy model loaded successfully")
+        import spacy
+    except (ImportError, Exception) as e:
+        _status("⚠️  Spacy could not be imported (this is OK - script will use basic text processing).")
+        _status(f"   Note: {str(e)[:100]}...")
+        _status("   💡 For full NLP features, use Python 3.11 or 3.12. See FIX_PYTHON_VERSION.md")
+        if profile == "fast":
+            _status("ℹ️  Using the rule-based sentence splitter")
+            return RuleSentenceSplitter()
+        _status("ℹ️  Running in basic mode (no Spacy NLP features)")
+        return None
+    try:
+        if profile == "fast":
+            pipeline = spacy.load(SPACY_MODEL, exclude=_FAST_EXCLUDED_COMPONENTS)
+            if "senter" not in pipeline.component_names:
+                raise OSError(f"{SPACY_MODEL} has no senter component")
+            pipeline.enable_pipe("senter")
+            # Drop the shared embedding layer unless something left in the pipeline listens to it
+            if "tok2vec" in pipeline.pipe_names and not pipeline.get_pipe("tok2vec").listening_components:
+                pipeline.remove_pipe("tok2vec")
+            _status(f"✅ Spacy model loaded (fast profile: {', '.join(pipeline.pipe_names)})")
+        else:
+            pipeline = spacy.load(SPACY_MODEL)
+            _status("✅ Spacy model loaded successfully")
+        return pipeline
     except (OSError, Exception) as e:
-        print("⚠️  Spacy model not found or couldn't be loaded.")
-        print(f"   Error: {str(e)[:100]}...")
-        print("   Falling back to basic text processing (syllable counting and keyword matching).")
-        print("   To install model: python -m spacy download en_core_web_sm")
-        nlp = None
-else:
-    print("ℹ️  Running in basic mode (no Spacy NLP features)")
-
-# OpenAI API key (set via environment variable or .env file)
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-if OPENAI_API_KEY and OPENAI_AVAILABLE:
-    openai.api_key = OPENAI_API_KEY
-elif not OPENAI_AVAILABLE:
-    OPENAI_API_KEY = None  # Can't use OpenAI if library not available
-    print("ℹ️  OpenAI library not installed. Using keyword-based classification.")
-elif not OPENAI_API_KEY:
-    print("ℹ️  OpenAI API key not found. Using keyword-based classification instead.")
-    print("   Set OPENAI_API_KEY environment variable for more accurate style classification.")
-
-# Comedy Styles
-COMEDY_STYLES = [
-    "Anecdotal", "Clowning", "Edgy", "Fantastical", "Heartfelt", 
-    "Observational", "Opinionated", "Playful", "Puns", "Philosophical", 
-    "Sarcasm", "Satire", "Self-deprecation", "Shock", "Superiority", 
-    "Surrealism", "Tragedy", "Wordplay"
-]
+        if profile == "fast":
+            pipeline = spacy.blank("en")
+            pipeline.add_pipe("sentencizer")
+            _status(f"ℹ️  {SPACY_MODEL} unavailable; fast profile uses Spacy's punctuation-based sentencizer")
+            return pipeline
+        _status("⚠️  Spacy model not found or couldn't be loaded.")
+        _status(f"   Error: {str(e)[:100]}...")
+        _status("   Falling back to basic text processing (syllable counting and keyword matching).")
+        _status(f"   To install model: python -m spacy download {SPACY_MODEL}")
+        return None
+
+
+def use_nlp_profile(profile: str):
+    """Replace the shared pipeline with a freshly loaded one for `profile` and return it"""
+    global nlp, _nlp_loaded
+    with _load_lock, _stage("spacy_load"):
+        nlp = load_nlp(profile)
+        _nlp_loaded = True
+    return nlp
+
+
+class RuleToken(NamedTuple):
+    text: str
+    is_alpha: bool
+
+
+class RuleSpan:
+    """A sentence found by RuleSentenceSplitter: character offsets into the document text"""
+    __slots__ = ("doc_text", "start_char", "end_char")
+
+    def __init__(self, doc_text: str, start_char: int, end_char: int):
+        self.doc_text = doc_text
+        self.start_char = start_char
+        self.end_char = end_char
+
+    @property
+    def text(self) -> str:
+        return self.doc_text[self.start_char:self.end_char]
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __iter__(self) -> Iterator[RuleToken]:
+        for match in _RULE_TOKEN.finditer(self.text):
+            token = match.group()
+            yield RuleToken(token, token.isalpha())
+
+
+class RuleDoc:
+    def __init__(self, text: str, sents: List[RuleSpan]):
+        self.text = text
+        self.sents = sents
+
+
+# Terminal punctuation (plus closing quotes/brackets) followed by whitespace or the end of the text
+_RULE_SENTENCE_END = re.compile(r'[.!?\u2026]+["\'\u201d\u2019)\]]*(?=\s|$)')
+_RULE_TOKEN = re.compile(r"\w+(?=n't\b)|n't\b|\w+|'\w+|[^\w\s]")  # Contractions split as Spacy does: do|n't, I|'m
+_RULE_ABBREVIATIONS = frozenset(
+    "mr mrs ms dr prof sr jr st vs etc no mt ft approx dept est inc ltd co corp jan feb mar apr jun jul aug "
+    "sep sept oct nov dec e.g i.e a.m p.m u.s u.k".split())
+
+
+class RuleSentenceSplitter:
+    """
+    Regex sentence splitter with the slice of the Spacy interface the analyzer uses (nlp(text),
+    nlp.pipe(texts), doc.sents, span.text / str(span), tokens with .text and .is_alpha)
+    A sentence ends at . ! ? or an ellipsis followed by whitespace, except after common abbreviations
+    and single-letter initials, or when the next word starts lowercase (trailing-off "so... anyway").
+    """
+    meta = {"name": "rule_sentence_splitter", "version": "1"}
+    pipe_names: List[str] = []
+
+    def __call__(self, text: str) -> RuleDoc:
+        sents = []
+        start = 0
+        for match in _RULE_SENTENCE_END.finditer(text):
+            end = match.end()
+            following = text[end:].lstrip()[:1]
+            if following and following.islower():
+                continue
+            if match.group()[0] == '.' and match.group().rstrip('"\'\u201d\u2019)]') == '.':
+                word = text[start:match.start()].rsplit(None, 1)[-1:] or ['']
+                word = word[0].lstrip('("\'').lower()
+                if word in _RULE_ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                    continue
+            self._add_span(text, start, end, sents)
+            start = end
+        self._add_span(text, start, len(text), sents)
+        return RuleDoc(text, sents)
+
+    @staticmethod
+    def _add_span(text: str, start: int, end: int, sents: List[RuleSpan]) -> None:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            sents.append(RuleSpan(text, start, end))
+
+    def pipe(self, texts: Iterable[str], batch_size: int = 64) -> Iterator[RuleDoc]:
+        for text in texts:
+            yield self(text)
+
+
+def get_openai_api_key() -> Optional[str]:
+    """
+    Load .env and the OpenAI library on first call and return the API key
+    Returns None (keyword-based classification) if the library or key is missing.
+    """
+    global openai, OPENAI_API_KEY, _openai_loaded
+    if _openai_loaded:
+        return OPENAI_API_KEY
+    with _load_lock, _stage("openai_load"):
+        if _openai_loaded:
+            return OPENAI_API_KEY
+        try:
+            from dotenv import load_dotenv
+            load_dotenv()  # Load environment variables from .env file (if exists)
+        except ImportError:
+            pass
+
+        # OpenAI API key (set via environment variable or .env file)
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            _status("ℹ️  OpenAI API key not found. Using keyword-based classification instead.")
+            _status("   Set OPENAI_API_KEY environment variable for more accurate style classification.")
+        else:
+            try:
+                import openai as openai_module
+                openai_module.api_key = api_key
+                openai = openai_module
+                OPENAI_API_KEY = api_key
+            except ImportError:
+                _status("⚠️  OpenAI library not available. Install with: pip install openai")
+                _status("ℹ️  OpenAI library not installed. Using keyword-based classification.")
+        _openai_loaded = True
+    return OPENAI_API_KEY
+
+
+# Instrumentation: per-stage timings and event counters, off unless an Instrumentation is active
+class Instrumentation:
+    """
+    Accumulates wall-clock seconds and call counts per analysis stage, plus event counters
+    (OpenAI requests, retries, fallbacks, style cache hits/misses)
+    Activate it with instrument(); while none is active, stage() costs one context-variable lookup.
+    Args:
+        hook: Optional callable(stage, seconds) invoked after every timed stage
+    """
+
+    def __init__(self, hook=None):
+        self.seconds = Counter()
+        self.calls = Counter()
+        self.counters = Counter()
+        self.hook = hook
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def record(self, name: str, seconds: float, calls: int = 1) -> None:
+        with self._lock:
+            self.seconds[name] += seconds
+            self.calls[name] += calls
+        if self.hook is not None:
+            self.hook(name, seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def merge(self, other) -> None:
+        """Add another Instrumentation (or its to_dict() output) into this one"""
+        if isinstance(other, dict):
+            other = Instrumentation.from_dict(other)
+        with self._lock:
+            self.seconds.update(other.seconds)
+            self.calls.update(other.calls)
+            self.counters.update(other.counters)
+
+    def to_dict(self) -> Dict:
+        return {
+            "stages": {name: {"seconds": round(self.seconds[name], 6), "calls": self.calls[name]}
+                       for name in self.seconds},
+            "counters": dict(self.counters),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'Instrumentation':
+        instrumentation = cls()
+        for name, stage in data.get('stages', {}).items():
+            instrumentation.seconds[name] = stage['seconds']
+            instrumentation.calls[name] = stage['calls']
+        instrumentation.counters.update(data.get('counters', {}))
+        return instrumentation
+
+    def prometheus(self, prefix: str = "comedy_analyzer") -> str:
+        """Prometheus text exposition format"""
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Wall-clock seconds spent per analysis stage",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        lines += [f'{prefix}_stage_seconds_total{{stage="{name}"}} {self.seconds[name]:.6f}' for name in sorted(self.seconds)]
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Calls per analysis stage",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        lines += [f'{prefix}_stage_calls_total{{stage="{name}"}} {self.calls[name]}' for name in sorted(self.calls)]
+        for name in sorted(self.counters):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total {self.counters[name]}")
+        return '\n'.join(lines) + '\n'
+
+
+_active_instrumentation = contextvars.ContextVar('comedy_instrumentation', default=None)
+_NO_STAGE = nullcontext()
+
+
+@contextmanager
+def instrument(instrumentation: Optional[Instrumentation] = None):
+    """Record stages and counters into `instrumentation` (a new one if None) for the enclosed calls"""
+    instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+    token = _active_instrumentation.set(instrumentation)
+    try:
+        yield instrumentation
+    finally:
+        _active_instrumentation.reset(token)
+
+
+def _stage(name: str):
+    instrumentation = _active_instrumentation.get()
+    return _NO_STAGE if instrumentation is None else instrumentation.stage(name)
+
+
+def _count(name: str, amount: int = 1) -> None:
+    instrumentation = _active_instrumentation.get()
+    if instrumentation is not None and amount:
+        instrumentation.count(name, amount)
+
 
 # Vowel patterns for syllable counting
 VOWELS = set("aeiouAEIOU")
 
 
-@dataclass
+# Slotted dataclasses (no per-instance __dict__) where the Python version supports them
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class BitSegment:
     """Represents a single comedy bit/segment"""
     text: str
@@ -89,24 +389,87 @@ class BitSegment:
     trimming_opportunities: List[str]
     syllable_count: int
     bloom_efficiency_score: Optional[float] = None  # Laughs / Syllables
+    balloon_pop_span: Optional[Dict[str, List[int]]] = None  # Character offsets of buildup and reveal
+    laugh_count: Optional[int] = None  # Laughs detected in the audio during and right after the bit
+
+
+_BIT_SEGMENT_FIELDS = [f.name for f in fields(BitSegment)]
+
+
+# Bundled pronunciation table (see comedy_syllables.tsv); extra CMUdict-style tables can be
+# layered on top with COMEDY_PRONUNCIATION_TABLE or add_pronunciations()
+SYLLABLE_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "comedy_syllables.tsv")
+
+_syllable_table = None
+_NON_LETTERS = re.compile(r'[^a-z]')
+_VOWEL_GROUPS = re.compile(r'[aeiou]+')
+_VOWEL_PAIRS = re.compile(r'[aeiou]{2}')
+
+
+def load_pronunciation_table(path: str) -> Dict[str, int]:
+    """
+    Read word -> syllable counts from a file with one word per line, either
+    "word<TAB>count" or CMU Pronouncing Dictionary format ("WORD  W ER1 D", stress digits are counted)
+    Lines starting with # or ;;; are comments; only the first pronunciation of a word is used.
+    """
+    table = {}
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if not line.strip() or line.startswith('#') or line.startswith(';;;'):
+                continue
+            parts = line.split()
+            word = _NON_LETTERS.sub('', parts[0].lower().split('(')[0])
+            if not word or word in table or len(parts) < 2:
+                continue
+            if len(parts) == 2 and parts[1].isdigit():
+                count = int(parts[1])
+            else:
+                count = sum(1 for phone in parts[1:] if phone[-1].isdigit())
+            if count > 0:
+                table[word] = count
+    return table
+
+
+def _get_syllable_table() -> Dict[str, int]:
+    global _syllable_table
+    if _syllable_table is None:
+        table = {}
+        for path in (SYLLABLE_TABLE_PATH, os.getenv("COMEDY_PRONUNCIATION_TABLE")):
+            if path and os.path.exists(path):
+                table.update(load_pronunciation_table(path))
+        _syllable_table = table
+    return _syllable_table
+
+
+def add_pronunciations(table: Dict[str, int]) -> None:
+    """Override syllable counts for specific words (keys are matched lower-cased, letters only)"""
+    _get_syllable_table().update({_NON_LETTERS.sub('', word.lower()): count for word, count in table.items()})
+    _count_syllables_cached.cache_clear()
 
 
 def count_syllables(word: str) -> int:
-    """Count syllables in a word using vowel pattern matching"""
+    """Count syllables in a word: pronunciation table first, vowel pattern matching otherwise (memoized)"""
     if not word:
         return 0
-    
+    return _count_syllables_cached(word)
+
+
+@lru_cache(maxsize=65536)
+def _count_syllables_cached(word: str) -> int:
     word = word.lower().strip()
     if not word:
         return 1  # Default to 1 syllable
     
     # Remove common suffixes that don't count as syllables
-    word = re.sub(r'[^a-z]', '', word)
+    word = _NON_LETTERS.sub('', word)
+    known = _get_syllable_table().get(word)
+    if known:
+        return known
     if len(word) <= 2:
         return 1
     
     # Count vowel groups
-    vowels = re.findall(r'[aeiou]+', word)
+    vowels = _VOWEL_GROUPS.findall(word)
     count = len(vowels)
     
     # Adjust for silent 'e' at end
@@ -114,48 +477,215 @@ def count_syllables(word: str) -> int:
         count -= 1
     
     # Adjust for diphthongs and special cases
-    if re.search(r'[aeiou]{2}', word):
+    diphthongs = len(_VOWEL_PAIRS.findall(word))
+    if diphthongs:
         # Some diphthongs count as one syllable
-        diphthongs = len(re.findall(r'[aeiou]{2}', word))
         count = max(1, count - diphthongs + 1)
     
     return max(1, count)
 
 
+def count_syllables_batch(words: List[str]) -> List[int]:
+    """Syllable count for every word in a token list, in order"""
+    return [_count_syllables_cached(word) if word else 0 for word in words]
+
+
+def count_transcript_syllables(words: List[Dict]) -> List[int]:
+    """Syllable count for every entry of a transcript's 'words' array"""
+    return count_syllables_batch([w.get('text', w.get('word', '')) for w in words])
+
+
+class TranscriptColumns:
+    """
+    Columnar storage for a transcript's words: NumPy arrays of start/end times (seconds) and token
+    ids into an interned vocabulary, read from the per-word dictionaries exactly once
+    Pause boundaries come from one vectorized gap computation, and segments are plain index ranges
+    (SegmentSpan) until their text is actually needed. Analysis needs every bit's text (classification,
+    parsing and the result all use it), so analyze_comedy_transcript() builds each text once; the saving
+    is in ingest and in re-segmenting, not in the analyzed result.
+    """
+    __slots__ = ('starts', 'ends', 'token_ids', 'vocab', 'vocab_syllables', '_syllable_prefix')
+
+    def __init__(self, starts, ends, token_ids, vocab: List[str]):
+        import numpy as np
+        self.starts = starts
+        self.ends = ends
+        self.token_ids = token_ids
+        self.vocab = vocab
+        self.vocab_syllables = np.array(count_syllables_batch(vocab), dtype=np.int64)
+        # Prefix sums make any segment's syllable count a single subtraction
+        self._syllable_prefix = np.concatenate(([0], np.cumsum(self.vocab_syllables[token_ids])))
+
+    @classmethod
+    def from_words(cls, words: Iterable[Dict]) -> 'TranscriptColumns':
+        """Ingest a 'words' array (or any iterator of word dictionaries, e.g. iter_transcript_words())"""
+        import numpy as np
+        vocab_ids = {}
+        intern_token = vocab_ids.setdefault
+        start_chunks, end_chunks, token_chunks = [], [], []
+        starts, ends, token_ids = [], [], []
+
+        def flush() -> None:
+            # Move the Python-object buffers into compact arrays every chunk to bound peak memory
+            start_chunks.append(np.array(starts, dtype=np.float64))
+            end_chunks.append(np.array(ends, dtype=np.float64))
+            token_chunks.append(np.array(token_ids, dtype=np.int32))
+            starts.clear(), ends.clear(), token_ids.clear()
+
+        for word_data in words:
+            start_ms = word_data.get('start', 0)
+            starts.append(start_ms)
+            ends.append(word_data.get('end', start_ms))
+            token_ids.append(intern_token(word_data.get('text', word_data.get('word', '')), len(vocab_ids)))
+            if len(starts) >= 16384:
+                flush()
+        flush()
+        # Convert ms to seconds
+        return cls(np.concatenate(start_chunks) / 1000.0, np.concatenate(end_chunks) / 1000.0,
+                   np.concatenate(token_chunks), list(vocab_ids))
+
+    @classmethod
+    def from_file(cls, path: str) -> 'TranscriptColumns':
+        """Ingest straight from a transcript file without materializing the list of word dictionaries"""
+        return cls.from_words(iter_transcript_words(path))
+
+    def __len__(self) -> int:
+        return len(self.token_ids)
+
+    def pause_boundaries(self, pause_threshold: float):
+        """Indices of words that start a new bit (a gap of at least pause_threshold before them)"""
+        import numpy as np
+        gaps = self.starts[1:] - self.ends[:-1]
+        return np.flatnonzero(gaps >= pause_threshold) + 1
+
+    def spans(self, pause_threshold: float = 1.5) -> List['SegmentSpan']:
+        if not len(self):
+            return []
+        bounds = [0] + self.pause_boundaries(pause_threshold).tolist() + [len(self)]
+        return [SegmentSpan(self, first, last) for first, last in zip(bounds, bounds[1:])]
+
+    def text(self, first: int, last: int) -> str:
+        vocab = self.vocab
+        return ' '.join([vocab[token_id] for token_id in self.token_ids[first:last].tolist()])
+
+    def syllables(self, first: int, last: int) -> int:
+        return int(self._syllable_prefix[last] - self._syllable_prefix[first])
+
+
+class SegmentSpan:
+    """A bit as a word-index range [first, last) into TranscriptColumns; text is built on demand"""
+    __slots__ = ('columns', 'first', 'last')
+
+    def __init__(self, columns: TranscriptColumns, first: int, last: int):
+        self.columns = columns
+        self.first = first
+        self.last = last
+
+    @property
+    def text(self) -> str:
+        return self.columns.text(self.first, self.last)
+
+    @property
+    def start_time(self) -> float:
+        return float(self.columns.starts[self.first])
+
+    @property
+    def end_time(self) -> float:
+        return float(self.columns.ends[self.last - 1])
+
+    @property
+    def syllable_count(self) -> int:
+        return self.columns.syllables(self.first, self.last)
+
+    def to_bit_segment(self) -> 'BitSegment':
+        return _new_segment(self.text, self.start_time, self.end_time, self.syllable_count)
+
+
+def _new_segment(text: str, start_time: float, end_time: float, syllable_count: int) -> BitSegment:
+    """A segment as produced by segmentation, before any analysis has filled it in"""
+    return BitSegment(
+        text=text,
+        start_time=start_time,
+        end_time=end_time,
+        styles=[],
+        style_scores={},
+        seesaw_detected=False,
+        balloon_pop_detected=False,
+        word_smuggling_detected=False,
+        topper_detected=False,
+        trimming_opportunities=[],
+        syllable_count=syllable_count
+    )
+
+
+@dataclass
+class SegmentContext:
+    """
+    Sentence split of one segment, shared by all detectors so each segment is parsed once
+    sentences is None when no NLP pipeline is available (detectors then use their basic fallbacks)
+    """
+    text: str
+    sentences: Optional[List[str]] = None
+
+
+def build_segment_contexts(texts: List[str], batch_size: int = 64) -> List[SegmentContext]:
+    """Parse all segment texts in one batched nlp.pipe() pass"""
+    nlp = get_nlp()
+    if not nlp:
+        return [SegmentContext(text) for text in texts]
+    with _stage("parsing"):
+        try:
+            return [
+                SegmentContext(text, [str(sent) for sent in doc.sents])
+                for text, doc in zip(texts, nlp.pipe(texts, batch_size=batch_size))
+            ]
+        except Exception:
+            return [SegmentContext(text) for text in texts]
+
+
 def segment_by_pauses(transcript_data: Dict, pause_threshold: float = 1.5) -> List[BitSegment]:
     """
     Segment transcript by pauses (beats) between words
     Args:
-        transcript_data: JSON with 'text' and 'words' array (with timestamps)
+        transcript_data: JSON with 'text' and 'words' array (with timestamps);
+            'words' may also be a TranscriptColumns
         pause_threshold: Minimum pause in seconds to create a segment break
     """
+    segments, _ = _segment_transcript(transcript_data, pause_threshold)
+    return segments
+
+
+def _segment_transcript(transcript_data: Dict, pause_threshold: float) -> Tuple[List[BitSegment], Optional[List[SegmentContext]]]:
+    """
+    segment_by_pauses() that also returns segment contexts when it already had to parse the text
+    (the no-timestamp path splits the full transcript with Spacy, so those sentences are reused)
+    """
+    with _stage("segmentation"):
+        return _segment_transcript_uninstrumented(transcript_data, pause_threshold)
+
+
+def _segment_transcript_uninstrumented(transcript_data: Dict, pause_threshold: float) -> Tuple[List[BitSegment], Optional[List[SegmentContext]]]:
     words = transcript_data.get('words', [])
     if not words:
         # Fallback: segment by sentences if no word timestamps
         transcript_text = transcript_data.get('text', '')
         if not transcript_text:
-            return []
+            return [], None
         
         # Try using Spacy if available
+        nlp = get_nlp()
         if nlp:
             try:
                 doc = nlp(transcript_text)
                 segments = []
+                contexts = []
                 for sent in doc.sents:
-                    segments.append(BitSegment(
-                        text=sent.text.strip(),
-                        start_time=0.0,
-                        end_time=0.0,
-                        styles=[],
-                        style_scores={},
-                        seesaw_detected=False,
-                        balloon_pop_detected=False,
-                        word_smuggling_detected=False,
-                        topper_detected=False,
-                        trimming_opportunities=[],
-                        syllable_count=sum(count_syllables(str(token)) for token in sent if token.is_alpha)
+                    segments.append(_new_segment(
+                        sent.text.strip(), 0.0, 0.0,
+                        sum(count_syllables_batch([token.text for token in sent if token.is_alpha]))
                     ))
-                return segments
+                    contexts.append(SegmentContext(segments[-1].text, [str(sent)]))
+                return segments, contexts
             except Exception:
                 pass  # Fall through to basic sentence splitting
         
@@ -164,90 +694,146 @@ def segment_by_pauses(transcript_data: Dict, pause_threshold: float = 1.5) -> Li
         segments = []
         for sent in sentences:
             if sent.strip():
-                segments.append(BitSegment(
-                    text=sent.strip(),
-                    start_time=0.0,
-                    end_time=0.0,
-                    styles=[],
-                    style_scores={},
-                    seesaw_detected=False,
-                    balloon_pop_detected=False,
-                    word_smuggling_detected=False,
-                    topper_detected=False,
-                    trimming_opportunities=[],
-                    syllable_count=sum(count_syllables(word) for word in sent.split())
+                segments.append(_new_segment(
+                    sent.strip(), 0.0, 0.0, sum(count_syllables_batch(sent.split()))
                 ))
-        return segments
+        return segments, None
     
-    segments = []
-    current_segment_words = []
+    if not isinstance(words, TranscriptColumns):
+        words = TranscriptColumns.from_words(words)
+    # Every bit is classified and parsed next, so its text is built here, once
+    return [span.to_bit_segment() for span in words.spans(pause_threshold)], None
+
+
+def iter_segments(word_events: Iterable[Dict], pause_threshold: float = 1.5) -> Iterator[BitSegment]:
+    """
+    Streaming pause segmentation: reads word dictionaries one at a time and yields each bit as
+    soon as a pause of at least pause_threshold seconds closes it (only the open bit is kept in memory)
+    """
+    texts = []
+    first_start = None
     last_end = None
     
-    for i, word_data in enumerate(words):
+    for word_data in word_events:
         word_text = word_data.get('text', word_data.get('word', ''))
-        word_start = word_data.get('start', 0) / 1000.0  # Convert ms to seconds
-        word_end = word_data.get('end', word_data.get('start', 0)) / 1000.0
+        start_ms = word_data.get('start', 0)
+        word_start = start_ms / 1000.0  # Convert ms to seconds
+        word_end = word_data.get('end', start_ms) / 1000.0
         
         # Check for pause (beat)
         if last_end is not None and word_start - last_end >= pause_threshold:
-            # Create segment from accumulated words
-            if current_segment_words:
-                segment_text = ' '.join(w.get('text', w.get('word', '')) for w in current_segment_words)
-                segment_start = current_segment_words[0].get('start', 0) / 1000.0
-                segment_end = current_segment_words[-1].get('end', current_segment_words[-1].get('start', 0)) / 1000.0
-                
-                segments.append(BitSegment(
-                    text=segment_text,
-                    start_time=segment_start,
-                    end_time=segment_end,
-                    styles=[],
-                    style_scores={},
-                    seesaw_detected=False,
-                    balloon_pop_detected=False,
-                    word_smuggling_detected=False,
-                    topper_detected=False,
-                    trimming_opportunities=[],
-                    syllable_count=sum(count_syllables(w.get('text', w.get('word', ''))) for w in current_segment_words)
-                ))
-                current_segment_words = []
+            yield _new_segment(' '.join(texts), first_start, last_end, sum(count_syllables_batch(texts)))
+            texts = []
+            first_start = None
         
-        current_segment_words.append(word_data)
+        if first_start is None:
+            first_start = word_start
+        texts.append(word_text)
         last_end = word_end
     
-    # Add final segment
-    if current_segment_words:
-        segment_text = ' '.join(w.get('text', w.get('word', '')) for w in current_segment_words)
-        segment_start = current_segment_words[0].get('start', 0) / 1000.0
-        segment_end = current_segment_words[-1].get('end', current_segment_words[-1].get('start', 0)) / 1000.0
-        segments.append(BitSegment(
-            text=segment_text,
-            start_time=segment_start,
-            end_time=segment_end,
-            styles=[],
-            style_scores={},
-            seesaw_detected=False,
-            balloon_pop_detected=False,
-            word_smuggling_detected=False,
-            topper_detected=False,
-            trimming_opportunities=[],
-            syllable_count=sum(count_syllables(w.get('text', w.get('word', ''))) for w in current_segment_words)
-        ))
-    
-    return segments
+    # Final segment
+    if texts:
+        yield _new_segment(' '.join(texts), first_start, last_end, sum(count_syllables_batch(texts)))
 
 
-def classify_styles_zero_shot(bit_text: str) -> Dict[str, float]:
+class _JsonStreamReader:
+    """Minimal incremental JSON reader: decodes one value at a time from a file read in chunks"""
+
+    def __init__(self, f, chunk_size: int = 1 << 16):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.pos > self.chunk_size:
+            self.buffer, self.pos = self.buffer[self.pos:], 0
+        self.buffer += chunk
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input), without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Expected '{char}' at offset {self.pos} of the buffered JSON")
+        self.pos += 1
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value that runs to the end of the buffer (e.g. a number) may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def iter_transcript_words(path: str, chunk_size: int = 1 << 16) -> Iterator[Dict]:
     """
-    Use OpenAI GPT for zero-shot classification of comedy styles
-    Returns dictionary of style -> confidence score (0-1)
+    Yield the entries of a transcript file's "words" array one at a time, parsing the file
+    incrementally so multi-hour transcripts never have to be loaded whole
     """
-    if not OPENAI_API_KEY:
-        # Fallback: keyword-based classification
-        return classify_styles_keyword(bit_text)
-    
-    try:
-        styles_str = ", ".join(COMEDY_STYLES)
-        prompt = f"""Analyze this comedy bit and classify which comedy styles apply.
+    with open(path, 'r') as f:
+        reader = _JsonStreamReader(f, chunk_size)
+        reader.expect('{')
+        while reader.peek() not in ('}', ''):
+            key = reader.value()
+            reader.expect(':')
+            if key == 'words' and reader.peek() == '[':
+                reader.expect('[')
+                while reader.peek() != ']':
+                    yield reader.value()
+                    if reader.peek() == ',':
+                        reader.expect(',')
+                reader.expect(']')
+            else:
+                reader.value()  # Skip other fields (e.g. the full "text")
+            if reader.peek() == ',':
+                reader.expect(',')
+
+
+def iter_word_lines(lines: Iterable[str]) -> Iterator[Dict]:
+    """Word events from newline-delimited JSON, one word object per line (e.g. a live ASR feed on stdin)"""
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+# OpenAI style classification (bump PROMPT_VERSION in comedy_style_cache.py when the prompts change meaning)
+OPENAI_MODEL = "gpt-3.5-turbo"
+OPENAI_SYSTEM_PROMPT = "You are an expert comedy analyst. Return only valid JSON."
+
+# Engine defaults, overridable from the environment so batch workers and the daemon pick them up too
+DEFAULT_OPENAI_CONCURRENCY = int(os.getenv("COMEDY_OPENAI_CONCURRENCY", "8"))
+DEFAULT_BITS_PER_REQUEST = int(os.getenv("COMEDY_OPENAI_BITS_PER_REQUEST", "5"))
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("COMEDY_OPENAI_TIMEOUT", "30"))
+
+
+def _single_bit_prompt(bit_text: str) -> str:
+    styles_str = ", ".join(COMEDY_STYLES)
+    return f"""Analyze this comedy bit and classify which comedy styles apply.
 Rate each style from 0.0 to 1.0 based on how strongly it applies.
 
 Comedy Bit: "{bit_text}"
@@ -257,81 +843,646 @@ Available Styles: {styles_str}
 Respond with a JSON object where keys are style names and values are scores (0.0-1.0).
 Example: {{"Observational": 0.9, "Sarcasm": 0.7, "Self-deprecation": 0.5}}
 """
-        
-        response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are an expert comedy analyst. Return only valid JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=500
+
+
+def _packed_bits_prompt(bit_texts: List[str]) -> str:
+    styles_str = ", ".join(COMEDY_STYLES)
+    bits = "\n".join(f'Bit {i}: "{text}"' for i, text in enumerate(bit_texts, 1))
+    return f"""Analyze each of these comedy bits separately and classify which comedy styles apply.
+Rate each style from 0.0 to 1.0 based on how strongly it applies to that bit.
+
+{bits}
+
+Available Styles: {styles_str}
+
+Respond with a JSON object where keys are the bit numbers and values are objects of style scores (0.0-1.0).
+Example: {{"1": {{"Observational": 0.9, "Sarcasm": 0.7}}, "2": {{"Self-deprecation": 0.5}}}}
+"""
+
+
+def _normalize_style_scores(scores: Dict) -> Dict[str, float]:
+    """Normalize scores to 0-1 range, with every style present"""
+    return {style: min(1.0, max(0.0, float(scores.get(style, 0)))) for style in COMEDY_STYLES}
+
+
+def _parse_single_bit_response(result_text: str) -> Optional[Dict[str, float]]:
+    # Extract JSON from response (handle markdown code blocks)
+    json_match = re.search(r'\{[^}]+\}', result_text.strip())
+    if not json_match:
+        return None
+    return _normalize_style_scores(json.loads(json_match.group()))
+
+
+def _parse_packed_response(result_text: str, bit_count: int) -> List[Optional[Dict[str, float]]]:
+    """Per-bit scores from a packed response; bits the model skipped or mangled come back as None"""
+    start, end = result_text.find('{'), result_text.rfind('}')
+    parsed = {}
+    if start != -1 and end > start:
+        try:
+            parsed = json.loads(result_text[start:end + 1])
+        except json.JSONDecodeError:
+            parsed = {}
+    results = []
+    for i in range(1, bit_count + 1):
+        scores = parsed.get(str(i)) if isinstance(parsed, dict) else None
+        try:
+            results.append(_normalize_style_scores(scores) if isinstance(scores, dict) else None)
+        except (TypeError, ValueError):
+            results.append(None)
+    return results
+
+
+class RateLimitError(Exception):
+    """Raised by classification clients when the API asks us to slow down (retried with backoff)"""
+
+    def __init__(self, message: str = "rate limited", retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _is_rate_limit_error(error: Exception) -> bool:
+    return (isinstance(error, RateLimitError)
+            or type(error).__name__ == 'RateLimitError'
+            or getattr(error, 'status_code', None) == 429)
+
+
+class OpenAIChatClient:
+    """
+    Default classification client: one chat completion per call via the OpenAI library
+    Any object with the same async complete(messages, max_tokens) -> str method can be passed to
+    AsyncStyleClassifier instead (e.g. a fake for tests, or base_url pointing at a local server).
+    """
+
+    def __init__(self, model: str = OPENAI_MODEL, base_url: Optional[str] = None,
+                 timeout: Optional[float] = None):
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self._client = None
+        self._client_loop = None
+
+    def _async_client(self):
+        # httpx clients are bound to the event loop they were created on
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            kwargs = {"api_key": get_openai_api_key()}
+            if self.base_url:
+                kwargs["base_url"] = self.base_url
+            if self.timeout is not None:
+                kwargs["timeout"] = self.timeout
+            self._client = openai.AsyncOpenAI(**kwargs)
+            self._client_loop = loop
+        return self._client
+
+    async def complete(self, messages: List[Dict[str, str]], max_tokens: int) -> str:
+        get_openai_api_key()
+        if openai is None:
+            raise RuntimeError("OpenAI library not available")
+        if hasattr(openai, 'AsyncOpenAI'):
+            response = await self._async_client().chat.completions.create(
+                model=self.model, messages=messages, temperature=0.3, max_tokens=max_tokens)
+        else:
+            # openai < 1.0
+            response = await openai.ChatCompletion.acreate(
+                model=self.model, messages=messages, temperature=0.3, max_tokens=max_tokens)
+        return response.choices[0].message.content or ""
+
+
+# Shared style cache, configured from the environment (see comedy_style_cache.StyleCache)
+_default_style_cache = None
+_default_style_cache_loaded = False
+
+
+def get_default_style_cache() -> Optional[StyleCache]:
+    """
+    Shared cache configured from the environment:
+    COMEDY_STYLE_CACHE (path, or "off" to disable), COMEDY_STYLE_CACHE_MAX_ENTRIES, COMEDY_STYLE_CACHE_TTL_DAYS
+    """
+    global _default_style_cache, _default_style_cache_loaded
+    if not _default_style_cache_loaded:
+        _default_style_cache_loaded = True
+        path = os.getenv("COMEDY_STYLE_CACHE", DEFAULT_STYLE_CACHE_PATH)
+        if path and path.lower() not in ("off", "0", "false", "none"):
+            _default_style_cache = StyleCache(
+                path,
+                max_entries=int(os.getenv("COMEDY_STYLE_CACHE_MAX_ENTRIES", "100000")),
+                ttl_seconds=float(os.getenv("COMEDY_STYLE_CACHE_TTL_DAYS", "30")) * 24 * 3600,
+            )
+    return _default_style_cache
+
+
+def disable_default_style_cache() -> None:
+    global _default_style_cache, _default_style_cache_loaded
+    _default_style_cache, _default_style_cache_loaded = None, True
+
+
+class CircuitBreaker:
+    """
+    Stops calling OpenAI after repeated failures, so an outage costs a few failed requests rather
+    than a timeout per bit
+    closed:    requests go through; failure_threshold failures in a row open the breaker
+    open:      requests are skipped (their bits go to the fallback classifier) for reset_seconds
+    half-open: then a single trial request is let through; success closes the breaker, failure re-opens it
+    A request cut off by a time budget only counts as a failure if it had gone unanswered for slow_call_seconds
+    (so a hung API trips the breaker even when budgets are shorter than the request timeout).
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_seconds: float = 30.0, slow_call_seconds: float = 10.0,
+                 clock=time.monotonic):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.slow_call_seconds = slow_call_seconds
+        self.clock = clock
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = None
+        self.stats = Counter()
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (in half-open state, only the one trial request)"""
+        with self._lock:
+            if self.state == "open" and self.clock() - self.opened_at >= self.reset_seconds:
+                self.state = "half-open"
+                return True
+            if self.state == "closed":
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state, self.failures = "closed", 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == "half-open" or self.failures >= self.failure_threshold:
+                if self.state != "open":
+                    self.stats['opened'] += 1
+                    _status(f"OpenAI failed {self.failures} times in a row; using the fallback classifier "
+                            f"for {self.reset_seconds:g}s")
+                self.state, self.opened_at = "open", self.clock()
+
+
+_default_circuit_breaker = None
+
+
+def get_default_circuit_breaker() -> CircuitBreaker:
+    """
+    Breaker shared by every AsyncStyleClassifier not given its own, so an outage seen while analyzing one
+    transcript carries over to the next: COMEDY_OPENAI_BREAKER_FAILURES (default 5), COMEDY_OPENAI_BREAKER_RESET
+    (seconds, default 30), COMEDY_OPENAI_BREAKER_SLOW (seconds, default 10)
+    """
+    global _default_circuit_breaker
+    if _default_circuit_breaker is None:
+        _default_circuit_breaker = CircuitBreaker(
+            int(os.getenv("COMEDY_OPENAI_BREAKER_FAILURES", "5")),
+            float(os.getenv("COMEDY_OPENAI_BREAKER_RESET", "30")),
+            float(os.getenv("COMEDY_OPENAI_BREAKER_SLOW", "10")),
         )
-        
-        result_text = response.choices[0].message.content.strip()
-        # Extract JSON from response (handle markdown code blocks)
-        json_match = re.search(r'\{[^}]+\}', result_text)
-        if json_match:
-            scores = json.loads(json_match.group())
-            # Normalize scores to 0-1 range
-            normalized = {style: min(1.0, max(0.0, float(scores.get(style, 0)))) for style in COMEDY_STYLES}
-            return normalized
-        
-    except Exception as e:
-        print(f"OpenAI API error: {e}, falling back to keyword classification")
+    return _default_circuit_breaker
+
+
+def _fallback_style_scores(bit_texts: List[str]) -> List[Dict[str, float]]:
+    """Scores for bits OpenAI didn't classify: the local model when one is configured, else keywords"""
+    local = get_local_style_classifier()
+    if local is not None:
+        _count('local_classifications', len(bit_texts))
+        return local.classify_many(bit_texts)
+    return [classify_styles_keyword(text) for text in bit_texts]
+
+
+class AsyncStyleClassifier:
+    """
+    Concurrent zero-shot style classification
+    Bits are packed several to a prompt, at most `concurrency` requests are in flight at once and
+    rate-limit errors are retried with exponential backoff. Each request gives up after request_timeout
+    seconds, and a CircuitBreaker stops requests altogether after repeated failures. Bits whose request
+    ultimately fails, is skipped, or misses the deadline (or that the model leaves out of its answer) fall
+    back to the local style model if one is configured, else to keyword classification.
+    Bits already in the style cache (see StyleCache) are not sent at all.
+    """
+
+    def __init__(self, client=None, concurrency: int = DEFAULT_OPENAI_CONCURRENCY,
+                 bits_per_request: int = DEFAULT_BITS_PER_REQUEST, max_retries: int = 5,
+                 backoff_base: float = 0.5, backoff_max: float = 20.0,
+                 cache: Optional[StyleCache] = None, use_cache: bool = True,
+                 request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT,
+                 circuit_breaker: Optional[CircuitBreaker] = None):
+        self.client = client or OpenAIChatClient()
+        self.model = getattr(self.client, 'model', OPENAI_MODEL)
+        self.cache = cache if cache is not None else (get_default_style_cache() if use_cache else None)
+        self.concurrency = max(1, concurrency)
+        self.bits_per_request = max(1, bits_per_request)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_timeout = request_timeout
+        self.circuit_breaker = circuit_breaker if circuit_breaker is not None else get_default_circuit_breaker()
+        self.stats = Counter()
+
+    async def _complete_with_retry(self, messages: List[Dict[str, str]], max_tokens: int,
+                                   deadline: Optional[float] = None) -> str:
+        attempt = 0
+        while True:
+            timeout = self.request_timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            try:
+                self.stats['requests'] += 1
+                _count('openai_requests')
+                if timeout is None:
+                    return await self.client.complete(messages, max_tokens)
+                return await asyncio.wait_for(self.client.complete(messages, max_tokens), max(0.0, timeout))
+            except Exception as e:
+                if not _is_rate_limit_error(e) or attempt >= self.max_retries:
+                    raise
+                delay = getattr(e, 'retry_after', None)
+                if delay is None:
+                    delay = min(self.backoff_max, self.backoff_base * (2 ** attempt)) * random.uniform(0.5, 1.0)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    raise
+                attempt += 1
+                self.stats['retries'] += 1
+                _count('openai_retries')
+                await asyncio.sleep(delay)
+
+    async def _classify_chunk(self, bit_texts: List[str], semaphore: asyncio.Semaphore,
+                              deadline: Optional[float] = None) -> List[Optional[Dict[str, float]]]:
+        """Model scores per bit, or None for bits that need the fallback classifier"""
+        if len(bit_texts) == 1:
+            prompt, max_tokens = _single_bit_prompt(bit_texts[0]), 500
+        else:
+            prompt, max_tokens = _packed_bits_prompt(bit_texts), min(4096, 300 * len(bit_texts) + 100)
+        messages = [
+            {"role": "system", "content": OPENAI_SYSTEM_PROMPT},
+            {"role": "user", "content": prompt},
+        ]
+        async with semaphore:
+            if not self.circuit_breaker.allow():
+                self.stats['circuit_open'] += len(bit_texts)
+                _count('circuit_open_fallbacks', len(bit_texts))
+                return [None] * len(bit_texts)
+            sent = time.monotonic()
+            try:
+                result_text = await self._complete_with_retry(messages, max_tokens, deadline)
+            except asyncio.CancelledError:
+                # Out of budget: only a failure if OpenAI was unusually slow
+                if time.monotonic() - sent >= self.circuit_breaker.slow_call_seconds:
+                    self.circuit_breaker.record_failure()
+                raise
+            except Exception as e:
+                now = time.monotonic()
+                if not (isinstance(e, asyncio.TimeoutError) and deadline is not None and now >= deadline
+                        and now - sent < self.circuit_breaker.slow_call_seconds):
+                    self.circuit_breaker.record_failure()
+                if isinstance(e, asyncio.TimeoutError):
+                    self.stats['timeouts'] += 1
+                    _count('openai_timeouts')
+                    e = "request timed out"
+                _status(f"OpenAI API error: {e}, falling back")
+                return [None] * len(bit_texts)
+        self.circuit_breaker.record_success()
+        try:
+            if len(bit_texts) == 1:
+                return [_parse_single_bit_response(result_text)]
+            return _parse_packed_response(result_text, len(bit_texts))
+        except Exception as e:
+            _status(f"Unreadable OpenAI response: {e}, falling back")
+            return [None] * len(bit_texts)
+
+    async def classify_many(self, bit_texts: List[str], deadline: Optional[float] = None) -> List[Dict[str, float]]:
+        """Style scores for every bit, in input order"""
+        return (await self._classify_many_tracked(bit_texts, deadline))[0]
+
+    async def _classify_many_tracked(self, bit_texts: List[str], deadline: Optional[float] = None,
+                                     on_scores=None) -> Tuple[List[Dict[str, float]], List[bool]]:
+        """
+        classify_many() plus, per bit, whether the scores came from the model (False for fallbacks)
+        Args:
+            deadline: time.monotonic() by which to stop waiting for OpenAI; bits still pending then fall back
+            on_scores: Called with {input index: model scores} as cached bits are found and as each request
+                completes (for progressive results)
+        """
+        keys = [StyleCache.make_key(text, self.model) for text in bit_texts]
+        model_scores = self.cache.get_many(keys) if self.cache is not None else {}
+        positions = {}
+        for i, key in enumerate(keys):
+            positions.setdefault(key, []).append(i)
+
+        def report(scores_by_key: Dict[str, Dict[str, float]]) -> None:
+            if on_scores is not None and scores_by_key:
+                on_scores({i: scores for key, scores in scores_by_key.items() for i in positions[key]})
+
+        report(model_scores)
+        # Each distinct missing bit is sent once, even if it repeats within the transcript
+        missing = {}
+        for key, text in zip(keys, bit_texts):
+            if key not in model_scores and key not in missing:
+                missing[key] = text
+        if self.cache is not None:
+            _count('style_cache_hits', len(model_scores))
+            _count('style_cache_misses', len(missing))
+        if missing:
+            semaphore = asyncio.Semaphore(self.concurrency)
+            size = self.bits_per_request
+            missing_keys, missing_texts = list(missing), list(missing.values())
+            tasks = {}
+            for start in range(0, len(missing_texts), size):
+                task = asyncio.ensure_future(self._classify_chunk(missing_texts[start:start + size], semaphore, deadline))
+                tasks[task] = missing_keys[start:start + size]
+            fresh = {}
+            pending = set(tasks)
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    break
+                for task in done:
+                    chunk = {key: scores for key, scores in zip(tasks[task], task.result()) if scores is not None}
+                    fresh.update(chunk)
+                    report(chunk)
+            if pending:
+                for task in pending:
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                late = sum(len(tasks[task]) for task in pending)
+                self.stats['deadline_fallbacks'] += late
+                _count('deadline_fallbacks', late)
+                _status(f"Time budget used up; {late} bits fall back to offline classification")
+            if self.cache is not None:
+                self.cache.put_many(fresh, missing)  # Fallbacks are deliberately left out
+            model_scores.update(fresh)
+
+        results, from_model, fallback_positions = [], [], []
+        for i, key in enumerate(keys):
+            scores = model_scores.get(key)
+            from_model.append(scores is not None)
+            if scores is None:
+                fallback_positions.append(i)
+            results.append(scores)
+        if fallback_positions:
+            self.stats['fallbacks'] += len(fallback_positions)
+            _count('classification_fallbacks', len(fallback_positions))
+            for i, scores in zip(fallback_positions, _fallback_style_scores([bit_texts[i] for i in fallback_positions])):
+                results[i] = scores
+        return results, from_model
+
+
+def _run_coroutine(coro):
+    """asyncio.run() that also works when called from inside a running event loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        # Carry the caller's context (active instrumentation) into the helper thread
+        return pool.submit(contextvars.copy_context().run, asyncio.run, coro).result()
+
+
+def classify_styles_batch(bit_texts: List[str], classifier: Optional[AsyncStyleClassifier] = None) -> List[Dict[str, float]]:
+    """
+    Classify many bits at once: with `classifier` when given (AsyncStyleClassifier or LocalStyleClassifier),
+    else the local model at COMEDY_STYLE_MODEL if set, else OpenAI when configured, else keywords
+    Returns one style -> confidence score dictionary per bit, in input order
+    """
+    return _classify_styles_tracked(bit_texts, classifier)[0]
+
+
+def _openai_classifier(classifier=None) -> Optional[AsyncStyleClassifier]:
+    """
+    The AsyncStyleClassifier classify_styles_batch() would use, or None if it would classify offline
+    A classifier passed in is always used (its client may not need OPENAI_API_KEY); without one, the
+    local model or, if there is no API key either, keywords take over.
+    """
+    if isinstance(classifier, LocalStyleClassifier):
+        return None
+    if classifier is not None:
+        return classifier
+    if get_local_style_classifier() is not None or not get_openai_api_key():
+        return None
+    return AsyncStyleClassifier()
+
+
+def _classify_styles_tracked(bit_texts: List[str], classifier=None,
+                             deadline: Optional[float] = None) -> Tuple[List[Dict[str, float]], List[bool]]:
+    """
+    classify_styles_batch() plus, per bit, whether the chosen classifier scored it (False for fallbacks)
+    deadline: time.monotonic() after which bits still waiting on OpenAI fall back to offline classification
+    """
+    with _stage("classification"):
+        remote = _openai_classifier(classifier)
+        if remote is None:
+            local = classifier if isinstance(classifier, LocalStyleClassifier) else None
+            if local is None and classifier is None:
+                local = get_local_style_classifier()
+            if local is not None:
+                _count('local_classifications', len(bit_texts))
+                return local.classify_many(bit_texts), [True] * len(bit_texts)
+            _count('keyword_classifications', len(bit_texts))
+            return [classify_styles_keyword(text) for text in bit_texts], [True] * len(bit_texts)
+        if not bit_texts:
+            return [], []
+        return _run_coroutine(remote._classify_many_tracked(bit_texts, deadline))
+
+
+def classifier_scope(classifier=None) -> str:
+    """
+    Name for whichever classifier classify_styles_batch() would use, so saved scores are only reused
+    with the classifier (and prompt version and style list) that produced them
+    """
+    local = classifier if isinstance(classifier, LocalStyleClassifier) else None
+    if local is None and classifier is None:
+        local = get_local_style_classifier()
+    if local is not None:
+        name = f"local:{local.digest}"
+    elif classifier is None and not get_openai_api_key():
+        name = "keyword"
+    else:
+        name = f"openai:{getattr(classifier, 'model', OPENAI_MODEL)}:{PROMPT_VERSION}"
+    styles = hashlib.sha256(json.dumps(COMEDY_STYLES).encode('utf-8')).hexdigest()[:8]
+    return f"{name}:{styles}"
+
+
+def classify_styles_zero_shot(bit_text: str) -> Dict[str, float]:
+    """
+    Use OpenAI GPT for zero-shot classification of comedy styles
+    Returns dictionary of style -> confidence score (0-1)
+    """
+    if get_local_style_classifier() is not None:
+        return classify_styles_batch([bit_text])[0]
+    if not get_openai_api_key():
+        # Fallback: keyword-based classification
+        with _stage("classification"):
+            _count('keyword_classifications')
+            return classify_styles_keyword(bit_text)
     
-    # Fallback to keyword-based
-    return classify_styles_keyword(bit_text)
+    return classify_styles_batch([bit_text], AsyncStyleClassifier(bits_per_request=1))[0]
+
+
+# Keyword vocabularies for the keyword style classifier and trimming detector
+STYLE_KEYWORDS = {
+    "Anecdotal": ["story", "happened", "one time", "remember", "when i", "told me", "went to"],
+    "Clowning": ["silly", "ridiculous", "absurd", "goofy", "funny", "weird", "strange"],
+    "Edgy": ["damn", "hell", "fuck", "shit", "controversial", "offensive", "dark"],
+    "Fantastical": ["imagine", "magic", "fantasy", "dream", "unreal", "impossible"],
+    "Heartfelt": ["love", "family", "heart", "feelings", "emotion", "touching"],
+    "Observational": ["notice", "did you ever", "what is it with", "why is it", "people"],
+    "Opinionated": ["think", "believe", "opinion", "should", "wrong", "right", "stupid"],
+    "Playful": ["play", "fun", "joke", "teasing", "banter", "cheeky", "witty"],
+    "Puns": ["pun", "play on words", "double meaning", "wordplay"],
+    "Philosophical": ["meaning", "life", "exist", "universe", "reality", "truth", "deep"],
+    "Sarcasm": ["yeah right", "sure", "obviously", "totally", "great", "perfect"],
+    "Satire": ["society", "politics", "government", "system", "mock", "parody"],
+    "Self-deprecation": ["i'm so", "i'm terrible", "i suck", "i'm bad", "pathetic", "loser"],
+    "Shock": ["what the", "holy", "unbelievable", "incredible", "amazing", "wow"],
+    "Superiority": ["better than", "smarter", "above", "superior", "i'm better"],
+    "Surrealism": ["surreal", "dreamlike", "bizarre", "abstract", "unrealistic"],
+    "Tragedy": ["sad", "tragic", "depressing", "miserable", "unfortunate", "suffering"],
+    "Wordplay": ["word", "pun", "double", "meaning", "play on", "clever", "wit"]
+}
+
+# Common filler words/phrases
+FILLER_WORDS = ["like", "you know", "um", "uh", "actually", "basically", "literally",
+                "really", "very", "pretty", "quite", "sort of", "kind of", "I mean"]
+
+# Unnecessary qualifiers
+QUALIFIER_PHRASES = ["I think", "I guess", "I suppose", "maybe", "perhaps", "probably"]
+
+# Redundant adjectives (e.g., "really very good" -> "good")
+REDUNDANT_PATTERNS = [
+    re.compile(r"\b(really|very|pretty|quite)\s+(really|very|pretty|quite)\s+"),
+    re.compile(r"\b(kind of|sort of)\s+\w+"),
+]
+
+
+class KeywordMatch(NamedTuple):
+    """One whole-word keyword hit; start/end are character offsets into the original text"""
+    start: int
+    end: int
+    keyword: str
+    styles: Tuple[str, ...]
+    is_filler: bool
+    is_qualifier: bool
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """Regex alternation shaped like a trie, so matching cost depends on phrase length, not phrase count"""
+    trie = {}
+    for phrase in phrases:
+        node = trie
+        for ch in phrase:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node: Dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def _build_keyword_matcher():
+    info = {}
+    for style, keywords in STYLE_KEYWORDS.items():
+        for keyword in keywords:
+            info.setdefault(keyword.lower(), [set(), False, False])[0].add(style)
+    for filler in FILLER_WORDS:
+        info.setdefault(filler.lower(), [set(), False, False])[1] = True
+    for qualifier in QUALIFIER_PHRASES:
+        info.setdefault(qualifier.lower(), [set(), False, False])[2] = True
+    info = {
+        keyword: (tuple(style for style in COMEDY_STYLES if style in styles), filler, qualifier)
+        for keyword, (styles, filler, qualifier) in info.items()
+    }
+    # The regex reports the longest keyword starting at each position; shorter keywords that are
+    # whole-word prefixes of it ("double" inside "double meaning") are credited from this table
+    prefixes = {
+        keyword: [other for other in info
+                  if other != keyword and re.match(r'\b' + re.escape(other) + r'\b', keyword)]
+        for keyword in info
+    }
+    expansions = {keyword: (keyword,) + tuple(prefixes[keyword]) for keyword in info}
+    # Zero-width lookahead so overlapping keywords ("when i" / "i'm so") are all found in one scan
+    pattern = re.compile(r'(?<!\w)(?=(' + _trie_pattern(list(info)) + r')\b)', re.IGNORECASE)
+    return pattern, info, expansions
+
+
+_KEYWORD_PATTERN, _KEYWORD_INFO, _KEYWORD_EXPANSIONS = _build_keyword_matcher()
+
+
+@lru_cache(maxsize=4096)
+def _matched_keywords(text: str) -> frozenset:
+    """Set of keywords present in text (one scan, shared by the classifier and trimming detector)"""
+    expansions = _KEYWORD_EXPANSIONS
+    return frozenset(keyword for found in _KEYWORD_PATTERN.findall(text)
+                     for keyword in expansions[found.lower()])
+
+
+def find_keyword_matches(text: str) -> List[KeywordMatch]:
+    """Every whole-word style keyword, filler and qualifier in text with its offsets, in one pass (for highlighting)"""
+    matches = []
+    for m in _KEYWORD_PATTERN.finditer(text):
+        start = m.start(1)
+        for keyword in _KEYWORD_EXPANSIONS[m.group(1).lower()]:
+            styles, is_filler, is_qualifier = _KEYWORD_INFO[keyword]
+            matches.append(KeywordMatch(start, start + len(keyword), keyword, styles, is_filler, is_qualifier))
+    return matches
 
 
 def classify_styles_keyword(bit_text: str) -> Dict[str, float]:
     """Fallback keyword-based style classification"""
-    text_lower = bit_text.lower()
-    scores = {}
-    
-    style_keywords = {
-        "Anecdotal": ["story", "happened", "one time", "remember", "when i", "told me", "went to"],
-        "Clowning": ["silly", "ridiculous", "absurd", "goofy", "funny", "weird", "strange"],
-        "Edgy": ["damn", "hell", "fuck", "shit", "controversial", "offensive", "dark"],
-        "Fantastical": ["imagine", "magic", "fantasy", "dream", "unreal", "impossible"],
-        "Heartfelt": ["love", "family", "heart", "feelings", "emotion", "touching"],
-        "Observational": ["notice", "did you ever", "what is it with", "why is it", "people"],
-        "Opinionated": ["think", "believe", "opinion", "should", "wrong", "right", "stupid"],
-        "Playful": ["play", "fun", "joke", "teasing", "banter", "cheeky", "witty"],
-        "Puns": ["pun", "play on words", "double meaning", "wordplay"],
-        "Philosophical": ["meaning", "life", "exist", "universe", "reality", "truth", "deep"],
-        "Sarcasm": ["yeah right", "sure", "obviously", "totally", "great", "perfect"],
-        "Satire": ["society", "politics", "government", "system", "mock", "parody"],
-        "Self-deprecation": ["i'm so", "i'm terrible", "i suck", "i'm bad", "pathetic", "loser"],
-        "Shock": ["what the", "holy", "unbelievable", "incredible", "amazing", "wow"],
-        "Superiority": ["better than", "smarter", "above", "superior", "i'm better"],
-        "Surrealism": ["surreal", "dreamlike", "bizarre", "abstract", "unrealistic"],
-        "Tragedy": ["sad", "tragic", "depressing", "miserable", "unfortunate", "suffering"],
-        "Wordplay": ["word", "pun", "double", "meaning", "play on", "clever", "wit"]
-    }
+    scores = dict.fromkeys(STYLE_KEYWORDS, 0.0)
+    keywords = _matched_keywords(bit_text)
+    if not keywords:
+        return scores
     
-    word_count = len(text_lower.split())
-    
-    for style, keywords in style_keywords.items():
-        matches = sum(1 for keyword in keywords if keyword in text_lower)
-        score = min(1.0, (matches * 1.5) / max(1, word_count / 10))
-        scores[style] = score
+    matched = Counter(style for keyword in keywords for style in _KEYWORD_INFO[keyword][0])
+    word_count = len(bit_text.split())
+    for style, matches in matched.items():
+        scores[style] = min(1.0, (matches * 1.5) / max(1, word_count / 10))
     
     return scores
 
 
-def detect_seesaw_theory(text: str) -> bool:
+# Local style model, configured from the environment (see comedy_local_classifier.LocalStyleClassifier)
+DEFAULT_STYLE_MODEL_PATH = os.getenv("COMEDY_STYLE_MODEL")
+_default_local_classifier = None
+_default_local_classifier_loaded = False
+
+
+def get_local_style_classifier() -> Optional[LocalStyleClassifier]:
+    """The model at COMEDY_STYLE_MODEL (loaded once), or None when that isn't set"""
+    global _default_local_classifier, _default_local_classifier_loaded
+    if not _default_local_classifier_loaded:
+        with _load_lock:
+            if not _default_local_classifier_loaded:
+                path = os.getenv("COMEDY_STYLE_MODEL", DEFAULT_STYLE_MODEL_PATH or "")
+                if path:
+                    _default_local_classifier = LocalStyleClassifier.load(path)
+                    _status(f"✅ Local style model loaded from {path}")
+                _default_local_classifier_loaded = True
+    return _default_local_classifier
+
+
+def detect_seesaw_theory(text: str, context: Optional[SegmentContext] = None) -> bool:
     """
     Seesaw Theory: Setup should be longer (more syllables) than punchline
     Look for sentences where the last clause/sentence is shorter than the setup
     """
-    if not nlp:
+    if not get_nlp():
         return False
     
-    doc = nlp(text)
-    sentences = list(doc.sents)
+    if context is None:
+        context = build_segment_contexts([text])[0]
+    sentences = context.sentences
     
-    if len(sentences) < 2:
+    if not sentences or len(sentences) < 2:
         return False
     
     # Compare setup (first part) vs punchline (last part)
@@ -339,8 +1490,8 @@ def detect_seesaw_theory(text: str) -> bool:
     punchline_text = sentences[-1]
     
     # Count syllables (works with or without Spacy)
-    setup_syllables = sum(count_syllables(word) for word in setup_text.split())
-    punchline_syllables = sum(count_syllables(word) for word in punchline_text.split())
+    setup_syllables = sum(count_syllables_batch(setup_text.split()))
+    punchline_syllables = sum(count_syllables_batch(punchline_text.split()))
     
     # Seesaw: setup > punchline (punchline should be shorter)
     if setup_syllables > 0 and punchline_syllables > 0:
@@ -350,47 +1501,64 @@ def detect_seesaw_theory(text: str) -> bool:
     return False
 
 
-def detect_balloon_pop(text: str) -> bool:
+# Balloon Pop patterns, compiled once. Matching is case-insensitive on the original text so
+# reported spans are character offsets into the segment text.
+# Patterns that indicate tension building
+BALLOON_BUILDUP_PATTERNS = [
+    re.compile(r"(so|then|and|but|until|when|suddenly)\s+[^.!?]{10,}", re.IGNORECASE),
+    re.compile(r"(turns out|actually|really|just|only)", re.IGNORECASE),
+    re.compile(r"(wait|hold on|no way|you know what)", re.IGNORECASE),
+]
+
+# Reveal indicators (words that often signal the pop)
+BALLOON_REVEAL_PATTERNS = [
+    re.compile(r"\b(just|only|actually|really|turns out|but|however)\b", re.IGNORECASE),
+    re.compile(r"\b(not|never|no|nobody|nothing)\b", re.IGNORECASE),
+    re.compile(r"\b(was|is|are|were)\s+\w+ing", re.IGNORECASE),  # Passive reveals
+]
+
+
+def find_balloon_pop(text: str) -> Optional[Dict[str, List[int]]]:
     """
-    Balloon Pop: Tension builds, then releases at a specific word/phrase (the reveal)
-    Look for patterns: buildup phrases followed by a reveal word/phrase
+    Locate a Balloon Pop: the earliest-ending buildup and the first reveal that starts after it
+    Each pattern is scanned once; "is there a reveal after a buildup" is then just
+    earliest buildup end < latest reveal start, so long rambling bits stay linear.
+    Returns {"buildup": [start, end], "reveal": [start, end]} or None
     """
     if not text:
-        return False
-    
-    # Patterns that indicate tension building
-    buildup_patterns = [
-        r"(so|then|and|but|until|when|suddenly)\s+[^.!?]{10,}",
-        r"(turns out|actually|really|just|only)",
-        r"(wait|hold on|no way|you know what)"
-    ]
-    
-    # Reveal indicators (words that often signal the pop)
-    reveal_indicators = [
-        r"\b(just|only|actually|really|turns out|but|however)\b",
-        r"\b(not|never|no|nobody|nothing)\b",
-        r"\b(was|is|are|were)\s+\w+ing",  # Passive reveals
-    ]
-    
-    text_lower = text.lower()
+        return None
     
-    # Check for buildup + reveal pattern
-    has_buildup = any(re.search(pattern, text_lower) for pattern in buildup_patterns)
-    has_reveal = any(re.search(pattern, text_lower) for pattern in reveal_indicators)
+    buildup = None
+    for pattern in BALLOON_BUILDUP_PATTERNS:
+        # finditer matches are non-overlapping and ordered, so the first one ends earliest
+        match = pattern.search(text)
+        if match and (buildup is None or match.end() < buildup[1]):
+            buildup = match.span()
+    if buildup is None:
+        return None
     
-    if has_buildup and has_reveal:
-        # Check if reveal comes after buildup
-        buildup_positions = [m.end() for pattern in buildup_patterns for m in re.finditer(pattern, text_lower)]
-        reveal_positions = [m.start() for pattern in reveal_indicators for m in re.finditer(pattern, text_lower)]
-        
-        if buildup_positions and reveal_positions:
-            # At least one reveal should come after a buildup
-            return any(rev > build for build in buildup_positions for rev in reveal_positions)
+    reveal = None
+    for pattern in BALLOON_REVEAL_PATTERNS:
+        for match in pattern.finditer(text):
+            if match.start() > buildup[1]:
+                if reveal is None or match.start() < reveal[0]:
+                    reveal = match.span()
+                break
+    if reveal is None:
+        return None
     
-    return False
+    return {"buildup": list(buildup), "reveal": list(reveal)}
+
+
+def detect_balloon_pop(text: str) -> bool:
+    """
+    Balloon Pop: Tension builds, then releases at a specific word/phrase (the reveal)
+    Look for patterns: buildup phrases followed by a reveal word/phrase
+    """
+    return find_balloon_pop(text) is not None
 
 
-def detect_word_smuggling(text: str) -> bool:
+def detect_word_smuggling(text: str, context: Optional[SegmentContext] = None) -> bool:
     """
     Word Smuggling: Punchline word hidden inside a casual sentence
     Look for sentences where a key word seems out of place or unexpectedly placed
@@ -399,13 +1567,10 @@ def detect_word_smuggling(text: str) -> bool:
         return False
     
     # Split into sentences (works with or without Spacy)
-    if nlp:
-        try:
-            doc = nlp(text)
-            sentences = [str(sent) for sent in doc.sents]
-        except Exception:
-            sentences = re.split(r'[.!?]+\s+', text)
-            sentences = [s.strip() for s in sentences if s.strip()]
+    if context is None:
+        context = build_segment_contexts([text])[0]
+    if context.sentences is not None:
+        sentences = context.sentences
     else:
         sentences = re.split(r'[.!?]+\s+', text)
         sentences = [s.strip() for s in sentences if s.strip()]
@@ -439,17 +1604,27 @@ def detect_toppers(text: str, previous_text: Optional[str] = None) -> bool:
     if not previous_text or not text:
         return False
     
-    # Extract key words (nouns - words > 4 chars, simple heuristic)
-    # Works with or without Spacy
-    current_words = {w.lower() for w in text.split() if len(w) > 4 and w.isalpha()}
-    previous_words = {w.lower() for w in previous_text.split() if len(w) > 4 and w.isalpha()}
-    
-    # Check for overlap in key words
+    return _shares_premise(premise_terms(text), premise_terms(previous_text))
+
+
+def premise_terms(text: str) -> frozenset:
+    """
+    Key words used to compare premises between bits
+    Nouns - words > 4 chars, simple heuristic that works with or without Spacy
+    """
+    return frozenset(w.lower() for w in text.split() if len(w) > 4 and w.isalpha())
+
+
+def _premise_overlap(current_words: frozenset, previous_words: frozenset) -> float:
     overlap = current_words & previous_words
-    overlap_ratio = len(overlap) / max(1, min(len(current_words), len(previous_words)))
-    
-    # If significant overlap, might be a topper
-    return overlap_ratio > 0.3 and len(overlap) >= 2
+    return len(overlap) / max(1, min(len(current_words), len(previous_words)))
+
+
+def _shares_premise(current_words: frozenset, previous_words: frozenset,
+                    min_overlap: float = 0.3, min_shared: int = 2) -> bool:
+    # If significant overlap in key words, it's the same premise
+    return (_premise_overlap(current_words, previous_words) > min_overlap
+            and len(current_words & previous_words) >= min_shared)
 
 
 def detect_trimming_opportunities(text: str) -> List[str]:
@@ -460,32 +1635,19 @@ def detect_trimming_opportunities(text: str) -> List[str]:
     if not text:
         return []
     opportunities = []
+    present = _matched_keywords(text)
     
-    # Common filler words/phrases
-    fillers = ["like", "you know", "um", "uh", "actually", "basically", "literally", 
-               "really", "very", "pretty", "quite", "sort of", "kind of", "I mean"]
-    
-    text_lower = text.lower()
-    for filler in fillers:
-        if filler in text_lower:
+    for filler in FILLER_WORDS:
+        if filler.lower() in present:
             opportunities.append(f"Remove filler: '{filler}'")
     
-    # Look for redundant adjectives
-    # (e.g., "really very good" -> "good")
-    redundant_patterns = [
-        r"\b(really|very|pretty|quite)\s+(really|very|pretty|quite)\s+",
-        r"\b(kind of|sort of)\s+\w+",
-    ]
-    
-    for pattern in redundant_patterns:
-        matches = re.finditer(pattern, text_lower)
-        for match in matches:
+    text_lower = text.lower()
+    for pattern in REDUNDANT_PATTERNS:
+        for match in pattern.finditer(text_lower):
             opportunities.append(f"Trim redundant: '{match.group()}'")
     
-    # Look for unnecessary qualifiers
-    qualifiers = ["I think", "I guess", "I suppose", "maybe", "perhaps", "probably"]
-    for qualifier in qualifiers:
-        if qualifier in text_lower:
+    for qualifier in QUALIFIER_PHRASES:
+        if qualifier.lower() in present:
             opportunities.append(f"Consider removing qualifier: '{qualifier}'")
     
     return opportunities
@@ -502,84 +1664,916 @@ def calculate_bloom_efficiency(bit: BitSegment, laugh_count: int = 0) -> float:
     return laugh_count / bit.syllable_count
 
 
-def analyze_comedy_transcript(transcript_json: Dict, pause_threshold: float = 1.5) -> Dict:
+# Laugh detection: crowd laughter and applause are loud, broadband (noise-like) sound, while a single
+# voice is harmonic, so frames that are both well above the recording's median level and spectrally
+# flat are counted as laughter
+class LaughEvent(NamedTuple):
+    start: float  # Seconds
+    end: float
+    peak_db: float  # Loudest frame, dB relative to full scale
+
+
+class WavInfo(NamedTuple):
+    sample_rate: int
+    channels: int
+    sample_width: int  # Bytes per sample
+    is_float: bool
+    data_offset: int  # Byte offset of the first sample frame
+    frame_count: int
+
+    @property
+    def duration(self) -> float:
+        return self.frame_count / self.sample_rate
+
+
+def read_wav_info(path: str) -> WavInfo:
+    """Parse a RIFF/WAVE header (PCM 8/16/24/32-bit or float 32/64-bit) without reading the samples"""
+    with open(path, 'rb') as f:
+        riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave != b'WAVE':
+            raise ValueError(f"{path} is not a WAV file")
+        fmt = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path} has no audio data chunk")
+            chunk_id, size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                body = f.read(size)
+                audio_format, channels, sample_rate, _, _, bits = struct.unpack('<HHIIHH', body[:16])
+                if audio_format == 0xFFFE and len(body) >= 26:  # WAVE_FORMAT_EXTENSIBLE: real format in the subtype
+                    audio_format = struct.unpack('<H', body[24:26])[0]
+                if audio_format not in (1, 3):
+                    raise ValueError(f"Unsupported WAV encoding {audio_format} (need PCM or IEEE float)")
+                fmt = (sample_rate, channels, bits // 8, audio_format == 3)
+                f.seek(size % 2, 1)
+            elif chunk_id == b'data':
+                if fmt is None:
+                    raise ValueError(f"{path} has audio data before its format chunk")
+                sample_rate, channels, width, is_float = fmt
+                if width * 8 not in ((32, 64) if is_float else (8, 16, 24, 32)):
+                    raise ValueError(f"Unsupported WAV sample size: {width * 8} bits")
+                data_offset = f.tell()
+                size = min(size, os.path.getsize(path) - data_offset)  # Streamed WAVs may leave size unset
+                return WavInfo(sample_rate, channels, width, is_float, data_offset, size // (width * channels))
+            else:
+                f.seek(size + size % 2, 1)
+
+
+def _decode_samples(raw, info: WavInfo):
+    """Mono float32 samples in [-1, 1] from a buffer of whole sample frames"""
+    import numpy as np
+    width = info.sample_width
+    if info.is_float:
+        samples = np.frombuffer(raw, dtype='<f4' if width == 4 else '<f8').astype(np.float32)
+    elif width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 3:
+        # Sign-extend packed 24-bit little-endian samples into int32
+        triples = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = triples[:, 0] | (triples[:, 1] << 8) | (triples[:, 2] << 16)
+        samples = (values - ((values & 0x800000) << 1)).astype(np.float32) / float(1 << 23)
+    else:
+        dtype = '<i2' if width == 2 else '<i4'
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / float(1 << (8 * width - 1))
+    if info.channels > 1:
+        samples = samples.reshape(-1, info.channels).mean(axis=1)
+    return samples
+
+
+def _frame_features(samples, frame_length: int, window, low_bin: int):
+    """Per-frame level (dBFS) and spectral flatness (0 = pure tone .. 1 = white noise)"""
+    import numpy as np
+    frames = samples[:len(samples) - len(samples) % frame_length].reshape(-1, frame_length)
+    rms = np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+    level_db = 20.0 * np.log10(rms + 1e-10)
+    power = np.square(np.abs(np.fft.rfft(frames * window, axis=1)))[:, low_bin:] + 1e-12
+    flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return level_db, flatness
+
+
+def detect_laughs(wav_path: str, frame_seconds: float = 0.05, chunk_seconds: float = 10.0,
+                  margin_db: float = 6.0, min_flatness: float = 0.3, min_duration: float = 0.3,
+                  merge_gap: float = 0.3) -> List[LaughEvent]:
+    """
+    Find laughter/applause in a WAV recording
+    The file is memory-mapped and read chunk_seconds at a time (pages are released after each chunk),
+    so memory stays bounded for any length; features are computed for all frames of a chunk at once.
+    Args:
+        wav_path: WAV file of the performance (same clock as the transcript timestamps)
+        frame_seconds: Analysis frame length
+        chunk_seconds: Audio decoded per step
+        margin_db: How far above the recording's median frame level laughter has to be
+        min_flatness: Spectral flatness above which a loud frame counts as crowd noise rather than voice
+        min_duration: Shorter bursts are ignored
+        merge_gap: Bursts separated by less than this are one laugh
+    Returns:
+        Laugh events in time order
+    """
+    import numpy as np
+    info = read_wav_info(wav_path)
+    frame_length = max(16, int(round(frame_seconds * info.sample_rate)))
+    frame_seconds = frame_length / info.sample_rate
+    chunk_frames = max(1, int(chunk_seconds / frame_seconds)) * frame_length  # Whole analysis frames per chunk
+    window = np.hanning(frame_length).astype(np.float32)
+    low_bin = max(1, int(150 * frame_length / info.sample_rate))  # Ignore rumble below ~150 Hz
+    bytes_per_frame = info.sample_width * info.channels
+
+    levels, flatness = [], []
+    with _stage("laugh_detection"):
+        if info.frame_count >= frame_length:
+            with open(wav_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as audio:
+                for first in range(0, info.frame_count, chunk_frames):
+                    count = min(chunk_frames, info.frame_count - first)
+                    start = info.data_offset + first * bytes_per_frame
+                    raw = memoryview(audio)[start:start + count * bytes_per_frame]
+                    try:
+                        chunk_levels, chunk_flatness = _frame_features(_decode_samples(raw, info), frame_length,
+                                                                       window, low_bin)
+                    finally:
+                        raw.release()
+                    levels.append(chunk_levels)
+                    flatness.append(chunk_flatness)
+                    if hasattr(audio, 'madvise'):
+                        page_start = start - start % mmap.PAGESIZE
+                        audio.madvise(mmap.MADV_DONTNEED, page_start, start + count * bytes_per_frame - page_start)
+        if not levels:
+            return []
+        levels, flatness = np.concatenate(levels), np.concatenate(flatness)
+
+        loud = levels > np.median(levels) + margin_db
+        active = np.concatenate(([0], (loud & (flatness > min_flatness)).astype(np.int8), [0]))
+        edges = np.diff(active)
+        starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        if not len(starts):
+            return []
+
+        # Merge bursts separated by short gaps, then drop the ones too short to be a laugh
+        keep = np.concatenate(([True], starts[1:] - ends[:-1] >= merge_gap / frame_seconds))
+        starts, ends = starts[keep], ends[np.concatenate((keep[1:], [True]))]
+        long_enough = (ends - starts) * frame_seconds >= min_duration
+        starts, ends = starts[long_enough], ends[long_enough]
+        peaks = [float(levels[a:b].max()) for a, b in zip(starts, ends)]
+    return [LaughEvent(round(int(a) * frame_seconds, 3), round(int(b) * frame_seconds, 3), round(peak, 1))
+            for a, b, peak in zip(starts, ends, peaks)]
+
+
+def assign_laughs(segment_starts: List[float], laughs: List[LaughEvent]) -> List[int]:
+    """
+    Laugh count per segment: a laugh belongs to the bit that was playing when it started, up to the
+    next bit's start (so the laugh in the pause after a punchline counts for that bit)
+    """
+    import numpy as np
+    if not segment_starts:
+        return []
+    laugh_starts = np.array([laugh.start for laugh in laughs], dtype=np.float64)
+    owners = np.searchsorted(np.asarray(segment_starts, dtype=np.float64), laugh_starts, side='right') - 1
+    owners = owners[owners >= 0]  # Laughs before the first bit (walk-on applause) belong to nobody
+    return np.bincount(owners, minlength=len(segment_starts)).tolist()
+
+
+def apply_laughs(result: Dict, laughs: List[LaughEvent]) -> Dict:
+    """
+    Fill in laugh_count and bloom_efficiency_score for every segment of an analysis result (in place)
+    and add a "laughs" summary block. Needs word timestamps, so segments have real start times.
+    """
+    segments = result.get('segments', [])
+    if len(segments) > 1 and all(seg['start_time'] == segments[0]['start_time'] for seg in segments):
+        raise ValueError("Laugh alignment needs a transcript with word timestamps")
+    counts = assign_laughs([seg['start_time'] for seg in segments], laughs)
+    for seg, laugh_count in zip(segments, counts):
+        seg['laugh_count'] = laugh_count
+        # Same ratio as calculate_bloom_efficiency(), on the result dictionary
+        seg['bloom_efficiency_score'] = laugh_count / seg['syllable_count'] if seg['syllable_count'] else 0.0
+    result['laughs'] = {
+        "events": len(laughs),
+        "assigned": sum(counts),
+        "laugh_seconds": round(sum(laugh.end - laugh.start for laugh in laughs), 3),
+    }
+    return result
+
+
+# overall_statistics field -> segment flag it counts
+DETECTION_COUNTS = [
+    ("seesaw_detections", "seesaw_detected"),
+    ("balloon_pop_detections", "balloon_pop_detected"),
+    ("word_smuggling_detections", "word_smuggling_detected"),
+    ("topper_detections", "topper_detected"),
+]
+
+
+class OverallStatistics:
+    """Running totals behind the overall_statistics block, updated one analyzed segment at a time"""
+
+    def __init__(self):
+        self.total_segments = 0
+        self.total_syllables = 0
+        self.styles = Counter()
+        self.detections = Counter()
+
+    def add(self, seg: Dict) -> None:
+        self.total_segments += 1
+        self.total_syllables += seg['syllable_count']
+        for style in seg['styles']:
+            self.styles[style] += 1
+        for field, flag in DETECTION_COUNTS:
+            if seg[flag]:
+                self.detections[field] += 1
+
+    def remove(self, seg: Dict) -> None:
+        """Undo add() for a segment that is no longer part of the result"""
+        self.total_segments -= 1
+        self.total_syllables -= seg['syllable_count']
+        for style in seg['styles']:
+            self.styles[style] -= 1
+            if self.styles[style] <= 0:
+                del self.styles[style]
+        for field, flag in DETECTION_COUNTS:
+            if seg[flag]:
+                self.detections[field] -= 1
+
+    def to_dict(self) -> Dict:
+        stats = {
+            "total_segments": self.total_segments,
+            "total_syllables": self.total_syllables,
+            "most_common_styles": self.styles.most_common(5),
+        }
+        for field, _ in DETECTION_COUNTS:
+            stats[field] = self.detections[field]
+        return stats
+
+
+def _top_styles(style_scores: Dict[str, float]) -> List[str]:
+    """Styles scoring above 0.3, best first"""
+    return [style for style, score in sorted(style_scores.items(), key=lambda x: x[1], reverse=True) if score > 0.3]
+
+
+def _analyze_segment(segment: BitSegment, context: Optional[SegmentContext], style_scores: Dict[str, float],
+                     previous_text: Optional[str], reused: Optional[Dict] = None) -> Dict:
+    """
+    Run every detector on one classified segment and return it as a result dictionary
+    reused holds a near-duplicate's parse-based detections (see NearDuplicateIndex); context may then be None
+    """
+    top_styles = _top_styles(style_scores)
+    
+    # Detect Adam Bloom tools
+    if reused is not None:
+        segment.seesaw_detected = reused['seesaw_detected']
+    else:
+        with _stage("detect_seesaw"):
+            segment.seesaw_detected = detect_seesaw_theory(segment.text, context)
+    with _stage("detect_balloon_pop"):
+        segment.balloon_pop_span = find_balloon_pop(segment.text)
+    segment.balloon_pop_detected = segment.balloon_pop_span is not None
+    if reused is not None:
+        segment.word_smuggling_detected = reused['word_smuggling_detected']
+    else:
+        with _stage("detect_word_smuggling"):
+            segment.word_smuggling_detected = detect_word_smuggling(segment.text, context)
+    with _stage("detect_toppers"):
+        segment.topper_detected = detect_toppers(segment.text, previous_text)
+    with _stage("detect_trimming"):
+        segment.trimming_opportunities = detect_trimming_opportunities(segment.text)
+    segment.styles = top_styles
+    segment.style_scores = dict(style_scores)  # Cached scores may be shared between identical bits
+    
+    # Bloom efficiency needs laugh counts from the audio; see apply_laughs()
+    
+    return {name: getattr(segment, name) for name in _BIT_SEGMENT_FIELDS}
+
+
+def _with_timings(analyze, *args) -> Dict:
+    """Run an analysis with its own Instrumentation and attach the result's "timings" block"""
+    outer = _active_instrumentation.get()
+    with instrument() as instrumentation:
+        started = time.perf_counter()
+        result = analyze(*args)
+        total = time.perf_counter() - started
+    result["timings"] = dict(instrumentation.to_dict(), total_seconds=round(total, 6))
+    if outer is not None:
+        outer.merge(instrumentation)
+    return result
+
+
+def _default_time_budget() -> Optional[float]:
+    """Seconds per transcript from COMEDY_ANALYSIS_BUDGET (read on each call so --time-budget can set it), or None"""
+    budget = os.getenv("COMEDY_ANALYSIS_BUDGET")
+    return float(budget) if budget else None
+
+
+def _deadline(time_budget: Optional[float]) -> Optional[float]:
+    if time_budget is None:
+        time_budget = _default_time_budget()
+    return None if time_budget is None else time.monotonic() + time_budget
+
+
+def analyze_comedy_transcript(transcript_json: Dict, pause_threshold: float = 1.5,
+                              classifier: Optional[AsyncStyleClassifier] = None,
+                              timings: bool = False,
+                              near_duplicates: Optional[NearDuplicateIndex] = None,
+                              time_budget: Optional[float] = None) -> Dict:
     """
     Main analysis function
     Args:
         transcript_json: JSON with 'text' and optional 'words' array
         pause_threshold: Pause duration in seconds to segment bits
+        classifier: OpenAI classification engine (concurrency, packing, client); defaults apply if None
+        timings: Add a "timings" block (seconds and calls per stage, OpenAI/cache counters)
+        near_duplicates: Reuse style scores and parse-based detections of near-identical bits analyzed
+            before, and add this transcript's other bits to it (adds a "near_duplicates" block)
+        time_budget: Seconds from the start of the analysis after which bits still waiting on OpenAI are
+            classified offline instead (default: COMEDY_ANALYSIS_BUDGET, else no limit); the detectors
+            still run afterwards
     Returns:
         Dictionary with analysis results
     """
+    if timings:
+        return _with_timings(analyze_comedy_transcript, transcript_json, pause_threshold, classifier,
+                             False, near_duplicates, time_budget)
+    deadline = _deadline(time_budget)
+
     # Segment transcript into bits
-    segments = segment_by_pauses(transcript_json, pause_threshold)
+    segments, contexts = _segment_transcript(transcript_json, pause_threshold)
+
+    # Bits performed before (give or take ASR noise) skip classification and parsing
+    reused = {}
+    if near_duplicates is not None:
+        scope = classifier_scope(classifier)
+        with _stage("near_duplicate_lookup"):
+            fingerprints = [simhash(segment.text) for segment in segments]
+            for i, (segment, fingerprint) in enumerate(zip(segments, fingerprints)):
+                match = near_duplicates.lookup(segment.text, scope, fingerprint)
+                if match is not None:
+                    reused[i] = match
+        _count('near_duplicate_hits', len(reused))
+    fresh = [i for i in range(len(segments)) if i not in reused]
+    fresh_texts = [segments[i].text for i in fresh]
+    if contexts is None:
+        contexts = dict(zip(fresh, build_segment_contexts(fresh_texts)))
+    
+    # Classify styles for all segments up front (concurrent zero-shot with OpenAI or keyword fallback)
+    fresh_scores, from_model = _classify_styles_tracked(fresh_texts, classifier, deadline)
+    all_style_scores = dict(zip(fresh, fresh_scores))
     
     # Analyze each segment
     analyzed_segments = []
+    statistics = OverallStatistics()
     previous_text = None
     
-    for segment in segments:
-        # Classify styles (zero-shot with OpenAI or keyword fallback)
-        style_scores = classify_styles_zero_shot(segment.text)
-        top_styles = [style for style, score in sorted(style_scores.items(), key=lambda x: x[1], reverse=True) if score > 0.3]
-        
-        # Detect Adam Bloom tools
-        segment.seesaw_detected = detect_seesaw_theory(segment.text)
-        segment.balloon_pop_detected = detect_balloon_pop(segment.text)
-        segment.word_smuggling_detected = detect_word_smuggling(segment.text)
-        segment.topper_detected = detect_toppers(segment.text, previous_text)
-        segment.trimming_opportunities = detect_trimming_opportunities(segment.text)
-        segment.styles = top_styles
-        segment.style_scores = style_scores
-        
-        # Note: Bloom efficiency requires laugh count (would need separate input)
-        # segment.bloom_efficiency_score = calculate_bloom_efficiency(segment, laugh_count)
-        
-        analyzed_segments.append(asdict(segment))
+    for i, segment in enumerate(segments):
+        if i in reused:
+            reused_fields = reused[i][1]
+            analyzed = _analyze_segment(segment, None, reused_fields['style_scores'], previous_text, reused_fields)
+        else:
+            analyzed = _analyze_segment(segment, contexts[i], all_style_scores[i], previous_text)
+        analyzed_segments.append(analyzed)
+        statistics.add(analyzed)
         previous_text = segment.text
     
-    # Overall statistics
-    all_styles = Counter()
-    for seg in analyzed_segments:
-        for style in seg['styles']:
-            all_styles[style] += 1
-    
+    result = {
+        "segments": analyzed_segments,
+        "overall_statistics": statistics.to_dict()
+    }
+    if near_duplicates is not None:
+        # Keyword fallbacks for failed OpenAI requests are not stored, so they are retried next time
+        for i, scored in zip(fresh, from_model):
+            if scored:
+                near_duplicates.add(segments[i].text, analyzed_segments[i], scope, fingerprints[i])
+        distances = [distance for distance, _ in reused.values()]
+        result["near_duplicates"] = {
+            "reused_segments": len(reused),
+            "analyzed_segments": len(fresh),
+            "same_fingerprint": distances.count(0),
+            "max_distance": max(distances, default=None),
+        }
+    return result
+
+
+def analyze_comedy_transcript_incremental(previous_result: Dict, transcript_json: Dict,
+                                          pause_threshold: float = 1.5,
+                                          classifier: Optional[AsyncStyleClassifier] = None,
+                                          timings: bool = False, time_budget: Optional[float] = None) -> Dict:
+    """
+    Re-analyze an edited transcript, reusing previous_result for every bit whose text is unchanged
+    Segments are matched by text with a sequence diff. Only new or edited bits are classified and run
+    through the detectors; unchanged bits whose preceding bit changed just get detect_toppers() redone
+    (the only detector that looks at the previous bit). Timings and syllable counts always come from
+    the new transcript, and overall_statistics is recounted over the new segments in running order.
+    Args:
+        previous_result: Output of an earlier analyze_comedy_transcript() run
+        transcript_json: The edited transcript
+        pause_threshold: Pause duration in seconds to segment bits (should match the previous run)
+        classifier: OpenAI classification engine; defaults apply if None
+        timings: Add a "timings" block, as in analyze_comedy_transcript()
+        time_budget: Latency budget in seconds, as in analyze_comedy_transcript()
+    Returns:
+        Dictionary with analysis results, plus an "incremental" block counting reused/reanalyzed bits
+    """
+    if timings:
+        return _with_timings(analyze_comedy_transcript_incremental, previous_result, transcript_json,
+                             pause_threshold, classifier, False, time_budget)
+    old_segments = (previous_result or {}).get('segments')
+    if not old_segments:
+        return analyze_comedy_transcript(transcript_json, pause_threshold, classifier, time_budget=time_budget)
+    deadline = _deadline(time_budget)
+
+    segments, contexts = _segment_transcript(transcript_json, pause_threshold)
+
+    # Map each new segment to the old segment it is identical to (if any)
+    matcher = SequenceMatcher(None, [seg['text'] for seg in old_segments],
+                              [segment.text for segment in segments], autojunk=False)
+    old_index = [None] * len(segments)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for offset in range(i2 - i1):
+                old_index[j1 + offset] = i1 + offset
+
+    # Classify and parse only the bits that changed
+    changed = [j for j, i in enumerate(old_index) if i is None]
+    changed_texts = [segments[j].text for j in changed]
+    changed_scores = dict(zip(changed, _classify_styles_tracked(changed_texts, classifier, deadline)[0]))
+    if contexts is None:
+        changed_contexts = dict(zip(changed, build_segment_contexts(changed_texts)))
+    else:
+        changed_contexts = {j: contexts[j] for j in changed}
+
+    # Counted in running order, so style ties rank exactly as in analyze_comedy_transcript()
+    statistics = OverallStatistics()
+    analyzed_segments = []
+    toppers_rechecked = 0
+    previous_text = None
+    for j, segment in enumerate(segments):
+        i = old_index[j]
+        if i is None:
+            analyzed = _analyze_segment(segment, changed_contexts[j], changed_scores[j], previous_text)
+        else:
+            old = old_segments[i]
+            analyzed = dict(old)
+            analyzed.update(start_time=segment.start_time, end_time=segment.end_time,
+                            syllable_count=segment.syllable_count)
+            old_previous_text = old_segments[i - 1]['text'] if i > 0 else None
+            if previous_text != old_previous_text:
+                analyzed['topper_detected'] = detect_toppers(segment.text, previous_text)
+                toppers_rechecked += 1
+        statistics.add(analyzed)
+        analyzed_segments.append(analyzed)
+        previous_text = segment.text
+
     return {
         "segments": analyzed_segments,
-        "overall_statistics": {
-            "total_segments": len(analyzed_segments),
-            "total_syllables": sum(seg['syllable_count'] for seg in analyzed_segments),
-            "most_common_styles": all_styles.most_common(5),
-            "seesaw_detections": sum(1 for seg in analyzed_segments if seg['seesaw_detected']),
-            "balloon_pop_detections": sum(1 for seg in analyzed_segments if seg['balloon_pop_detected']),
-            "word_smuggling_detections": sum(1 for seg in analyzed_segments if seg['word_smuggling_detected']),
-            "topper_detections": sum(1 for seg in analyzed_segments if seg['topper_detected']),
+        "overall_statistics": statistics.to_dict(),
+        "incremental": {
+            "reused_segments": len(segments) - len(changed),
+            "reanalyzed_segments": len(changed),
+            "toppers_rechecked": toppers_rechecked,
         }
     }
 
 
-# CLI usage
-if __name__ == "__main__":
-    import sys
-    
-    if len(sys.argv) < 2:
-        print("Usage: python comedy_style_analyzer.py <transcript.json>")
-        print("\nTranscript JSON format:")
-        print('{"text": "Full transcript text", "words": [{"text": "word", "start": 0, "end": 100}]}')
-        sys.exit(1)
-    
-    transcript_file = sys.argv[1]
-    with open(transcript_file, 'r') as f:
-        transcript_data = json.load(f)
-    
-    results = analyze_comedy_transcript(transcript_data)
-    
-    # Output results
-    output_file = transcript_file.replace('.json', '_analyzed.json')
-    with open(output_file, 'w') as f:
-        json.dump(results, f, indent=2)
-    
-    print(f"Analysis complete! Results saved to {output_file}")
+def analyze_comedy_transcript_progressive(transcript_json: Dict, pause_threshold: float = 1.5,
+                                          classifier: Optional[AsyncStyleClassifier] = None,
+                                          time_budget: Optional[float] = None,
+                                          timings: bool = False) -> Iterator[Dict]:
+    """
+    analyze_comedy_transcript() that yields a complete result as soon as the transcript is parsed, then improves it
+    The first result uses offline style scores (the local model if configured, else keywords). As OpenAI
+    requests complete, their bits' styles and overall_statistics are upgraded in place and the same result
+    dictionary is yielded again. Bits OpenAI hasn't answered by the deadline keep their offline scores.
+    When classification is offline anyway, the first result is also the last.
+    Args:
+        transcript_json, pause_threshold, classifier, time_budget: As in analyze_comedy_transcript()
+        timings: Add a "timings" block (so far) to every result, as in analyze_comedy_transcript()
+    Yields:
+        The result, with a "progress" block: {"upgraded_segments", "pending_segments", "done"}
+        (plus "fallback_segments" once done)
+    """
+    if not timings:
+        yield from _analyze_progressive(transcript_json, pause_threshold, classifier, time_budget)
+        return
+    outer = _active_instrumentation.get()
+    instrumentation = Instrumentation()
+    started = time.perf_counter()
+    results = _analyze_progressive(transcript_json, pause_threshold, classifier, time_budget)
+    while True:
+        # Each step runs under the instrumentation; the classification thread inherits it when started
+        with instrument(instrumentation):
+            result = next(results, None)
+        if result is None:
+            break
+        result["timings"] = dict(instrumentation.to_dict(), total_seconds=round(time.perf_counter() - started, 6))
+        yield result
+    if outer is not None:
+        outer.merge(instrumentation)
+
+
+def _analyze_progressive(transcript_json: Dict, pause_threshold: float, classifier,
+                         time_budget: Optional[float]) -> Iterator[Dict]:
+    deadline = _deadline(time_budget)
+    segments, contexts = _segment_transcript(transcript_json, pause_threshold)
+    texts = [segment.text for segment in segments]
+    if contexts is None:
+        contexts = build_segment_contexts(texts)
+    remote = _openai_classifier(classifier) if segments else None
+    if remote is None:
+        all_style_scores = _classify_styles_tracked(texts, classifier)[0]
+    else:
+        with _stage("classification"):
+            all_style_scores = _fallback_style_scores(texts)
+
+    analyzed_segments = []
+    statistics = OverallStatistics()
+    previous_text = None
+    for segment, context, style_scores in zip(segments, contexts, all_style_scores):
+        analyzed = _analyze_segment(segment, context, style_scores, previous_text)
+        analyzed_segments.append(analyzed)
+        statistics.add(analyzed)
+        previous_text = segment.text
+    result = {
+        "segments": analyzed_segments,
+        "overall_statistics": statistics.to_dict(),
+    }
+    if remote is None:
+        result["progress"] = {"upgraded_segments": 0, "pending_segments": 0, "done": True, "fallback_segments": 0}
+        yield result
+        return
+    result["progress"] = {"upgraded_segments": 0, "pending_segments": len(segments), "done": False}
+    yield result
+
+    updates = queue.Queue()
+
+    def classify() -> None:
+        try:
+            with _stage("classification"):
+                tracked = _run_coroutine(remote._classify_many_tracked(
+                    texts, deadline, lambda scores: updates.put(("scores", scores))))
+            updates.put(("done", tracked))
+        except BaseException as e:
+            updates.put(("error", e))
+
+    # The thread carries the caller's context (active instrumentation), like _run_coroutine()
+    threading.Thread(target=contextvars.copy_context().run, args=(classify,), daemon=True).start()
+    upgraded = set()
+    while True:
+        kind, payload = updates.get()
+        if kind == "error":
+            raise payload
+        if kind == "done":
+            # Recounted in running order, so style ties rank exactly as in analyze_comedy_transcript()
+            statistics = OverallStatistics()
+            for analyzed in analyzed_segments:
+                statistics.add(analyzed)
+            result["overall_statistics"] = statistics.to_dict()
+            result["progress"] = {"upgraded_segments": len(upgraded), "pending_segments": 0, "done": True,
+                                  "fallback_segments": payload[1].count(False)}
+            yield result
+            return
+        for i, style_scores in payload.items():
+            analyzed = analyzed_segments[i]
+            statistics.remove(analyzed)
+            analyzed['style_scores'] = dict(style_scores)
+            analyzed['styles'] = _top_styles(style_scores)
+            statistics.add(analyzed)
+            upgraded.add(i)
+        result["overall_statistics"] = statistics.to_dict()
+        result["progress"] = {"upgraded_segments": len(upgraded),
+                              "pending_segments": len(segments) - len(upgraded), "done": False}
+        yield result
+
+
+class PauseSweep:
+    """
+    One transcript analyzed at any pause threshold, for tuning it interactively
+    Inter-word gaps are sorted once, widest first, so a threshold's segmentation is a prefix of that
+    order (a binary search plus sorting the boundaries it selects). Raising the threshold only merges
+    neighbouring bits, so all segmentations together form a hierarchy of at most 2n - 1 distinct word
+    ranges (n = bits at the lowest threshold). Each range is analyzed once and cached; a new threshold
+    classifies and parses only ranges no earlier threshold produced, and redoes detect_toppers()
+    for cached bits whose preceding bit changed.
+    """
+
+    def __init__(self, transcript_json: Dict, classifier: Optional[AsyncStyleClassifier] = None):
+        import numpy as np
+        self.transcript_json = transcript_json
+        self.classifier = classifier
+        words = transcript_json.get('words', [])
+        self.columns = words if isinstance(words, TranscriptColumns) else (
+            TranscriptColumns.from_words(words) if words else None)
+        self._analyzed = {}  # (first, last) word range -> analyzed segment, with the previous range it was checked against
+        self._untimed_result = None  # No word timestamps: segmentation doesn't depend on the threshold
+        if self.columns is not None and len(self.columns) > 1:
+            gaps = self.columns.starts[1:] - self.columns.ends[:-1]
+            order = np.argsort(-gaps, kind='stable')
+            self._boundaries = order + 1  # Word index each gap precedes, widest gap first
+            self._sorted_gaps = -gaps[order]  # Ascending, for searchsorted
+        else:
+            self._boundaries = self._sorted_gaps = np.empty(0)
+
+    def thresholds(self) -> List[float]:
+        """The distinct gap lengths (seconds, ascending): the only thresholds at which segmentation changes"""
+        import numpy as np
+        return np.unique(-self._sorted_gaps).tolist()
+
+    def ranges(self, pause_threshold: float) -> List[Tuple[int, int]]:
+        """Word-index ranges [first, last) of the bits at this threshold"""
+        import numpy as np
+        if self.columns is None or not len(self.columns):
+            return []
+        count = int(np.searchsorted(self._sorted_gaps, -pause_threshold, side='right'))
+        bounds = [0] + np.sort(self._boundaries[:count]).tolist() + [len(self.columns)]
+        return list(zip(bounds, bounds[1:]))
+
+    def _analyze_ranges(self, ranges: List[Tuple[int, int]]) -> None:
+        """Classify, parse and run the detectors on every range not analyzed yet, in one batch"""
+        missing = [key for key in dict.fromkeys(ranges) if key not in self._analyzed]
+        if not missing:
+            return
+        segments = [SegmentSpan(self.columns, first, last).to_bit_segment() for first, last in missing]
+        texts = [segment.text for segment in segments]
+        contexts = build_segment_contexts(texts)
+        all_style_scores = classify_styles_batch(texts, self.classifier)
+        for key, segment, context, style_scores in zip(missing, segments, contexts, all_style_scores):
+            self._analyzed[key] = (_analyze_segment(segment, context, style_scores, None), None)
+
+    def analyze(self, pause_threshold: float = 1.5, timings: bool = False) -> Dict:
+        """
+        analyze_comedy_transcript() at this threshold, reusing every bit already analyzed at another one
+        The result also has a "sweep" block counting reused and newly analyzed bits.
+        """
+        if timings:
+            return _with_timings(self.analyze, pause_threshold)
+        if self.columns is None:
+            if self._untimed_result is None:
+                self._untimed_result = analyze_comedy_transcript(self.transcript_json, pause_threshold,
+                                                                 self.classifier)
+            return dict(self._untimed_result, sweep={"reused_segments": 0, "analyzed_segments": 0,
+                                                     "cached_ranges": 0})
+
+        with _stage("segmentation"):
+            ranges = self.ranges(pause_threshold)
+        cached_before = len(self._analyzed)
+        self._analyze_ranges(ranges)
+        analyzed_now = len(self._analyzed) - cached_before
+
+        analyzed_segments = []
+        statistics = OverallStatistics()
+        previous = None
+        for key in ranges:
+            analyzed, checked_against = self._analyzed[key]
+            if checked_against != previous:
+                previous_text = analyzed_segments[-1]['text'] if analyzed_segments else None
+                with _stage("detect_toppers"):
+                    topper = detect_toppers(analyzed['text'], previous_text)
+                if topper != analyzed['topper_detected']:
+                    analyzed = dict(analyzed, topper_detected=topper)
+                self._analyzed[key] = (analyzed, previous)
+            analyzed = dict(analyzed)  # Callers may annotate segments (e.g. apply_laughs)
+            analyzed_segments.append(analyzed)
+            statistics.add(analyzed)
+            previous = key
+
+        return {
+            "segments": analyzed_segments,
+            "overall_statistics": statistics.to_dict(),
+            "sweep": {
+                "reused_segments": len(ranges) - analyzed_now,
+                "analyzed_segments": analyzed_now,
+                "cached_ranges": len(self._analyzed),
+            }
+        }
+
+    def prefetch(self, pause_thresholds: Iterable[float]) -> int:
+        """
+        Analyze the bits of several thresholds (e.g. every slider stop) in one classification batch
+        Returns:
+            Number of newly analyzed ranges
+        """
+        if self.columns is None:
+            return 0
+        cached_before = len(self._analyzed)
+        self._analyze_ranges([key for threshold in pause_thresholds for key in self.ranges(threshold)])
+        return len(self._analyzed) - cached_before
+
+
+def analyze_transcript_stream(word_events: Iterable[Dict], pause_threshold: float = 1.5,
+                              classifier: Optional[AsyncStyleClassifier] = None,
+                              statistics: Optional[OverallStatistics] = None) -> Iterator[Dict]:
+    """
+    Streaming analyze_comedy_transcript(): yields each analyzed segment as soon as a pause closes it
+    Args:
+        word_events: Word dictionaries in time order (e.g. iter_transcript_words() or a live feed)
+        pause_threshold: Pause duration in seconds to segment bits
+        classifier: OpenAI classification engine; defaults apply if None
+        statistics: Optional OverallStatistics that is updated with every yielded segment
+    """
+    previous_text = None
+    for segment in iter_segments(word_events, pause_threshold):
+        context = build_segment_contexts([segment.text])[0]
+        style_scores = classify_styles_batch([segment.text], classifier)[0]
+        analyzed = _analyze_segment(segment, context, style_scores, previous_text)
+        if statistics is not None:
+            statistics.add(analyzed)
+        previous_text = segment.text
+        yield analyzed
+
+
+# Output formats: pretty JSON (default), compact JSON, JSONL (one segment per line) and MessagePack
+OUTPUT_FORMATS = {
+    "json": "_analyzed.json",
+    "compact": "_analyzed.json",
+    "jsonl": "_analyzed.jsonl",
+    "msgpack": "_analyzed.msgpack",
+}
+MSGPACK_FORMAT_NAME = "comedy-style-analysis"
+MSGPACK_FORMAT_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def _get_orjson():
+    """orjson if installed (pip install orjson), else None"""
+    try:
+        import orjson
+        return orjson
+    except ImportError:
+        return None
+
+
+def dumps_compact(obj) -> bytes:
+    """Compact UTF-8 JSON, with orjson when available (several times faster than json.dumps)"""
+    orjson = _get_orjson()
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data):
+    orjson = _get_orjson()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _get_msgpack():
+    try:
+        import msgpack
+        return msgpack
+    except ImportError:
+        raise ImportError("MessagePack output needs the msgpack package: pip install msgpack") from None
+
+
+def _pack_number(value: float):
+    # Integral scores (mostly 0.0) pack as one-byte ints; read_result() turns them back into floats
+    return int(value) if value == int(value) else value
+
+
+def _pack_segments(segments: List[Dict]) -> Dict:
+    """
+    Column-oriented MessagePack body: one row per segment in _BIT_SEGMENT_FIELDS order, with every
+    segment's text in one zlib-compressed blob (text is most of the size), style_scores as a float array
+    aligned with COMEDY_STYLES, styles as indices into it and trimming notes as indices into a string table
+    """
+    style_index = {style: i for i, style in enumerate(COMEDY_STYLES)}
+    strings: Dict[str, int] = {}
+    rows = []
+    for seg in segments:
+        row = []
+        for name in _BIT_SEGMENT_FIELDS:
+            value = seg.get(name)
+            if name == 'text':
+                value = None
+            elif value is None:
+                pass
+            elif name == 'style_scores':
+                value = [_pack_number(value.get(style, 0.0)) for style in COMEDY_STYLES]
+            elif name == 'styles':
+                value = [style_index[style] for style in value]
+            elif name == 'trimming_opportunities':
+                value = [strings.setdefault(note, len(strings)) for note in value]
+            elif name == 'balloon_pop_span':
+                value = value['buildup'] + value['reveal']
+            row.append(value)
+        rows.append(row)
+    texts = '\x00'.join(seg['text'] for seg in segments).encode('utf-8')
+    return {
+        "styles": COMEDY_STYLES,
+        "fields": _BIT_SEGMENT_FIELDS,
+        "strings": list(strings),
+        "texts": zlib.compress(texts, 1),
+        "segments": rows,
+    }
+
+
+def _unpack_segments(packed: Dict) -> List[Dict]:
+    styles, fields, strings = packed['styles'], packed['fields'], packed['strings']
+    texts = zlib.decompress(packed['texts']).decode('utf-8').split('\x00') if packed['segments'] else []
+    segments = []
+    for row, text in zip(packed['segments'], texts):
+        seg = dict(zip(fields, row))
+        seg['text'] = text
+        if seg.get('style_scores') is not None:
+            seg['style_scores'] = {style: float(score) for style, score in zip(styles, seg['style_scores'])}
+        if seg.get('styles') is not None:
+            seg['styles'] = [styles[index] for index in seg['styles']]
+        if seg.get('trimming_opportunities') is not None:
+            seg['trimming_opportunities'] = [strings[index] for index in seg['trimming_opportunities']]
+        if seg.get('balloon_pop_span') is not None:
+            span = seg['balloon_pop_span']
+            seg['balloon_pop_span'] = {"buildup": span[:2], "reveal": span[2:]}
+        segments.append(seg)
+    return segments
+
+
+def write_result(result: Dict, path: str, fmt: str = "json") -> None:
+    """
+    Write an analysis result in one of OUTPUT_FORMATS
+    json:    indented JSON (the classic *_analyzed.json)
+    compact: JSON without whitespace (orjson when installed)
+    jsonl:   one segment per line, then a line with overall_statistics and any other top-level blocks
+             (the same layout as --stream output)
+    msgpack: MessagePack; segments are rows in a fixed field order, style_scores is a float array
+             aligned with COMEDY_STYLES and segment texts are one compressed blob (see _pack_segments)
+    """
+    if fmt == "json":
+        with open(path, 'w') as f:
+            json.dump(result, f, indent=2)
+    elif fmt == "compact":
+        with open(path, 'wb') as f:
+            f.write(dumps_compact(result))
+    elif fmt == "jsonl":
+        with open(path, 'wb') as f:
+            for seg in result.get('segments', []):
+                f.write(dumps_compact(seg) + b'\n')
+            f.write(dumps_compact({k: v for k, v in result.items() if k != 'segments'}) + b'\n')
+    elif fmt == "msgpack":
+        msgpack = _get_msgpack()
+        packed = {k: v for k, v in result.items() if k != 'segments'}
+        packed.update(_pack_segments(result.get('segments', [])))
+        packed.update(format=MSGPACK_FORMAT_NAME, version=MSGPACK_FORMAT_VERSION)
+        with open(path, 'wb') as f:
+            f.write(msgpack.packb(packed))
+    else:
+        raise ValueError(f"Unknown output format: {fmt} (expected one of {', '.join(OUTPUT_FORMATS)})")
+
+
+def read_result(path: str) -> Dict:
+    """
+    Load an analysis result written in any of OUTPUT_FORMATS (or --stream output)
+    The format is sniffed from the content: MessagePack maps, one JSON document, or JSON lines.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:1] and data[:1] not in b'{[ \t\r\n':
+        msgpack = _get_msgpack()
+        packed = msgpack.unpackb(data)
+        if packed.pop('format', None) != MSGPACK_FORMAT_NAME:
+            raise ValueError(f"{path} is not a comedy style analysis MessagePack file")
+        packed.pop('version', None)
+        packed['segments'] = _unpack_segments(packed)
+        for name in ('styles', 'fields', 'strings', 'texts'):
+            del packed[name]
+        return packed
+    try:
+        result = _loads(data)
+        result.setdefault('segments', [])  # JSON lines of a transcript with no segments
+        return result
+    except ValueError:
+        pass  # More than one document: JSON lines
+    result = {"segments": []}
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        record = _loads(line)
+        if 'overall_statistics' in record:
+            result.update(record)
+        else:
+            result['segments'].append(record)
+    return result
+
+
+def _is_batch_output(path: str) -> bool:
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    return False
+                return isinstance(record, dict) and 'status' in record and 'file' in record
+    return False
+
+
+def iter_results(path: str) -> Iterator[Tuple[str, Dict]]:
+    """(source, analysis result) pairs from --batch JSONL output (one per successful file) or a result in any format"""
+    if path.endswith('.jsonl') and _is_batch_output(path):
+        with open(path, 'r') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get('status') == 'ok':
+                    yield record['file'], record['result']
+    else:
+        yield path, read_result(path)
+
+
+def _print_summary(results: Dict) -> None:
     print(f"\nSegments analyzed: {results['overall_statistics']['total_segments']}")
     print(f"Total syllables: {results['overall_statistics']['total_syllables']}")
     print(f"\nMost common styles:")
@@ -591,3 +2585,209 @@ if __name__ == "__main__":
     print(f"  Word Smuggling: {results['overall_statistics']['word_smuggling_detections']}")
     print(f"  Toppers: {results['overall_statistics']['topper_detections']}")
 
+
+def _run_stream(transcript_file: str, output_path: Optional[str], pause_threshold: float,
+                timings: bool = False) -> int:
+    """
+    --stream: one JSON line per analyzed segment, then a final {"overall_statistics": ...} line
+    (which also carries the "timings" block with --timings, as --format jsonl does)
+    """
+    statistics = OverallStatistics()
+    out = open(output_path, 'w') if output_path else sys.stdout
+    try:
+        with instrument() if timings else nullcontext() as instrumentation:
+            started = time.perf_counter()
+            if transcript_file == '-':
+                word_events = iter_word_lines(sys.stdin)
+            else:
+                word_events = iter_transcript_words(transcript_file)
+            for analyzed in analyze_transcript_stream(word_events, pause_threshold, statistics=statistics):
+                out.write(dumps_compact(analyzed).decode('utf-8') + '\n')
+                out.flush()
+
+            if statistics.total_segments == 0 and transcript_file != '-':
+                # No word timestamps: sentence segmentation needs the whole text anyway
+                with open(transcript_file, 'r') as f:
+                    results = analyze_comedy_transcript(json.load(f), pause_threshold)
+                for analyzed in results['segments']:
+                    out.write(dumps_compact(analyzed).decode('utf-8') + '\n')
+                    statistics.add(analyzed)
+            total = time.perf_counter() - started
+
+        summary = {"overall_statistics": statistics.to_dict()}
+        if instrumentation is not None:
+            summary["timings"] = dict(instrumentation.to_dict(), total_seconds=round(total, 6))
+        out.write(dumps_compact(summary).decode('utf-8') + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Analyze stand-up comedy transcripts for styles and Adam Bloom tools",
+        epilog='Transcript JSON format: {"text": "Full transcript text", '
+               '"words": [{"text": "word", "start": 0, "end": 100}]}',
+    )
+    parser.add_argument("inputs", nargs="*",
+                        help="Transcript JSON file, or directories/globs of transcripts with --batch")
+    parser.add_argument("--pause-threshold", type=float, default=1.5,
+                        help="Pause duration in seconds that separates bits (default: 1.5)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Don't read or write the persistent OpenAI style cache")
+    parser.add_argument("--style-model", default=None,
+                        help="Classify styles offline with a model from comedy_style_model.py train "
+                             "(same as setting COMEDY_STYLE_MODEL)")
+    parser.add_argument("--nlp-profile", choices=NLP_PROFILES, default=None,
+                        help="Spacy pipeline: accurate (full parser, default), fast (sentence recognizer only) "
+                             "or none (rule-based sentence splitter)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse the existing *_analyzed.json for bits that haven't changed")
+    parser.add_argument("--previous", default=None,
+                        help="Previous analysis result to reuse unchanged bits from (implies --incremental)")
+    parser.add_argument("--format", choices=list(OUTPUT_FORMATS), default=None,
+                        help="Output format for a single transcript: indented json (default), compact json, "
+                             "jsonl (one segment per line) or msgpack; --stream always writes jsonl")
+    parser.add_argument("--reuse-index", default=None,
+                        help="Near-duplicate index of earlier performances (created if missing): bits within "
+                             "--reuse-distance reuse their styles and detections, new bits are added")
+    parser.add_argument("--reuse-distance", type=int, default=None,
+                        help="Max SimHash bit difference for --reuse-index (default: 6, at most 7)")
+    parser.add_argument("--audio", default=None,
+                        help="WAV recording of the set: detect laughs and fill in laugh_count and bloom_efficiency_score")
+    parser.add_argument("--time-budget", type=float, default=None,
+                        help="Seconds per transcript to wait for OpenAI; bits still pending then are classified offline")
+    parser.add_argument("--progressive", action="store_true",
+                        help="Write offline results first, then rewrite the output as OpenAI classifications arrive")
+    parser.add_argument("--timings", action="store_true",
+                        help="Add per-stage timings and OpenAI/cache counters to the result")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", action="store_true",
+                       help="Analyze every transcript matched by the inputs in a process pool")
+    parser.add_argument("-o", "--output", default=None,
+                        help="Output file for --batch (default: batch_analyzed.jsonl) or --stream (default: stdout)")
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream analyzed segments as JSONL while the transcript is read "
+                             "('-' reads one JSON word object per line from stdin)")
+    batch.add_argument("-j", "--workers", type=int, default=None,
+                       help="Number of worker processes (default: CPU count)")
+    batch.add_argument("--unordered", action="store_true",
+                       help="Write results as they finish instead of in input order")
+    batch.add_argument("--no-resume", action="store_true",
+                       help="Re-analyze files that already have a successful record in the output")
+    batch.add_argument("--metrics", default=None,
+                       help="Write Prometheus-format stage timings and counters for the batch to this file")
+    daemon = parser.add_argument_group("daemon mode")
+    daemon.add_argument("--daemon", action="store_true",
+                        help="Keep the model loaded and answer newline-delimited JSON requests")
+    daemon.add_argument("--socket", default=None,
+                        help="Serve daemon requests on this Unix socket instead of stdin/stdout")
+    args = parser.parse_args(argv)
+
+    if args.no_cache:
+        os.environ["COMEDY_STYLE_CACHE"] = "off"  # Also reaches batch worker processes
+        disable_default_style_cache()
+
+    if args.style_model:
+        os.environ["COMEDY_STYLE_MODEL"] = args.style_model  # Also reaches batch worker processes
+        get_local_style_classifier()
+
+    if args.nlp_profile:
+        os.environ["COMEDY_NLP_PROFILE"] = args.nlp_profile  # Also reaches batch worker processes
+
+    if args.time_budget is not None:
+        os.environ["COMEDY_ANALYSIS_BUDGET"] = str(args.time_budget)  # Also reaches batch worker processes
+
+    if args.daemon:
+        from comedy_daemon import run_daemon
+        run_daemon(args.socket)
+        return 0
+    if not args.inputs:
+        parser.error("a transcript file is required (or use --daemon)")
+
+    if args.stream:
+        if args.format not in (None, "jsonl"):
+            parser.error(f"--stream writes JSON lines as segments are analyzed; it can't write --format {args.format}")
+        return _run_stream(args.inputs[0], args.output, args.pause_threshold, args.timings)
+
+    if args.batch or len(args.inputs) > 1:
+        from comedy_batch import analyze_batch, collect_transcript_files
+        args.output = args.output or "batch_analyzed.jsonl"
+        files = collect_transcript_files(args.inputs)
+        started = time.perf_counter()
+        stats = analyze_batch(files, args.output, workers=args.workers, ordered=not args.unordered,
+                              resume=not args.no_resume, pause_threshold=args.pause_threshold,
+                              timings=args.timings, metrics_path=args.metrics)
+        elapsed = time.perf_counter() - started
+        print(f"Batch complete in {elapsed:.1f}s! Results appended to {args.output}")
+        print(f"  Analyzed: {stats['analyzed']}")
+        print(f"  Skipped (already done): {stats['skipped']}")
+        print(f"  Failed: {stats['failed']}")
+        return 1 if stats['failed'] else 0
+
+    transcript_file = args.inputs[0]
+    with open(transcript_file, 'r') as f:
+        transcript_data = json.load(f)
+    args.format = args.format or "json"
+
+    output_file = transcript_file.replace('.json', OUTPUT_FORMATS[args.format])
+    previous_result = None
+    if args.previous:
+        previous_result = read_result(args.previous)
+    elif args.incremental and os.path.exists(output_file):
+        previous_result = read_result(output_file)
+
+    if previous_result is not None:
+        results = analyze_comedy_transcript_incremental(previous_result, transcript_data, args.pause_threshold,
+                                                        timings=args.timings)
+    elif args.reuse_index:
+        try:
+            if os.path.exists(args.reuse_index):
+                near_duplicates = NearDuplicateIndex.load(args.reuse_index, args.reuse_distance)
+            else:
+                near_duplicates = NearDuplicateIndex(**({} if args.reuse_distance is None else
+                                                        {"max_distance": args.reuse_distance}))
+        except ValueError as e:
+            parser.error(f"--reuse-index {args.reuse_index}: {e}")
+        results = analyze_comedy_transcript(transcript_data, args.pause_threshold, timings=args.timings,
+                                            near_duplicates=near_duplicates)
+        near_duplicates.save(args.reuse_index)
+    elif args.progressive:
+        for results in analyze_comedy_transcript_progressive(transcript_data, args.pause_threshold,
+                                                             timings=args.timings):
+            progress = results['progress']
+            if not progress['done']:
+                write_result(results, output_file, args.format)
+                _status(f"{progress['upgraded_segments']} of {len(results['segments'])} segments classified by OpenAI")
+    else:
+        results = analyze_comedy_transcript(transcript_data, args.pause_threshold, timings=args.timings)
+
+    if args.audio:
+        apply_laughs(results, detect_laughs(args.audio))
+
+    # Output results
+    write_result(results, output_file, args.format)
+
+    print(f"Analysis complete! Results saved to {output_file}")
+    if 'incremental' in results:
+        print(f"Reused {results['incremental']['reused_segments']} unchanged segments, "
+              f"re-analyzed {results['incremental']['reanalyzed_segments']}")
+    if 'near_duplicates' in results:
+        print(f"Reused {results['near_duplicates']['reused_segments']} bits from earlier performances, "
+              f"analyzed {results['near_duplicates']['analyzed_segments']}")
+    if 'laughs' in results:
+        print(f"Detected {results['laughs']['events']} laughs ({results['laughs']['laugh_seconds']:.0f}s of laughter)")
+    if 'timings' in results:
+        print(f"Analysis took {results['timings']['total_seconds'] * 1000:.1f} ms:")
+        for stage, timing in sorted(results['timings']['stages'].items(), key=lambda x: -x[1]['seconds']):
+            print(f"  {stage}: {timing['seconds'] * 1000:.1f} ms")
+    _print_summary(results)
+    return 0
+
+
+# CLI usage. main() runs in the importable module rather than __main__, so the modules it hands
+# off to (comedy_batch, comedy_daemon), which import comedy_style_analyzer, share its state.
+if __name__ == "__main__":
+    import comedy_style_analyzer
+    sys.exit(comedy_style_analyzer.main())
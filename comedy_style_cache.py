@@ -0,0 +1,156 @@
+"""
+Persistent cache of OpenAI style scores, stored in SQLite
+Scores are keyed by a hash of the normalized bit text, the OpenAI model, PROMPT_VERSION and the
+COMEDY_STYLES list. Entries expire after a TTL and the least recently used ones are evicted beyond
+a size limit. Entries keep their bit text, so the cache doubles as training data for the local
+style model (see comedy_style_model.py).
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from comedy_styles import COMEDY_STYLES
+
+PROMPT_VERSION = 2  # Bump whenever the analyzer's classification prompts change meaning
+DEFAULT_STYLE_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "comedy-style-analyzer", "style_cache.sqlite3")
+
+
+def normalize_bit_text(text: str) -> str:
+    """Canonical form of a bit for cache keys: Unicode-normalized, case-folded, whitespace collapsed"""
+    return ' '.join(unicodedata.normalize('NFKC', text).casefold().split())
+
+
+class StyleCache:
+    """
+    On-disk cache of OpenAI style scores, keyed by a hash of the normalized bit text plus the model,
+    prompt version and COMEDY_STYLES list (so changing any of those never serves stale scores)
+    Entries expire after ttl_seconds; beyond max_entries the least recently used ones are evicted.
+    Only real model scores belong here - keyword fallbacks must never be stored.
+    """
+
+    def __init__(self, path: str = DEFAULT_STYLE_CACHE_PATH, max_entries: int = 100_000,
+                 ttl_seconds: Optional[float] = 30 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.stats = Counter()
+        self._conn = None
+        self._conn_pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Connections can't cross fork(), so batch workers each open their own
+        if self._conn is None or self._conn_pid != os.getpid():
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS style_scores (
+                    key TEXT PRIMARY KEY,
+                    scores TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_style_scores_last_used ON style_scores(last_used)")
+            # Bit text (normalized) so cached scores can double as training labels; added after the first release
+            if 'text' not in {row[1] for row in conn.execute("PRAGMA table_info(style_scores)")}:
+                conn.execute("ALTER TABLE style_scores ADD COLUMN text TEXT")
+            conn.commit()
+            self._conn, self._conn_pid = conn, os.getpid()
+        return self._conn
+
+    @staticmethod
+    def make_key(bit_text: str, model: str, prompt_version: int = PROMPT_VERSION) -> str:
+        payload = json.dumps([model, prompt_version, COMEDY_STYLES, normalize_bit_text(bit_text)])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, Dict[str, float]]:
+        """Cached scores for whichever keys are present and fresh"""
+        unique = list(dict.fromkeys(keys))
+        if not unique:
+            return {}
+        now = time.time()
+        found, expired = {}, []
+        with self._lock:
+            conn = self._connection()
+            for i in range(0, len(unique), 500):  # Stay under SQLite's bound-parameter limit
+                chunk = unique[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT key, scores, created_at FROM style_scores WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchall()
+                for key, scores, created_at in rows:
+                    if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                        expired.append((key,))
+                    else:
+                        found[key] = json.loads(scores)
+            if expired:
+                conn.executemany("DELETE FROM style_scores WHERE key = ?", expired)
+            if found:
+                conn.executemany("UPDATE style_scores SET last_used = ? WHERE key = ?",
+                                 [(now, key) for key in found])
+            conn.commit()
+        self.stats['hits'] += sum(1 for key in keys if key in found)
+        self.stats['misses'] += sum(1 for key in keys if key not in found)
+        self.stats['expired'] += len(expired)
+        return found
+
+    def put_many(self, entries: Dict[str, Dict[str, float]], texts: Optional[Dict[str, str]] = None) -> None:
+        """Store scores by key; texts (key -> bit text) keeps the text for labeled_examples()"""
+        if not entries:
+            return
+        texts = texts or {}
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT OR REPLACE INTO style_scores (key, scores, created_at, last_used, text) VALUES (?, ?, ?, ?, ?)",
+                [(key, json.dumps(scores), now, now,
+                  normalize_bit_text(texts[key]) if key in texts else None)
+                 for key, scores in entries.items()])
+            (count,) = conn.execute("SELECT COUNT(*) FROM style_scores").fetchone()
+            excess = count - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    "DELETE FROM style_scores WHERE key IN "
+                    "(SELECT key FROM style_scores ORDER BY last_used ASC LIMIT ?)", (excess,))
+                self.stats['evictions'] += excess
+            conn.commit()
+        self.stats['stores'] += len(entries)
+
+    def labeled_examples(self, model: Optional[str] = None) -> List[Tuple[str, Dict[str, float]]]:
+        """
+        (normalized bit text, model scores) for every fresh entry stored with its text
+        Keys are hashes, so model filters on scores cached under that model name and the current prompt
+        (entries from other models/prompts are skipped when model is given)
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, text, scores, created_at FROM style_scores WHERE text IS NOT NULL").fetchall()
+        examples = []
+        for key, text, scores, created_at in rows:
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                continue
+            if model is not None and key != self.make_key(text, model):
+                continue
+            examples.append((text, json.loads(scores)))
+        return examples
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM style_scores")
+            conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM style_scores").fetchone()[0]
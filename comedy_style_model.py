@@ -0,0 +1,165 @@
+"""
+Train and evaluate the local (offline) style classifier on OpenAI labels
+Usage: python comedy_style_model.py train -o style_model.npz [--cache PATH] [--bits results.jsonl ...]
+       python comedy_style_model.py evaluate style_model.npz --bits held_out_analyzed.json ... [--cache PATH]
+
+Labels come only from the style cache (bits classified by OpenAI since the cache started keeping bit
+text). Analysis results can't be trusted as labels: their style_scores may be keyword or local-model
+fallbacks. --bits only restricts the cached labels to the bits of some results. train reports
+agreement on a random holdout; evaluate needs --bits, naming bits the model was not trained on, since
+scoring it on every cached label would mostly measure how well it fits its own training data.
+Use the trained model with COMEDY_STYLE_MODEL=style_model.npz or --style-model.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import comedy_style_analyzer as analyzer
+from comedy_local_classifier import LocalStyleClassifier
+from comedy_style_cache import DEFAULT_STYLE_CACHE_PATH, StyleCache, normalize_bit_text
+from comedy_styles import COMEDY_STYLES
+
+
+def load_examples(cache_path: str, bit_paths: Optional[List[str]] = None,
+                  model: Optional[str] = None) -> List[Tuple[str, Dict[str, float]]]:
+    """
+    (normalized bit text, OpenAI style scores) pairs from the style cache, one per distinct text
+    The cache only ever stores OpenAI answers (fallback scores are never cached), so no example can be
+    a keyword score or the local model's own prediction.
+    Args:
+        bit_paths: Analysis results (any --format, or --batch JSONL); if given, only their bits are kept
+    """
+    examples = dict(StyleCache(cache_path, ttl_seconds=None).labeled_examples(model))
+    if bit_paths:
+        wanted = {normalize_bit_text(seg['text'])
+                  for path in bit_paths for _, result in analyzer.iter_results(path)
+                  for seg in result.get('segments', []) if seg.get('text')}
+        examples = {text: scores for text, scores in examples.items() if text in wanted}
+    return list(examples.items())
+
+
+def agreement(predicted, gold, threshold: float = 0.3) -> Dict[str, float]:
+    """
+    How closely predicted score matrices match the LLM labels (both bits x COMEDY_STYLES)
+    A style "applies" when its score is above threshold, the same cut-off used for a segment's styles.
+    """
+    import numpy as np
+    predicted_labels, gold_labels = predicted > threshold, gold > threshold
+    true_pos = (predicted_labels & gold_labels).sum(axis=0)
+    false_pos = (predicted_labels & ~gold_labels).sum(axis=0)
+    false_neg = (~predicted_labels & gold_labels).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        per_style_f1 = 2 * true_pos / (2 * true_pos + false_pos + false_neg)
+    present = gold_labels.any(axis=0)
+    micro_f1 = 2 * true_pos.sum() / max(1, 2 * true_pos.sum() + false_pos.sum() + false_neg.sum())
+    labeled = gold.max(axis=1) > threshold
+    top_style = (predicted.argmax(axis=1) == gold.argmax(axis=1))[labeled]
+    return {
+        "bits": int(len(gold)),
+        "mean_absolute_error": round(float(np.abs(predicted - gold).mean()), 4),
+        "micro_f1": round(float(micro_f1), 4),
+        "macro_f1": round(float(per_style_f1[present].mean()) if present.any() else 0.0, 4),
+        "exact_style_set": round(float((predicted_labels == gold_labels).all(axis=1).mean()), 4),
+        "top_style_agreement": round(float(top_style.mean()) if len(top_style) else 0.0, 4),
+        "per_style_f1": {style: round(float(f1), 4)
+                         for style, f1, seen in zip(COMEDY_STYLES, per_style_f1, present) if seen},
+    }
+
+
+def _score_matrix(scores: List[Dict[str, float]]):
+    import numpy as np
+    return np.array([[float(s.get(style, 0.0)) for style in COMEDY_STYLES] for s in scores])
+
+
+def evaluate(model: LocalStyleClassifier, examples: List[Tuple[str, Dict[str, float]]],
+             threshold: float = 0.3) -> Dict:
+    """Agreement of the model (and of the keyword classifier, for reference) with the labels, plus speed"""
+    texts = [text for text, _ in examples]
+    gold = _score_matrix([scores for _, scores in examples])
+    started = time.perf_counter()
+    predicted = model.predict_matrix(texts)
+    elapsed = time.perf_counter() - started
+    report = {
+        "local_model": agreement(predicted, gold, threshold),
+        "keyword_baseline": agreement(_score_matrix([analyzer.classify_styles_keyword(t) for t in texts]), gold,
+                                      threshold),
+        "bits_per_second": round(len(texts) / elapsed) if elapsed else None,
+    }
+    return report
+
+
+def _print_report(report: Dict) -> None:
+    for name in ("local_model", "keyword_baseline"):
+        metrics = report[name]
+        print(f"{name.replace('_', ' ').capitalize()} vs. LLM labels ({metrics['bits']} bits):")
+        print(f"  micro F1 {metrics['micro_f1']:.3f}   macro F1 {metrics['macro_f1']:.3f}   "
+              f"top style {metrics['top_style_agreement']:.1%}   exact style set {metrics['exact_style_set']:.1%}   "
+              f"MAE {metrics['mean_absolute_error']:.3f}")
+    print(f"Scoring speed: {report['bits_per_second']:,} bits/s")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train or evaluate the local style classifier")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    train = subparsers.add_parser("train", help="Fit a model on OpenAI labels")
+    train.add_argument("-o", "--output", required=True, help="Where to save the model (.npz)")
+    train.add_argument("--holdout", type=float, default=0.2, help="Fraction of bits held out for evaluation")
+    train.add_argument("--seed", type=int, default=0)
+    train.add_argument("--epochs", type=int, default=100)
+    train.add_argument("--min-df", type=int, default=2, help="Ignore terms seen in fewer bits than this")
+    train.add_argument("--max-features", type=int, default=50000)
+    train.add_argument("--bits", nargs="*", default=[],
+                       help="Only use the cached labels of bits in these analysis results "
+                            "(any --format, or --batch JSONL)")
+    evaluate_parser = subparsers.add_parser("evaluate", help="Report agreement of a saved model with held-out labels")
+    evaluate_parser.add_argument("model")
+    evaluate_parser.add_argument("--bits", nargs="+", required=True,
+                                 help="Analysis results whose bits the model was not trained on; their cached "
+                                      "labels are the test set (any --format, or --batch JSONL)")
+    for command in (train, evaluate_parser):
+        command.add_argument("--cache", default=os.getenv("COMEDY_STYLE_CACHE", DEFAULT_STYLE_CACHE_PATH),
+                             help="Style cache to take OpenAI labels from (default: COMEDY_STYLE_CACHE or its default)")
+        command.add_argument("--openai-model", default=None,
+                             help="Only use cached labels from this OpenAI model (default: any)")
+        command.add_argument("--threshold", type=float, default=0.3, help="Score above which a style applies")
+        command.add_argument("--json", action="store_true", help="Print the evaluation as JSON")
+    args = parser.parse_args(argv)
+
+    if not args.cache or args.cache == "off":
+        parser.error("labels come from the style cache; give its path with --cache")
+    examples = load_examples(args.cache, args.bits, args.openai_model)
+    if not examples:
+        parser.error(f"no OpenAI-labeled bits in {args.cache}" + (" for the given --bits" if args.bits else ""))
+
+    if args.command == "train":
+        random.Random(args.seed).shuffle(examples)
+        held = int(len(examples) * args.holdout)
+        test, training = examples[:held], examples[held:]
+        started = time.perf_counter()
+        model = LocalStyleClassifier.train([t for t, _ in training], [s for _, s in training],
+                                           epochs=args.epochs, min_df=args.min_df,
+                                           max_features=args.max_features)
+        model.save(args.output)
+        print(f"Trained on {len(training)} bits ({model.meta['features']} features) in "
+              f"{time.perf_counter() - started:.1f}s; saved to {args.output}", file=sys.stderr)
+        if not test:
+            return 0
+        examples = test
+    else:
+        model = LocalStyleClassifier.load(args.model)
+
+    report = evaluate(model, examples, args.threshold)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        _print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,12 @@
+"""
+Comedy style names, shared by the analyzer, its style cache and the local style model
+Cache keys and saved models record this list, so changing it invalidates both.
+"""
+
+# Comedy Styles
+COMEDY_STYLES = [
+    "Anecdotal", "Clowning", "Edgy", "Fantastical", "Heartfelt", 
+    "Observational", "Opinionated", "Playful", "Puns", "Philosophical", 
+    "Sarcasm", "Satire", "Self-deprecation", "Shock", "Superiority", 
+    "Surrealism", "Tragedy", "Wordplay"
+]
@@ -0,0 +1,35 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import comedy_benchmark as benchmark  # noqa: E402
+import comedy_style_analyzer as analyzer  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def offline_analyzer(monkeypatch):
+    """
+    Deterministic analysis without network, model downloads or the user's cache: keyword styles, the
+    rule-based sentence splitter, no style cache (the environment also reaches batch worker processes)
+    """
+    monkeypatch.setenv("COMEDY_NLP_PROFILE", "none")
+    monkeypatch.setenv("COMEDY_STYLE_CACHE", "off")
+    monkeypatch.setenv("OPENAI_API_KEY", "")
+    monkeypatch.delenv("COMEDY_STYLE_MODEL", raising=False)
+    monkeypatch.setattr(analyzer, "nlp", analyzer.RuleSentenceSplitter())
+    monkeypatch.setattr(analyzer, "_nlp_loaded", True)
+    monkeypatch.setattr(analyzer, "OPENAI_API_KEY", None)
+    monkeypatch.setattr(analyzer, "_openai_loaded", True)
+    monkeypatch.setattr(analyzer, "_default_style_cache", None)
+    monkeypatch.setattr(analyzer, "_default_style_cache_loaded", True)
+    monkeypatch.setattr(analyzer, "_default_local_classifier", None)
+    monkeypatch.setattr(analyzer, "_default_local_classifier_loaded", True)
+
+
+@pytest.fixture
+def transcript():
+    """A seeded five-minute set (about 20 bits)"""
+    return benchmark.generate_set(5, seed=3)
@@ -0,0 +1,103 @@
+import random
+
+import numpy as np
+import pytest
+
+import comedy_alignment as alignment
+
+
+def _full_matrix(reference, other):
+    return [[bin(a ^ b).count('1') for b in other.tolist()] for a in reference.tolist()]
+
+
+def _full_matrix_anchors(distances, anchor_distance):
+    """Anchor candidates straight from the definition, over the full distance matrix"""
+    candidates = []
+    for i, row in enumerate(distances):
+        for j, distance in enumerate(row):
+            column = [r[j] for r in distances]
+            if distance <= anchor_distance and row.count(distance) == 1 and column.count(distance) == 1 \
+                    and distance == min(row) and distance == min(column):
+                candidates.append((i, j))
+    return candidates
+
+
+def _full_gap_score(distances, i0, i1, j0, j1, max_distance, band):
+    """Best summed closeness of an order-preserving in-band matching, by the full quadratic DP"""
+    rows, cols = i1 - i0, j1 - j0
+    score = [[0] * (cols + 1) for _ in range(rows + 1)]
+    for r in range(1, rows + 1):
+        for c in range(1, cols + 1):
+            score[r][c] = max(score[r - 1][c], score[r][c - 1])
+            distance = distances[i0 + r - 1][j0 + c - 1]
+            if distance <= max_distance and abs(c - 1 - (r - 1) * cols / rows) <= band:
+                score[r][c] = max(score[r][c], score[r - 1][c - 1] + max_distance + 1 - distance)
+    return score[rows][cols]
+
+
+def _fingerprints(rng, count, pool):
+    """Fingerprints drawn from a small pool with a few bits flipped, so near and exact ties are common"""
+    base = [rng.getrandbits(64) for _ in range(pool)]
+    prints = []
+    for _ in range(count):
+        value = rng.choice(base)
+        for _ in range(rng.choice([0, 0, 1, 2, 3, 5, 8, 20])):
+            value ^= 1 << rng.randrange(64)
+        prints.append(value)
+    return np.array(prints, dtype=np.uint64)
+
+
+CASES = list(range(150))
+
+
+@pytest.mark.parametrize("seed", CASES)
+def test_anchors_match_full_matrix(seed):
+    rng = random.Random(seed)
+    pool = rng.choice([1, 3, 10, 40])
+    reference, other = _fingerprints(rng, rng.randrange(25), pool), _fingerprints(rng, rng.randrange(25), pool)
+    distances = _full_matrix(reference, other)
+    for anchor_distance in (0, 2, 4, 9):
+        chain = alignment._anchors(reference.tolist(), other.tolist(), anchor_distance)
+        candidates = _full_matrix_anchors(distances, anchor_distance)
+        assert set(chain) <= set(candidates)
+        assert all(a[0] < b[0] and a[1] < b[1] for a, b in zip(chain, chain[1:]))
+        # Longest increasing chain: no candidate could extend it
+        longest = [1] * len(candidates)
+        for k, (i, j) in enumerate(candidates):
+            longest[k] += max([longest[m] for m in range(k) if candidates[m][1] < j], default=0)
+        assert len(chain) == max(longest, default=0)
+
+
+@pytest.mark.parametrize("seed", CASES)
+def test_banded_gap_alignment_is_optimal(seed):
+    rng = random.Random(seed)
+    pool = rng.choice([1, 3, 10, 40])
+    n, m = rng.randrange(30), rng.randrange(30)
+    reference, other = _fingerprints(rng, n, pool), _fingerprints(rng, m, pool)
+    distances = _full_matrix(reference, other)
+    max_distance, band = rng.choice([4, 16, 30]), rng.choice([0, 1, 3, 16])
+    i0, j0 = rng.randrange(n + 1), rng.randrange(m + 1)
+    i1, j1 = rng.randrange(i0, n + 1), rng.randrange(j0, m + 1)
+
+    pairs = alignment._align_gap(reference, other, i0, i1, j0, j1, max_distance, band)
+
+    assert all(a[0] < b[0] and a[1] < b[1] for a, b in zip(pairs, pairs[1:]))
+    for i, j in pairs:
+        assert i0 <= i < i1 and j0 <= j < j1
+        assert distances[i][j] <= max_distance
+        assert abs((j - j0) - (i - i0) * (j1 - j0) / (i1 - i0)) <= band
+    score = sum(max_distance + 1 - distances[i][j] for i, j in pairs)
+    expected = _full_gap_score(distances, i0, i1, j0, j1, max_distance, band) if i1 > i0 and j1 > j0 else 0
+    assert score == expected
+
+
+def test_align_pair_recovers_an_edited_performance():
+    rng = random.Random(0)
+    reference = np.array([rng.getrandbits(64) for _ in range(200)], dtype=np.uint64)
+    kept = [i for i in range(200) if rng.random() > 0.1]
+    other = reference[kept] ^ np.array([1 << rng.randrange(64) for _ in kept], dtype=np.uint64)
+
+    pairs = alignment.align_pair(reference, other)
+
+    assert [(i, j) for i, j, _ in pairs] == [(i, j) for j, i in enumerate(kept)]
+    assert all(distance == 1 for _, _, distance in pairs)
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import re
+import zlib
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+BITS = [f"Bit number {i} is about my {topic}" for i, topic in enumerate(
+    ["landlord", "dentist", "airport", "mother", "cat", "gym", "uber", "wedding"])]
+
+
+class ScriptedClient(benchmark.StubChatClient):
+    """StubChatClient that records concurrency and raises the scripted errors on its first calls"""
+
+    def __init__(self, errors=(), answer=None, **kwargs):
+        super().__init__(**kwargs)
+        self.errors = list(errors)
+        self.answer = answer
+        self.prompts = []
+        self.in_flight = self.peak = 0
+
+    async def complete(self, messages, max_tokens):
+        self.prompts.append(messages[-1]["content"])
+        if self.errors:
+            self.calls += 1
+            raise self.errors.pop(0)
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if self.answer is not None:
+                self.calls += 1
+                return self.answer
+            return await super().complete(messages, max_tokens)
+        finally:
+            self.in_flight -= 1
+
+
+def _classify(client, texts=BITS, **kwargs):
+    kwargs.setdefault("circuit_breaker", analyzer.CircuitBreaker(failure_threshold=100))
+    classifier = analyzer.AsyncStyleClassifier(client, use_cache=False, backoff_base=0.0, **kwargs)
+    scores, from_model = analyzer._run_coroutine(classifier._classify_many_tracked(texts))
+    return classifier, scores, from_model
+
+
+def test_bits_are_packed_and_repeats_sent_once():
+    client = ScriptedClient()
+    texts = BITS + [BITS[0].upper(), BITS[3]]
+
+    _, scores, from_model = _classify(client, texts, bits_per_request=3)
+
+    assert client.calls == 3  # 8 distinct bits, 3 to a prompt
+    assert all(from_model) and len(scores) == len(texts)
+    assert scores[8] == scores[0] and scores[9] == scores[3]
+    assert sum(len(re.findall(r'^Bit \d+: ', prompt, re.MULTILINE)) for prompt in client.prompts) == len(BITS)
+
+
+class EchoClient:
+    """Scores each packed bit from its own text, so answers only line up if bits are matched back correctly"""
+    model = "echo"
+
+    async def complete(self, messages, max_tokens):
+        bits = re.findall(r'^Bit (\d+): "(.*)"$', messages[-1]["content"], re.MULTILINE)
+        return json.dumps({number: {"Observational": zlib.crc32(text.encode()) % 100 / 100} for number, text in bits})
+
+
+def test_answers_are_matched_back_to_their_bits():
+    for size in (2, 3, 5):
+        _, scores, from_model = _classify(EchoClient(), BITS[::-1], bits_per_request=size)
+
+        assert all(from_model)
+        assert [bit_scores["Observational"] for bit_scores in scores] == \
+            [zlib.crc32(text.encode()) % 100 / 100 for text in BITS[::-1]]
+
+
+def test_concurrency_caps_requests_in_flight():
+    client = ScriptedClient()
+
+    _classify(client, bits_per_request=1, concurrency=3)
+
+    assert client.calls == len(BITS) and client.peak == 3
+
+
+def test_rate_limits_are_retried():
+    client = ScriptedClient(errors=[analyzer.RateLimitError(retry_after=0.0)] * 2)
+
+    classifier, scores, from_model = _classify(client, BITS[:2], bits_per_request=2)
+
+    assert classifier.stats["retries"] == 2 and classifier.stats["requests"] == 3
+    assert all(from_model)
+
+
+def test_other_errors_and_exhausted_retries_fall_back():
+    for errors, requests in [([ConnectionError("down")], 1), ([analyzer.RateLimitError(retry_after=0.0)] * 3, 3)]:
+        client = ScriptedClient(errors=errors)
+
+        classifier, scores, from_model = _classify(client, BITS[:2], bits_per_request=2, max_retries=2)
+
+        assert classifier.stats["requests"] == requests
+        assert from_model == [False, False]
+        assert scores == [analyzer.classify_styles_keyword(text) for text in BITS[:2]]
+
+
+def test_bits_missing_from_a_packed_answer_fall_back():
+    answer = json.dumps({"1": {"Sarcasm": 0.9}, "3": {"Puns": 0.6}})
+
+    _, scores, from_model = _classify(ScriptedClient(answer=answer), BITS[:3], bits_per_request=3)
+
+    assert from_model == [True, False, True]
+    assert scores[0]["Sarcasm"] == 0.9 and scores[2]["Puns"] == 0.6
+    assert scores[1] == analyzer.classify_styles_keyword(BITS[1])
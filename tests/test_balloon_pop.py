@@ -0,0 +1,65 @@
+import random
+import re
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+
+def _cross_product_balloon_pop(text):
+    """The detector before the single-pass rewrite: every buildup end against every reveal start"""
+    if not text:
+        return False
+    buildup_patterns = [
+        r"(so|then|and|but|until|when|suddenly)\s+[^.!?]{10,}",
+        r"(turns out|actually|really|just|only)",
+        r"(wait|hold on|no way|you know what)"
+    ]
+    reveal_indicators = [
+        r"\b(just|only|actually|really|turns out|but|however)\b",
+        r"\b(not|never|no|nobody|nothing)\b",
+        r"\b(was|is|are|were)\s+\w+ing",
+    ]
+    text_lower = text.lower()
+    buildup_positions = [m.end() for pattern in buildup_patterns for m in re.finditer(pattern, text_lower)]
+    reveal_positions = [m.start() for pattern in reveal_indicators for m in re.finditer(pattern, text_lower)]
+    return any(rev > build for build in buildup_positions for rev in reveal_positions)
+
+
+SIGNAL_WORDS = ["so", "then", "and", "but", "until", "when", "suddenly", "turns out", "actually", "really",
+                "just", "only", "wait", "hold on", "no way", "you know what", "however", "not", "never",
+                "no", "nobody", "nothing", "was", "is", "are", "were", "going", "Suddenly", "BUT", "Nothing"]
+
+
+def _random_texts(count, seed=0):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(SIGNAL_WORDS) if rng.random() < 0.3 else rng.choice(benchmark.VOCABULARY)
+                  for _ in range(rng.randint(0, 30))]
+        tokens = [token + rng.choice(["", "", "", "ing", ".", "!", "?", ","]) for token in tokens]
+        texts.append(' '.join(tokens))
+    return texts
+
+
+TEXTS = _random_texts(400) + ["", "And then I went all the way downtown. It was nothing.", "Wait, no"]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_single_pass_matches_cross_product(text):
+    assert analyzer.detect_balloon_pop(text) == _cross_product_balloon_pop(text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_reported_span_is_earliest_buildup_then_first_reveal(text):
+    pop = analyzer.find_balloon_pop(text)
+    if pop is None:
+        return
+    buildups = [m.span() for pattern in analyzer.BALLOON_BUILDUP_PATTERNS for m in pattern.finditer(text)]
+    assert pop["buildup"][1] == min(end for _, end in buildups)
+    assert tuple(pop["buildup"]) in buildups
+    reveals = [m.span() for pattern in analyzer.BALLOON_REVEAL_PATTERNS for m in pattern.finditer(text)]
+    later = [span for span in reveals if span[0] > pop["buildup"][1]]
+    assert pop["reveal"][0] == min(start for start, _ in later)
+    assert tuple(pop["reveal"]) in later
@@ -0,0 +1,92 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+import comedy_batch
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+
+def _write_transcripts(directory, count):
+    paths = []
+    for seed in range(count):
+        path = directory / f"set_{seed}.json"
+        path.write_text(json.dumps(benchmark.generate_set(2, seed=seed)))
+        paths.append(str(path))
+    return paths
+
+
+def _records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_batch_results_match_serial_analysis(tmp_path):
+    files = _write_transcripts(tmp_path, 5)
+    output = tmp_path / "out.jsonl"
+
+    stats = comedy_batch.analyze_batch(files, str(output), workers=2)
+
+    assert stats == {"analyzed": 5, "failed": 0, "skipped": 0}
+    records = _records(output)
+    assert [record["file"] for record in records] == files
+    for record in records:
+        with open(record["file"]) as f:
+            expected = analyzer.analyze_comedy_transcript(json.load(f))
+        assert record["status"] == "ok"
+        assert record["result"] == json.loads(json.dumps(expected))
+
+
+def test_unordered_batch_writes_every_file_once(tmp_path):
+    files = _write_transcripts(tmp_path, 6)
+    output = tmp_path / "out.jsonl"
+
+    comedy_batch.analyze_batch(files, str(output), workers=3, ordered=False)
+
+    assert sorted(record["file"] for record in _records(output)) == sorted(files)
+
+
+def test_batch_reports_failures_and_resumes(tmp_path):
+    files = _write_transcripts(tmp_path, 2)
+    broken = tmp_path / "broken.json"
+    broken.write_text("{not json")
+    files.append(str(broken))
+    output = tmp_path / "out.jsonl"
+
+    first = comedy_batch.analyze_batch(files, str(output), workers=2)
+    second = comedy_batch.analyze_batch(files, str(output), workers=2)
+
+    assert first == {"analyzed": 2, "failed": 1, "skipped": 0}
+    assert second == {"analyzed": 0, "failed": 1, "skipped": 2}
+    errors = [record for record in _records(output) if record["status"] == "error"]
+    assert [record["file"] for record in errors] == [str(broken)] * 2
+    assert errors[0]["error"].startswith("JSONDecodeError")
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="workers must inherit the patched analyzer")
+@pytest.mark.parametrize("ordered", [True, False])
+def test_worker_crash_only_fails_its_own_file(tmp_path, monkeypatch, ordered):
+    analyze = analyzer.analyze_comedy_transcript
+
+    def crash_on_marker(transcript, *args, **kwargs):
+        if transcript["text"] == "crash":
+            os._exit(1)  # A worker killed outright, e.g. by the OOM killer
+        return analyze(transcript, *args, **kwargs)
+
+    monkeypatch.setattr(analyzer, "analyze_comedy_transcript", crash_on_marker)
+    files = _write_transcripts(tmp_path, 6)
+    crash = tmp_path / "crash.json"
+    crash.write_text(json.dumps({"text": "crash"}))
+    files.insert(1, str(crash))
+    output = tmp_path / "out.jsonl"
+
+    stats = comedy_batch.analyze_batch(files, str(output), workers=2, ordered=ordered)
+
+    assert stats == {"analyzed": 6, "failed": 1, "skipped": 0}
+    records = _records(output)
+    assert sorted(record["file"] for record in records) == sorted(files)
+    errors = [record for record in records if record["status"] == "error"]
+    assert [record["file"] for record in errors] == [str(crash)]
+    assert errors[0]["error"].startswith("BrokenProcessPool")
@@ -0,0 +1,30 @@
+import comedy_benchmark as benchmark
+
+
+def _report(**sets):
+    return {"results": {name: {"stages": stages} for name, stages in sets.items()}}
+
+
+BASELINE = _report(**{"5min": {"segmentation": 0.010, "classification": 0.050},
+                      "30min": {"segmentation": 0.060, "classification": 0.300}})
+
+
+def test_unchanged_report_passes():
+    assert benchmark.compare_reports(BASELINE, BASELINE) == []
+
+
+def test_slower_stage_fails_only_past_both_thresholds():
+    current = _report(**{"5min": {"segmentation": 0.0119, "classification": 0.050},  # +19% but only 1.9 ms
+                         "30min": {"segmentation": 0.075, "classification": 0.300}})  # +25% and 15 ms
+
+    assert [message.split(":")[0] for message in benchmark.compare_reports(BASELINE, current)] == \
+        ["30min segmentation"]
+
+
+def test_missing_stages_and_set_lengths_fail():
+    current = _report(**{"5min": {"segmentation": 0.010}, "120min": {"segmentation": 0.2}})
+
+    assert benchmark.compare_reports(BASELINE, current) == [
+        "5min classification: missing from the current report",
+        "30min: missing from the current report",
+    ]
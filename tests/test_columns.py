@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+np = pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def long_set():
+    """More words than one ingest chunk (16384), so several chunks are stitched together"""
+    transcript = benchmark.generate_set(240, seed=11)
+    assert len(transcript["words"]) > 16384 * 2
+    return transcript
+
+
+def _assert_same_columns(columns, other):
+    assert np.array_equal(columns.starts, other.starts)
+    assert np.array_equal(columns.ends, other.ends)
+    assert [columns.vocab[i] for i in columns.token_ids] == [other.vocab[i] for i in other.token_ids]
+
+
+def test_chunked_ingest_keeps_every_word(long_set):
+    words = long_set["words"]
+
+    columns = analyzer.TranscriptColumns.from_words(words)
+
+    assert len(columns) == len(words)
+    assert columns.starts.tolist() == [w["start"] / 1000.0 for w in words]
+    assert columns.ends.tolist() == [w["end"] / 1000.0 for w in words]
+    assert columns.text(0, len(columns)) == " ".join(w["text"] for w in words)
+    assert len(columns.vocab) == len({w["text"] for w in words})
+
+
+def test_from_file_matches_from_words(long_set, tmp_path):
+    path = tmp_path / "set.json"
+    path.write_text(json.dumps(long_set))
+
+    _assert_same_columns(analyzer.TranscriptColumns.from_file(str(path)),
+                         analyzer.TranscriptColumns.from_words(long_set["words"]))
+
+
+def test_columns_can_be_re_segmented(long_set):
+    columns = analyzer.TranscriptColumns.from_words(long_set["words"])
+
+    for pause_threshold in (0.5, 1.0, 1.5, 3.0):
+        expected = list(analyzer.iter_segments(long_set["words"], pause_threshold))
+        assert analyzer.segment_by_pauses({"words": columns}, pause_threshold) == expected
+        assert analyzer.segment_by_pauses(long_set, pause_threshold) == expected
+
+
+def test_gap_equal_to_the_threshold_splits():
+    words = [{"text": "one", "start": 0, "end": 500}, {"text": "two", "start": 2000, "end": 2500},
+             {"text": "three", "start": 3999, "end": 4200}, {"word": "four", "start": 5700}]
+
+    spans = analyzer.TranscriptColumns.from_words(words).spans(1.5)
+
+    assert [(span.first, span.last) for span in spans] == [(0, 1), (1, 3), (3, 4)]
+    assert [span.text for span in spans] == ["one", "two three", "four"]
+    assert (spans[2].start_time, spans[2].end_time) == (5.7, 5.7)  # No "end": the word ends where it starts
+
+
+def test_span_syllables_come_from_prefix_sums(transcript):
+    columns = analyzer.TranscriptColumns.from_words(transcript["words"])
+
+    for span in columns.spans(1.0):
+        texts = [w["text"] for w in transcript["words"][span.first:span.last]]
+        assert span.syllable_count == sum(analyzer.count_syllables_batch(texts))
+        assert span.to_bit_segment().syllable_count == span.syllable_count
+
+
+def test_empty_columns():
+    columns = analyzer.TranscriptColumns.from_words([])
+
+    assert len(columns) == 0 and columns.spans() == []
+    assert analyzer.segment_by_pauses({"words": columns}) == []
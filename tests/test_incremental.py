@@ -0,0 +1,89 @@
+import random
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+
+def _bits(transcript, pause_ms=1500):
+    """The transcript's words grouped into bits at the default pause threshold"""
+    bits = []
+    for word in transcript["words"]:
+        if not bits or word["start"] - bits[-1][-1]["end"] >= pause_ms:
+            bits.append([])
+        bits[-1].append(dict(word))
+    return bits
+
+
+def _transcript(bits, gap_ms=3000):
+    """Re-time edited bits back to back, keeping the gaps within each bit"""
+    words, clock = [], 0
+    for bit in bits:
+        offset = clock - bit[0]["start"]
+        for word in bit:
+            words.append(dict(word, start=word["start"] + offset, end=word["end"] + offset))
+        clock = words[-1]["end"] + gap_ms
+    return {"text": ' '.join(word["text"] for word in words), "words": words}
+
+
+def _edit_word(bit, text):
+    bit = [dict(word) for word in bit]
+    bit[len(bit) // 2]["text"] = text
+    return bit
+
+
+def _assert_same_analysis(incremental, full):
+    assert incremental["segments"] == full["segments"]
+    # Exactly equal, including the order of styles tied in most_common_styles
+    assert incremental["overall_statistics"] == full["overall_statistics"]
+
+
+EDITS = {
+    "edit one word": lambda bits: bits[:4] + [_edit_word(bits[4], "Suddenly")] + bits[5:],
+    "edit first bit": lambda bits: [_edit_word(bits[0], "nothing")] + bits[1:],
+    "edit last bit": lambda bits: bits[:-1] + [_edit_word(bits[-1], "really")],
+    "insert bit": lambda bits: bits[:3] + [bits[7]] + bits[3:],
+    "delete bit": lambda bits: bits[:5] + bits[6:],
+    "swap bits": lambda bits: bits[:2] + [bits[3], bits[2]] + bits[4:],
+    "rewrite half": lambda bits: [_edit_word(bit, "politics") if i % 2 else bit for i, bit in enumerate(bits)],
+    "no change": lambda bits: bits,
+}
+
+
+@pytest.mark.parametrize("edit", EDITS)
+def test_incremental_matches_full_reanalysis(transcript, edit):
+    bits = _bits(transcript)
+    original = _transcript(bits)
+    edited = _transcript(EDITS[edit](bits))
+    previous = analyzer.analyze_comedy_transcript(original)
+
+    incremental = analyzer.analyze_comedy_transcript_incremental(previous, edited)
+
+    _assert_same_analysis(incremental, analyzer.analyze_comedy_transcript(edited))
+
+
+def test_one_edited_bit_is_the_only_one_reanalyzed(transcript):
+    bits = _bits(transcript)
+    previous = analyzer.analyze_comedy_transcript(_transcript(bits))
+
+    edited = _transcript(EDITS["edit one word"](bits))
+    counts = analyzer.analyze_comedy_transcript_incremental(previous, edited)["incremental"]
+
+    assert counts["reanalyzed_segments"] == 1
+    assert counts["reused_segments"] == len(bits) - 1
+    assert counts["toppers_rechecked"] == 1
+
+
+def test_chained_edits_stay_equal_to_full_reanalysis():
+    rng = random.Random(7)
+    bits = _bits(benchmark.generate_set(4, seed=11))
+    result = analyzer.analyze_comedy_transcript(_transcript(bits))
+    for _ in range(10):
+        k = rng.randrange(len(bits))
+        bits = bits[:k] + [_edit_word(bits[k], rng.choice(benchmark.VOCABULARY))] + bits[k + 1:]
+        if rng.random() < 0.3:
+            del bits[rng.randrange(len(bits))]
+        edited = _transcript(bits)
+        result = analyzer.analyze_comedy_transcript_incremental(result, edited)
+        _assert_same_analysis(result, analyzer.analyze_comedy_transcript(edited))
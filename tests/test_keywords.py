@@ -0,0 +1,102 @@
+import random
+import re
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+KEYWORDS = sorted(analyzer._KEYWORD_INFO)
+
+
+def _naive_offsets(keyword, text):
+    """Start of every whole-word occurrence of keyword, one regex per keyword"""
+    pattern = re.compile(r'(?<!\w)(?=' + re.escape(keyword) + r'\b)', re.IGNORECASE)
+    return [m.start() for m in pattern.finditer(text)]
+
+
+def _naive_classify(text):
+    # The original formula, float for float
+    scores = {}
+    word_count = len(text.lower().split())
+    for style, keywords in analyzer.STYLE_KEYWORDS.items():
+        matches = sum(1 for keyword in keywords if _naive_offsets(keyword.lower(), text))
+        scores[style] = min(1.0, (matches * 1.5) / max(1, word_count / 10))
+    return scores
+
+
+def _random_texts(count, seed=0):
+    """Keywords run together with ordinary words, glued to letters, re-cased and punctuated"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        tokens = []
+        for _ in range(rng.randint(0, 40)):
+            roll = rng.random()
+            if roll < 0.4:
+                token = rng.choice(KEYWORDS)
+            elif roll < 0.5:
+                token = rng.choice(KEYWORDS) + rng.choice(["ly", "s", "ing", "'s"])
+            elif roll < 0.55:
+                token = rng.choice(["un", "re", "a"]) + rng.choice(KEYWORDS)
+            else:
+                token = rng.choice(benchmark.VOCABULARY)
+            if rng.random() < 0.3:
+                token = token.upper() if rng.random() < 0.5 else token.capitalize()
+            tokens.append(token + rng.choice(["", "", "", ",", ".", "!", "?", "-"]))
+        texts.append(' '.join(tokens))
+    return texts
+
+
+TEXTS = _random_texts(300) + ["", "likely unlike alike", "I MEAN, i mean... I mean", "play on words: double meaning"]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_matched_keywords_match_per_keyword_scan(text):
+    expected = {keyword for keyword in KEYWORDS if _naive_offsets(keyword, text)}
+    assert analyzer._matched_keywords(text) == expected
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_keyword_match_offsets(text):
+    expected = sorted((start, keyword) for keyword in KEYWORDS for start in _naive_offsets(keyword, text))
+    matches = analyzer.find_keyword_matches(text)
+    assert sorted((match.start, match.keyword) for match in matches) == expected
+    for match in matches:
+        assert text[match.start:match.end].lower() == match.keyword
+        styles, is_filler, is_qualifier = analyzer._KEYWORD_INFO[match.keyword]
+        assert (match.styles, match.is_filler, match.is_qualifier) == (styles, is_filler, is_qualifier)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_keyword_classifier_matches_per_keyword_scan(text):
+    assert analyzer.classify_styles_keyword(text) == _naive_classify(text)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_trimming_matches_per_keyword_scan(text):
+    expected = []
+    if text:
+        expected += [f"Remove filler: '{filler}'" for filler in analyzer.FILLER_WORDS
+                     if _naive_offsets(filler.lower(), text)]
+        expected += [f"Trim redundant: '{match.group()}'" for pattern in analyzer.REDUNDANT_PATTERNS
+                     for match in pattern.finditer(text.lower())]
+        expected += [f"Consider removing qualifier: '{qualifier}'" for qualifier in analyzer.QUALIFIER_PHRASES
+                     if _naive_offsets(qualifier.lower(), text)]
+    assert analyzer.detect_trimming_opportunities(text) == expected
+
+
+def test_keywords_only_match_whole_words():
+    assert "like" not in analyzer._matched_keywords("That's likely, unlike before")
+    assert "like" in analyzer._matched_keywords("It was, like, fine")
+
+
+def test_keyword_scores_are_bit_identical_for_long_bits():
+    # Long bits are where (matches * 1.5) / n and matches * (1.5 / n) differ in the last bit
+    rng = random.Random(2)
+    for word_count in range(11, 400, 7):
+        words = [rng.choice(benchmark.VOCABULARY) for _ in range(word_count)]
+        for k in rng.sample(range(word_count), min(word_count, 6)):
+            words[k] = rng.choice(KEYWORDS)
+        text = ' '.join(words)
+        assert analyzer.classify_styles_keyword(text) == _naive_classify(text)
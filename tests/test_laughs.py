@@ -0,0 +1,132 @@
+import struct
+import wave
+
+import pytest
+
+import comedy_style_analyzer as analyzer
+
+np = pytest.importorskip("numpy")
+
+RATE = 16000
+LAUGHS = [(2.0, 3.0), (6.0, 7.5)]
+
+
+def _performance(seconds=10.0):
+    """A steady voice-like tone with two bursts of loud crowd noise"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    samples = 0.05 * np.sin(2 * np.pi * 220 * t) + 0.03 * np.sin(2 * np.pi * 440 * t)
+    noise = np.random.default_rng(7).normal(0.0, 0.25, len(t))
+    for start, end in LAUGHS:
+        samples[int(start * RATE):int(end * RATE)] += noise[int(start * RATE):int(end * RATE)]
+    return np.clip(samples, -1.0, 1.0)
+
+
+def _write_pcm(path, samples, width=2, channels=1):
+    if width == 1:
+        data = np.round(samples * 127 + 128).astype(np.uint8).tobytes()
+    else:
+        values = np.round(samples * (2 ** (8 * width - 1) - 1)).astype('<i4')
+        data = values.astype('<i2').tobytes() if width == 2 else \
+            b''.join(int(v).to_bytes(width, 'little', signed=True) for v in values)
+    if channels > 1:
+        data = b''.join(data[i:i + width] * channels for i in range(0, len(data), width))
+    with wave.open(str(path), 'wb') as f:
+        f.setnchannels(channels)
+        f.setsampwidth(width)
+        f.setframerate(RATE)
+        f.writeframes(data)
+    return str(path)
+
+
+def _write_float(path, samples):
+    data = samples.astype('<f4').tobytes()
+    fmt = struct.pack('<HHIIHH', 3, 1, RATE, RATE * 4, 4, 32)
+    chunks = b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'LIST' + struct.pack('<I', 4) + b'INFO'
+    chunks += b'data' + struct.pack('<I', len(data)) + data
+    path.write_bytes(b'RIFF' + struct.pack('<I', 4 + len(chunks)) + b'WAVE' + chunks)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def samples():
+    return _performance()
+
+
+def _assert_finds_the_laughs(events):
+    assert len(events) == len(LAUGHS)
+    for event, (start, end) in zip(events, LAUGHS):
+        assert event.start == pytest.approx(start, abs=0.1)
+        assert event.end == pytest.approx(end, abs=0.1)
+        assert event.peak_db < 0
+
+
+def test_finds_crowd_noise_but_not_the_voice(tmp_path, samples):
+    _assert_finds_the_laughs(analyzer.detect_laughs(_write_pcm(tmp_path / "set.wav", samples)))
+
+
+def test_chunking_does_not_change_the_events(tmp_path, samples):
+    path = _write_pcm(tmp_path / "set.wav", samples)
+
+    # Chunk boundaries land inside both laughs
+    assert analyzer.detect_laughs(path, chunk_seconds=0.7) == analyzer.detect_laughs(path)
+
+
+@pytest.mark.parametrize("width,channels", [(1, 1), (3, 1), (2, 2)])
+def test_sample_formats_decode_alike(tmp_path, samples, width, channels):
+    path = _write_pcm(tmp_path / "set.wav", samples, width, channels)
+
+    info = analyzer.read_wav_info(path)
+
+    assert (info.sample_rate, info.channels, info.sample_width, info.is_float) == (RATE, channels, width, False)
+    assert info.duration == pytest.approx(10.0)
+    _assert_finds_the_laughs(analyzer.detect_laughs(path))
+
+
+def test_float_wav_with_extra_chunks(tmp_path, samples):
+    path = _write_float(tmp_path / "set.wav", samples)
+
+    info = analyzer.read_wav_info(path)
+
+    assert info.is_float and info.frame_count == len(samples)
+    _assert_finds_the_laughs(analyzer.detect_laughs(path))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "set.mp3"
+    path.write_bytes(b'ID3' + bytes(100))
+
+    with pytest.raises(ValueError, match="not a WAV file"):
+        analyzer.read_wav_info(str(path))
+
+
+def test_silence_has_no_laughs(tmp_path):
+    assert analyzer.detect_laughs(_write_pcm(tmp_path / "quiet.wav", np.zeros(RATE * 2))) == []
+    assert analyzer.detect_laughs(_write_pcm(tmp_path / "empty.wav", np.zeros(0))) == []
+
+
+def test_laughs_belong_to_the_bit_before_them():
+    laughs = [analyzer.LaughEvent(start, start + 1, -10.0) for start in (0.5, 4.0, 9.5, 12.0, 30.0)]
+
+    # Walk-on applause at 0.5s belongs to nobody; the laugh in the pause after a bit counts for it
+    assert analyzer.assign_laughs([2.0, 10.0, 20.0], laughs) == [2, 1, 1]
+    assert analyzer.assign_laughs([], laughs) == []
+
+
+def test_apply_laughs_fills_in_bloom_efficiency(transcript):
+    result = analyzer.analyze_comedy_transcript(transcript)
+    segments = result["segments"]
+    laughs = [analyzer.LaughEvent(seg["start_time"], seg["start_time"] + 0.5, -12.0) for seg in segments[::2]]
+
+    analyzer.apply_laughs(result, laughs)
+
+    assert [seg["laugh_count"] for seg in segments] == [1 - i % 2 for i in range(len(segments))]
+    assert segments[0]["bloom_efficiency_score"] == 1 / segments[0]["syllable_count"]
+    assert result["laughs"] == {"events": len(laughs), "assigned": len(laughs), "laugh_seconds": 0.5 * len(laughs)}
+
+
+def test_apply_laughs_needs_word_timestamps():
+    result = analyzer.analyze_comedy_transcript({"text": "First bit here. " * 30 + "\n\n" + "Second bit now. " * 30})
+    assert len(result["segments"]) > 1
+
+    with pytest.raises(ValueError, match="word timestamps"):
+        analyzer.apply_laughs(result, [])
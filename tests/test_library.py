@@ -0,0 +1,158 @@
+from collections import Counter
+from datetime import datetime
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+from comedy_library import DETECTIONS, STYLE_THRESHOLD, ComedyLibrary
+
+JAN, FEB, MAR = (datetime(2026, month, 1).timestamp() for month in (1, 2, 3))
+
+
+def _bit(text, scores=None, **flags):
+    scores = scores or {}
+    seg = {
+        "text": text,
+        "start_time": 0.0,
+        "end_time": 5.0,
+        "syllable_count": len(text.split()),
+        "styles": analyzer._top_styles(scores),
+        "style_scores": scores,
+        "trimming_opportunities": [],
+        "laugh_count": None,
+        "bloom_efficiency_score": None,
+    }
+    seg.update((flag, False) for flag in DETECTIONS.values())
+    seg.update((DETECTIONS[name], value) for name, value in flags.items())
+    return seg
+
+
+def _result(*segments):
+    statistics = analyzer.OverallStatistics()
+    for seg in segments:
+        statistics.add(seg)
+    return {"segments": list(segments), "overall_statistics": statistics.to_dict()}
+
+
+@pytest.fixture
+def library():
+    with ComedyLibrary(":memory:") as library:
+        yield library
+
+
+@pytest.fixture
+def texts(library):
+    if not library.full_text:
+        pytest.skip("SQLite built without FTS5")
+    library.add("airports.json", _result(
+        _bit("I missed my flight at the airport", {"Anecdotal": 0.8}),
+        _bit("Airports sell water for nine dollars", {"Observational": 0.9, "Sarcasm": 0.5}, seesaw=True),
+        _bit("Toilet paper is a scam", {"Satire": 0.6}),
+    ), JAN)
+    library.add("dating.json", _result(
+        _bit("My date brought her dentist", {"Anecdotal": 0.4, "Shock": 0.2}),
+        _bit("Dating apps are airports for feelings", {"Observational": 0.7}, topper=True),
+    ), FEB)
+    return library
+
+
+def _texts(bits):
+    return [bit["text"] for bit in bits]
+
+
+def test_full_text_queries(texts):
+    assert _texts(texts.bits(text="airport")) == [  # Stemmed: "airports" matches too
+        "Dating apps are airports for feelings",
+        "I missed my flight at the airport",
+        "Airports sell water for nine dollars",
+    ]
+    assert _texts(texts.bits(text='"toilet paper"')) == ["Toilet paper is a scam"]
+    assert _texts(texts.bits(text='"paper toilet"')) == []
+    assert _texts(texts.bits(text="dentist OR scam")) == ["My date brought her dentist", "Toilet paper is a scam"]
+    assert _texts(texts.bits(text="airport NOT dating")) == [
+        "I missed my flight at the airport", "Airports sell water for nine dollars"]
+    assert _texts(texts.bits(text="dat*")) == ["My date brought her dentist", "Dating apps are airports for feelings"]
+    assert texts.count_bits(text="airport") == 3
+
+
+def test_filters_combine(texts):
+    assert _texts(texts.bits(text="airport", styles={"observational": 0.8})) == [
+        "Airports sell water for nine dollars"]
+    assert _texts(texts.bits(styles={"Anecdotal": 0.3}, until=FEB)) == ["I missed my flight at the airport"]
+    assert _texts(texts.bits(detected=["topper"])) == ["Dating apps are airports for feelings"]
+    assert _texts(texts.bits(text="airport", sources=["airports.json"], detected=["seesaw"])) == [
+        "Airports sell water for nine dollars"]
+    assert texts.count_bits(since=FEB) == 2
+    with pytest.raises(ValueError, match="Unknown style"):
+        texts.bits(styles={"Slapstick": 0.5})
+
+
+def test_bits_come_back_as_stored(texts):
+    (bit,) = texts.bits(text="water")
+
+    assert bit["set"] == "airports.json" and bit["position"] == 1
+    assert bit["style_scores"] == {"Observational": 0.9, "Sarcasm": 0.5}
+    assert bit["styles"] == ["Observational", "Sarcasm"]
+    assert bit["seesaw_detected"] and not bit["topper_detected"]
+
+
+def test_re_adding_or_removing_a_set_updates_the_text_index(texts):
+    texts.add("airports.json", _result(_bit("Trains are fine actually")), JAN)
+
+    assert _texts(texts.bits(text="airport")) == ["Dating apps are airports for feelings"]
+    assert _texts(texts.bits(text="trains")) == ["Trains are fine actually"]
+    assert texts.remove("dating.json") and not texts.remove("dating.json")
+    assert texts.bits(text="airport") == []
+    assert len(texts) == 1
+
+
+@pytest.fixture
+def sets(library):
+    results = {}
+    for seed, date in zip((1, 2, 3), (JAN, FEB, MAR)):
+        source = f"set{seed}.json"
+        results[source] = analyzer.analyze_comedy_transcript(benchmark.generate_set(8, seed=seed))
+        library.add(source, results[source], date)
+    return results
+
+
+def test_set_rollups_reproduce_overall_statistics(library, sets):
+    for source, result in sets.items():
+        assert library.statistics(source) == result["overall_statistics"]
+    with pytest.raises(KeyError):
+        library.statistics("missing.json")
+
+
+def test_library_rollups_sum_the_selected_sets(library, sets):
+    selected = [sets["set2.json"], sets["set3.json"]]
+    styles = Counter(style for result in selected for seg in result["segments"] for style in seg["styles"])
+
+    stats = library.statistics(since=FEB, top=len(analyzer.COMEDY_STYLES))
+
+    assert stats["sets"] == 2
+    for field in ["total_segments", "total_syllables"] + [field for field, _ in analyzer.DETECTION_COUNTS]:
+        assert stats[field] == sum(r["overall_statistics"][field] for r in selected)
+    # Each set's rollup keeps every style, not just the top five in its overall_statistics
+    assert dict(stats["most_common_styles"]) == styles
+    assert [count for _, count in stats["most_common_styles"]] == sorted(styles.values(), reverse=True)
+    assert [record["source"] for record in library.sets(until=MAR)] == ["set2.json", "set1.json"]
+
+
+def _naive_style_counts(segments, threshold=STYLE_THRESHOLD):
+    bits, score_sums = Counter(), Counter()
+    for seg in segments:
+        score_sums.update(seg["style_scores"])
+        bits.update(style for style, score in seg["style_scores"].items() if score > threshold)
+    counts = [{"style": style, "bits": bits[style], "mean_score": round(score_sums[style] / len(segments), 4)}
+              for style in score_sums if score_sums[style] > 0]
+    return sorted(counts, key=lambda x: (-x["bits"], x["style"]))
+
+
+def test_style_counts_from_rollups_match_the_bits(library, sets):
+    everything = [seg for result in sets.values() for seg in result["segments"]]
+    recent = sets["set3.json"]["segments"]
+
+    assert library.style_counts() == _naive_style_counts(everything)  # Rollups
+    assert library.style_counts(since=MAR) == _naive_style_counts(recent)
+    assert library.style_counts(threshold=0.5) == _naive_style_counts(everything, 0.5)  # Bits
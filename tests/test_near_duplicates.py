@@ -0,0 +1,43 @@
+import pytest
+
+import comedy_near_duplicates as near_duplicates
+
+BIT = "So my landlord texts me at three in the morning asking if I have seen his cat, and I do not own a cat"
+
+
+def _analysis(score):
+    return {"style_scores": {"Observational": score}, "seesaw_detected": True, "word_smuggling_detected": False}
+
+
+def test_lookup_finds_an_edited_bit_and_respects_scope():
+    index = near_duplicates.NearDuplicateIndex(max_distance=6)
+    index.add(BIT, _analysis(0.8), "keywords")
+    edited = BIT.replace("So my", "My")  # 3 fingerprint bits away
+
+    distance, reused = index.lookup(edited, "keywords")
+
+    assert distance == near_duplicates.hamming_distance(near_duplicates.simhash(BIT), near_duplicates.simhash(edited))
+    assert reused == _analysis(0.8)
+    assert index.lookup(edited, "openai:gpt-4o-mini") is None
+
+
+def test_saved_index_round_trips(tmp_path):
+    index = near_duplicates.NearDuplicateIndex(max_distance=5)
+    index.add(BIT, _analysis(0.5), "keywords")
+    path = tmp_path / "index.json"
+    index.save(str(path))
+
+    loaded = near_duplicates.NearDuplicateIndex.load(str(path))
+
+    assert (loaded.max_distance, loaded.bands, len(loaded)) == (5, 8, 1)
+    assert loaded.lookup(BIT, "keywords") == (0, _analysis(0.5))
+
+
+@pytest.mark.parametrize("max_distance, bands", [(8, 8), (9, 8), (4, 4), (-1, 8)])
+def test_distances_the_bands_cannot_guarantee_are_rejected(tmp_path, max_distance, bands):
+    with pytest.raises(ValueError):
+        near_duplicates.NearDuplicateIndex(max_distance, bands)
+    path = tmp_path / "index.json"
+    near_duplicates.NearDuplicateIndex().save(str(path))
+    with pytest.raises(ValueError):
+        near_duplicates.NearDuplicateIndex.load(str(path), max_distance if bands == 8 else 8)
@@ -0,0 +1,81 @@
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+splitter = analyzer.RuleSentenceSplitter()
+
+
+def _sentences(text, nlp=splitter):
+    return [sent.text for sent in nlp(text).sents]
+
+
+def test_splits_on_terminal_punctuation():
+    assert _sentences("I went home. Why? Because I could! Then...  Nothing.") == [
+        "I went home.", "Why?", "Because I could!", "Then...", "Nothing."]
+    assert _sentences('She said "no way." I left.') == ['She said "no way."', "I left."]
+    assert _sentences("  No punctuation at all  ") == ["No punctuation at all"]
+    assert _sentences("") == []
+
+
+def test_keeps_abbreviations_initials_and_trailing_off_together():
+    assert _sentences("Dr. Smith met J. K. Rowling at 3 p.m. on Tuesday. Then she left.") == [
+        "Dr. Smith met J. K. Rowling at 3 p.m. on Tuesday.", "Then she left."]
+    assert _sentences("So... anyway, my landlord. Great guy.") == ["So... anyway, my landlord.", "Great guy."]
+
+
+def test_spans_point_into_the_text():
+    text = "First one. Second one!"
+    doc = splitter(text)
+
+    assert [(sent.start_char, sent.end_char) for sent in doc.sents] == [(0, 10), (11, 22)]
+    assert [str(sent) for sent in doc.sents] == _sentences(text)
+    assert [doc.text for doc in splitter.pipe([text, "Third."])] == [text, "Third."]
+
+
+def test_tokens_split_contractions_like_spacy():
+    (sent,) = splitter("I don't think I'm 100% sure, pal.").sents
+
+    tokens = list(sent)
+
+    assert [token.text for token in tokens] == ["I", "do", "n't", "think", "I", "'m", "100", "%", "sure", ",",
+                                                "pal", "."]
+    assert [token.text for token in tokens if token.is_alpha] == ["I", "do", "think", "I", "sure", "pal"]
+
+
+def test_profile_names_are_checked(monkeypatch):
+    monkeypatch.setenv("COMEDY_NLP_PROFILE", "turbo")
+    with pytest.raises(ValueError, match="Unknown COMEDY_NLP_PROFILE"):
+        analyzer.get_nlp_profile()
+    with pytest.raises(ValueError, match="Unknown NLP profile"):
+        analyzer.load_nlp("turbo")
+    assert isinstance(analyzer.load_nlp("none"), analyzer.RuleSentenceSplitter)
+
+
+def test_use_nlp_profile_swaps_the_shared_pipeline():
+    pipeline = analyzer.use_nlp_profile("none")
+
+    assert analyzer.get_nlp() is pipeline and pipeline is not analyzer.load_nlp("none")
+
+
+@pytest.fixture
+def spacy_fast():
+    pytest.importorskip("spacy")
+    pipeline = analyzer.load_nlp("fast")
+    if pipeline is None or isinstance(pipeline, analyzer.RuleSentenceSplitter):
+        pytest.skip("Spacy could not be loaded")
+    return pipeline
+
+
+def test_rule_splitter_agrees_with_spacy_on_punctuated_sets(spacy_fast):
+    texts = [seg["text"] for seg in analyzer.analyze_comedy_transcript(benchmark.generate_set(10, seed=5))["segments"]]
+
+    assert [_sentences(text) for text in texts] == [_sentences(text, spacy_fast) for text in texts]
+
+
+def test_analysis_is_the_same_under_fast_and_none(spacy_fast, transcript):
+    expected = analyzer.analyze_comedy_transcript(transcript)
+
+    analyzer.use_nlp_profile("fast")
+
+    assert analyzer.analyze_comedy_transcript(transcript) == expected
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import comedy_style_analyzer as analyzer
+
+FORMATS = list(analyzer.OUTPUT_FORMATS)
+
+
+def _as_json(result):
+    """What the result looks like after a trip through JSON (tuples become lists)"""
+    return json.loads(json.dumps(result))
+
+
+@pytest.fixture
+def result(transcript):
+    result = analyzer.analyze_comedy_transcript(transcript, timings=True)
+    # Fields that are usually None, filled in for one segment so they round-trip too
+    result["segments"][0].update(laugh_count=3, bloom_efficiency_score=0.125)
+    return result
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_every_format_reads_back_to_the_same_result(result, tmp_path, fmt):
+    if fmt == "msgpack":
+        pytest.importorskip("msgpack")
+    path = str(tmp_path / f"set{analyzer.OUTPUT_FORMATS[fmt]}")
+
+    analyzer.write_result(result, path, fmt)
+
+    assert analyzer.read_result(path) == _as_json(result)
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_empty_result_reads_back(tmp_path, fmt):
+    if fmt == "msgpack":
+        pytest.importorskip("msgpack")
+    result = analyzer.analyze_comedy_transcript({"text": ""})
+    path = str(tmp_path / "empty.out")
+
+    analyzer.write_result(result, path, fmt)
+
+    assert analyzer.read_result(path) == _as_json(result)
+
+
+def test_msgpack_scores_stay_floats(result, tmp_path):
+    pytest.importorskip("msgpack")
+    path = str(tmp_path / "set.msgpack")
+    analyzer.write_result(result, path, "msgpack")
+
+    for seg in analyzer.read_result(path)["segments"]:
+        assert all(type(score) is float for score in seg["style_scores"].values())
+
+
+def test_cli_format_picks_the_output_file(transcript, tmp_path):
+    path = tmp_path / "set.json"
+    path.write_text(json.dumps(transcript))
+
+    assert analyzer.main([str(path), "--format", "jsonl"]) == 0
+
+    lines = (tmp_path / "set_analyzed.jsonl").read_text().splitlines()
+    expected = analyzer.analyze_comedy_transcript(transcript)
+    assert len(lines) == len(expected["segments"]) + 1
+    assert analyzer.read_result(str(tmp_path / "set_analyzed.jsonl")) == _as_json(expected)
+
+
+def test_unknown_format_is_rejected(result, tmp_path):
+    with pytest.raises(ValueError, match="Unknown output format"):
+        analyzer.write_result(result, str(tmp_path / "set.out"), "yaml")
@@ -0,0 +1,64 @@
+import random
+
+import comedy_style_analyzer as analyzer
+
+
+def _without_sweep(result):
+    return {key: value for key, value in result.items() if key != "sweep"}
+
+
+def test_sweep_matches_full_analysis_at_every_threshold(transcript):
+    sweep = analyzer.PauseSweep(transcript)
+    gaps = sweep.thresholds()
+    # Slider moves up and down, including thresholds exactly at (and just around) a gap length
+    thresholds = [1.5, 0.3, 4.0, 1.5, 0.05, 10.0] + random.Random(1).sample(gaps, 12)
+    thresholds += [gap + delta for gap in gaps[-3:] for delta in (-1e-9, 1e-9)]
+
+    for threshold in thresholds:
+        expected = analyzer.analyze_comedy_transcript(transcript, threshold)
+        assert _without_sweep(sweep.analyze(threshold)) == expected, threshold
+
+
+def test_sweep_only_analyzes_new_ranges(transcript):
+    sweep = analyzer.PauseSweep(transcript)
+    first = sweep.analyze(1.5)["sweep"]
+    again = sweep.analyze(1.5)["sweep"]
+    merged = sweep.analyze(3.0)["sweep"]
+
+    assert first["reused_segments"] == 0
+    assert again == {"reused_segments": first["analyzed_segments"], "analyzed_segments": 0,
+                     "cached_ranges": first["cached_ranges"]}
+    # Raising the threshold merges bits: unmerged ones are reused, each merged range is new
+    assert merged["analyzed_segments"] == merged["cached_ranges"] - first["cached_ranges"]
+
+
+def test_ranges_form_a_hierarchy(transcript):
+    sweep = analyzer.PauseSweep(transcript)
+    thresholds = sweep.thresholds()
+    finest = sweep.ranges(0.0)
+    seen = set()
+    for threshold in thresholds:
+        ranges = sweep.ranges(threshold)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(transcript["words"])
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        seen.update(ranges)
+    assert len(seen) <= 2 * len(finest) - 1
+
+
+def test_prefetch_then_analyze_reuses_everything(transcript):
+    sweep = analyzer.PauseSweep(transcript)
+    thresholds = [0.5, 1.0, 1.5, 2.0, 3.0]
+    analyzed = sweep.prefetch(thresholds)
+
+    assert analyzed == len({key for threshold in thresholds for key in sweep.ranges(threshold)})
+    for threshold in thresholds:
+        result = sweep.analyze(threshold)
+        assert result["sweep"]["analyzed_segments"] == 0
+        assert _without_sweep(result) == analyzer.analyze_comedy_transcript(transcript, threshold)
+
+
+def test_sweep_without_timestamps_falls_back_to_one_analysis():
+    transcript = {"text": "So I went to the store. It was closed. Nobody told me!"}
+    sweep = analyzer.PauseSweep(transcript)
+    for threshold in (0.5, 1.5, 5.0):
+        assert _without_sweep(sweep.analyze(threshold)) == analyzer.analyze_comedy_transcript(transcript, threshold)
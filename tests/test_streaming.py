@@ -0,0 +1,83 @@
+import io
+import json
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+
+@pytest.fixture
+def transcript_path(tmp_path, transcript):
+    # "text" on both sides of "words" so the reader has to skip values before and after the array
+    data = {"text": transcript["text"], "words": transcript["words"], "extra": {"nested": [1, 2.5, None]}}
+    path = tmp_path / "set.json"
+    path.write_text(json.dumps(data))
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1 << 16])
+def test_streamed_words_match_json_load(transcript_path, chunk_size):
+    with open(transcript_path) as f:
+        expected = json.load(f)["words"]
+    assert list(analyzer.iter_transcript_words(transcript_path, chunk_size)) == expected
+
+
+def test_streamed_words_handle_unicode_and_numbers_across_chunks(tmp_path):
+    words = [{"text": "café", "start": 123456789, "end": 123456999.5},
+             {"text": "“quoted” \\ \"escaped\"", "start": 1e3, "end": 2000}]
+    path = tmp_path / "odd.json"
+    path.write_text(json.dumps({"words": words, "text": "café"}, ensure_ascii=False), encoding="utf-8")
+    for chunk_size in (1, 3, 5):
+        assert list(analyzer.iter_transcript_words(str(path), chunk_size)) == words
+
+
+@pytest.mark.parametrize("pause_threshold", [0.2, 0.8, 1.5, 4.0, 100.0])
+def test_streaming_segmenter_matches_segment_by_pauses(transcript, pause_threshold):
+    streamed = list(analyzer.iter_segments(iter(transcript["words"]), pause_threshold))
+    assert streamed == analyzer.segment_by_pauses(transcript, pause_threshold)
+
+
+def test_streaming_segmenter_reads_word_lines():
+    words = benchmark.generate_set(1, seed=5)["words"]
+    # Blank lines between events are skipped
+    lines = io.StringIO(''.join(json.dumps(word) + ('\n\n' if i % 7 == 0 else '\n') for i, word in enumerate(words)))
+    assert list(analyzer.iter_word_lines(lines)) == words
+
+
+def test_streaming_analysis_matches_full_analysis(transcript_path):
+    with open(transcript_path) as f:
+        expected = analyzer.analyze_comedy_transcript(json.load(f))
+    statistics = analyzer.OverallStatistics()
+
+    segments = list(analyzer.analyze_transcript_stream(analyzer.iter_transcript_words(transcript_path, 64),
+                                                       statistics=statistics))
+
+    assert segments == expected["segments"]
+    assert statistics.to_dict() == expected["overall_statistics"]
+
+
+def test_streaming_segmenter_edge_cases():
+    single = {"words": [{"text": "hi", "start": 0, "end": 10}]}
+    assert list(analyzer.iter_segments(iter([]))) == []
+    assert list(analyzer.iter_segments(single["words"])) == analyzer.segment_by_pauses(single)
+
+
+def test_stream_cli_reads_back_like_jsonl_output(transcript_path, tmp_path):
+    streamed, written = str(tmp_path / "streamed.jsonl"), str(tmp_path / "written.jsonl")
+
+    assert analyzer.main(["--stream", transcript_path, "-o", streamed, "--timings"]) == 0
+    with open(transcript_path) as f:
+        analyzer.write_result(analyzer.analyze_comedy_transcript(json.load(f)), written, "jsonl")
+
+    result, expected = analyzer.read_result(streamed), analyzer.read_result(written)
+    assert result["segments"] == expected["segments"]
+    assert result["overall_statistics"] == expected["overall_statistics"]
+    assert {"stages", "counters", "total_seconds"} <= set(result["timings"])
+
+
+@pytest.mark.parametrize("fmt", ["json", "compact", "msgpack"])
+def test_stream_cli_rejects_other_formats(transcript_path, fmt, capsys):
+    with pytest.raises(SystemExit):
+        analyzer.main(["--stream", transcript_path, "--format", fmt])
+    assert "--stream" in capsys.readouterr().err
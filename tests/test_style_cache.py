@@ -0,0 +1,98 @@
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+import comedy_style_cache
+from comedy_style_cache import StyleCache
+
+SCORES = {"Observational": 0.8, "Sarcasm": 0.4}
+DAY = 24 * 3600
+
+
+class FakeClock:
+    """Stands in for the time module inside comedy_style_cache"""
+
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(comedy_style_cache, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "style_cache.sqlite3")
+
+
+def test_keys_ignore_case_and_spacing_but_not_model_or_prompt():
+    key = StyleCache.make_key("So I went  to the STORE", "gpt-4o-mini")
+    assert key == StyleCache.make_key("so i went to the store", "gpt-4o-mini")
+    assert key != StyleCache.make_key("so i went to the store", "gpt-4o")
+    assert key != StyleCache.make_key("so i went to the store", "gpt-4o-mini", comedy_style_cache.PROMPT_VERSION + 1)
+
+
+def test_scores_survive_reopening(cache_path, clock):
+    StyleCache(cache_path).put_many({"a": SCORES}, {"a": "Some  Bit"})
+
+    reopened = StyleCache(cache_path)
+
+    assert reopened.get_many(["a", "b"]) == {"a": SCORES}
+    assert reopened.stats["hits"] == 1 and reopened.stats["misses"] == 1
+    assert reopened.labeled_examples() == [("some bit", SCORES)]
+
+
+def test_entries_expire_after_the_ttl(cache_path, clock):
+    cache = StyleCache(cache_path, ttl_seconds=30 * DAY)
+    cache.put_many({"old": SCORES}, {"old": "old bit"})
+    clock.now += 20 * DAY
+    cache.put_many({"new": SCORES}, {"new": "new bit"})
+
+    clock.now += 15 * DAY  # "old" is 35 days old, "new" 15
+    assert cache.labeled_examples() == [("new bit", SCORES)]
+    assert cache.get_many(["old", "new"]) == {"new": SCORES}
+    assert cache.stats["expired"] == 1
+    assert len(cache) == 1  # Expired entries are deleted when found
+
+
+def test_reads_keep_entries_from_being_evicted(cache_path, clock):
+    cache = StyleCache(cache_path, max_entries=3)
+    for key in ("a", "b", "c"):
+        cache.put_many({key: SCORES})
+        clock.now += 1
+    cache.get_many(["a"])  # "b" is now the least recently used
+    clock.now += 1
+
+    cache.put_many({"d": SCORES})
+
+    assert len(cache) == 3
+    assert set(cache.get_many(["a", "b", "c", "d"])) == {"a", "c", "d"}
+    assert cache.stats["evictions"] == 1
+
+
+def test_classifier_caches_model_scores_but_never_fallbacks(cache_path):
+    texts = ["I went to the store and it was closed", "My landlord texts me at three in the morning"]
+    cache = StyleCache(cache_path)
+    breaker = analyzer.CircuitBreaker(failure_threshold=100)
+
+    down = benchmark.StubChatClient(error_rate=1.0)
+    analyzer._run_coroutine(analyzer.AsyncStyleClassifier(down, cache=cache, circuit_breaker=breaker)
+                            .classify_many(texts))
+    assert len(cache) == 0
+
+    up = benchmark.StubChatClient()
+    first = analyzer._run_coroutine(analyzer.AsyncStyleClassifier(up, cache=cache, circuit_breaker=breaker)
+                                    .classify_many(texts))
+    calls = up.calls
+    again = analyzer._run_coroutine(analyzer.AsyncStyleClassifier(up, cache=cache, circuit_breaker=breaker)
+                                    .classify_many(texts))
+
+    assert len(cache) == 2
+    assert again == first
+    assert up.calls == calls  # Served from the cache
@@ -0,0 +1,114 @@
+import copy
+import time
+
+import pytest
+
+import comedy_benchmark as benchmark
+import comedy_style_analyzer as analyzer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _classifier(client, breaker=None, **kwargs):
+    breaker = breaker or analyzer.CircuitBreaker(failure_threshold=100)
+    return analyzer.AsyncStyleClassifier(client, use_cache=False, circuit_breaker=breaker, **kwargs)
+
+
+def test_breaker_opens_after_consecutive_failures_then_probes_once():
+    clock = FakeClock()
+    breaker = analyzer.CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+
+    breaker.record_failure(), breaker.record_failure(), breaker.record_success()
+    breaker.record_failure(), breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()  # A success in between resets the count
+
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 29.9
+    assert not breaker.allow()
+    clock.now += 0.1
+    assert breaker.allow() and breaker.state == "half-open"
+    assert not breaker.allow()  # Only the one trial request
+
+    breaker.record_failure()  # Failed trial: open for another reset period
+    assert breaker.state == "open" and not breaker.allow()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+    assert breaker.stats["opened"] == 2 and breaker.stats["rejected"] == 4
+
+
+def test_open_breaker_stops_requests_and_falls_back_to_keywords(transcript):
+    client = benchmark.StubChatClient(error_rate=1.0)
+    breaker = analyzer.CircuitBreaker(failure_threshold=2, reset_seconds=3600)
+    classifier = _classifier(client, breaker, bits_per_request=1, concurrency=1, max_retries=0)
+    texts = [seg["text"] for seg in analyzer.analyze_comedy_transcript(transcript)["segments"]]
+
+    scores = analyzer._run_coroutine(classifier.classify_many(texts))
+
+    assert client.calls == 2
+    assert classifier.stats["circuit_open"] == len(texts) - 2
+    assert scores == [analyzer.classify_styles_keyword(text) for text in texts]
+
+
+def test_time_budget_bounds_a_hung_api(transcript):
+    breaker = analyzer.CircuitBreaker(failure_threshold=1, slow_call_seconds=10)
+    classifier = _classifier(benchmark.StubChatClient(hang_rate=1.0), breaker)
+
+    started = time.monotonic()
+    result = analyzer.analyze_comedy_transcript(transcript, classifier=classifier, time_budget=0.2, timings=True)
+
+    assert time.monotonic() - started < 5
+    offline = analyzer.analyze_comedy_transcript(transcript)
+    assert result["segments"] == offline["segments"]
+    assert result["timings"]["counters"]["deadline_fallbacks"] == len(offline["segments"])
+    # Cut off by our own budget well before slow_call_seconds: not OpenAI's fault
+    assert breaker.state == "closed" and breaker.failures == 0
+
+
+def test_budget_cut_counts_as_failure_once_the_call_is_slow(transcript):
+    breaker = analyzer.CircuitBreaker(failure_threshold=1, slow_call_seconds=0.05)
+    classifier = _classifier(benchmark.StubChatClient(hang_rate=1.0), breaker)
+
+    analyzer.analyze_comedy_transcript(transcript, classifier=classifier, time_budget=0.2)
+
+    assert breaker.state == "open"
+
+
+def test_progressive_results_upgrade_to_the_full_analysis(transcript):
+    # The same dict is yielded each time and upgraded in place, so keep snapshots
+    results = [copy.deepcopy(result) for result in analyzer.analyze_comedy_transcript_progressive(
+        transcript, classifier=_classifier(benchmark.StubChatClient(latency=0.01), bits_per_request=2))]
+    expected = analyzer.analyze_comedy_transcript(transcript, classifier=_classifier(benchmark.StubChatClient(), bits_per_request=2))
+
+    first, last = results[0], results[-1]
+    assert first["progress"] == {"upgraded_segments": 0, "pending_segments": len(expected["segments"]), "done": False}
+    assert [seg["style_scores"] for seg in first["segments"]] == \
+        [analyzer.classify_styles_keyword(seg["text"]) for seg in expected["segments"]]
+    assert last["progress"]["done"] and last["progress"]["fallback_segments"] == 0
+    assert last["progress"]["upgraded_segments"] == len(expected["segments"])
+    assert last["segments"] == expected["segments"]
+    assert last["overall_statistics"] == expected["overall_statistics"]
+    upgraded = [result["progress"]["upgraded_segments"] for result in results]
+    assert upgraded == sorted(upgraded)
+
+
+@pytest.mark.parametrize("time_budget", [0.0, 0.2])
+def test_progressive_keeps_offline_scores_past_the_budget(transcript, time_budget):
+    classifier = _classifier(benchmark.StubChatClient(hang_rate=1.0))
+
+    *_, last = analyzer.analyze_comedy_transcript_progressive(transcript, classifier=classifier,
+                                                              time_budget=time_budget)
+
+    offline = analyzer.analyze_comedy_transcript(transcript)
+    assert last["progress"]["done"]
+    assert last["progress"]["fallback_segments"] == len(offline["segments"])
+    assert last["segments"] == offline["segments"]